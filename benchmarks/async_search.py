@@ -0,0 +1,99 @@
+"""
+Measures how many search requests per second an async application gets
+from the AsyncDictionary when it serves several requests at once, against
+calling the synchronous Dictionary from the event loop. Also reports the
+longest time the event loop was blocked during each run. The texts are
+made of words from the database:
+
+    python benchmarks/async_search.py [--requests N] [--concurrency C ...]
+"""
+import argparse
+import asyncio
+import random
+from time import perf_counter
+from typing import Dict, List
+
+from sqlalchemy import select
+
+from cnlearn.db.models import Word
+from cnlearn.search.async_dictionary import AsyncDictionary
+from cnlearn.search.cache import LRUCache
+from cnlearn.search.dictionary import Dictionary
+
+
+def sample_texts(n_texts: int, words_per_text: int = 6, seed: int = 0) -> List[str]:
+    """
+    Returns texts made of words from the database, so that they segment
+    into words that have to be looked up.
+    """
+    dictionary = Dictionary(jieba_startup="eager")
+    words: List[str] = list(dictionary._dictionary.execute(select(Word.simplified).distinct()).scalars())
+    dictionary.close()
+    generator = random.Random(seed)
+    return ["".join(generator.choices(words, k=words_per_text)) for _ in range(n_texts)]
+
+
+async def watch_loop(lags: List[float], interval: float = 0.001) -> None:
+    """
+    Records how late the event loop wakes this task up, until cancelled.
+    """
+    while True:
+        start: float = perf_counter()
+        await asyncio.sleep(interval)
+        lags.append(perf_counter() - start - interval)
+
+
+async def serve(texts: List[str], concurrency: int, use_async: bool) -> Dict[str, float]:
+    """
+    Serves a search request for every text, with concurrency requests in
+    flight at a time. Every run starts with an empty cache.
+    """
+    lags: List[float] = []
+    watcher = asyncio.create_task(watch_loop(lags))
+    queue: "asyncio.Queue[str]" = asyncio.Queue()
+    for text in texts:
+        queue.put_nowait(text)
+    dictionary = Dictionary(jieba_startup="eager", cache=LRUCache())
+    async_dictionary = AsyncDictionary(dictionary) if use_async else None
+
+    async def worker() -> None:
+        while not queue.empty():
+            text: str = queue.get_nowait()
+            if async_dictionary is not None:
+                await async_dictionary.search_chinese(text)
+            else:
+                dictionary.search_chinese(text)
+                await asyncio.sleep(0)
+
+    start: float = perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    elapsed: float = perf_counter() - start
+    watcher.cancel()
+    if async_dictionary is not None:
+        await async_dictionary.close()
+    else:
+        dictionary.close()
+    return {
+        "requests_per_second": len(texts) / elapsed,
+        "max_loop_lag_ms": max(lags, default=0.0) * 1000,
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Benchmark concurrent searches with the AsyncDictionary.")
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 8, 32])
+    args = parser.parse_args()
+    texts: List[str] = sample_texts(args.requests)
+    for concurrency in args.concurrency:
+        for use_async in (False, True):
+            name: str = f"{'AsyncDictionary' if use_async else 'Dictionary':<16} concurrency {concurrency:<4}"
+            timings: Dict[str, float] = asyncio.run(serve(texts, concurrency, use_async))
+            print(
+                f"{name} {timings['requests_per_second']:10.1f} requests/s"
+                f"  max loop lag {timings['max_loop_lag_ms']:8.2f} ms"
+            )
+
+
+if __name__ == "__main__":
+    main()
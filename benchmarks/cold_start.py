@@ -0,0 +1,73 @@
+"""
+Measures the cold start of a Dictionary: importing cnlearn.search.dictionary,
+creating a Dictionary and running the first search. Every measurement runs
+in a fresh interpreter so nothing is already imported or loaded:
+
+    python benchmarks/cold_start.py [--runs N]
+"""
+import argparse
+import json
+import statistics
+import subprocess
+import sys
+from typing import Dict, List
+
+from cnlearn.search.dictionary import JIEBA_STARTUP_MODES
+
+
+MEASURE = """
+import json, sys
+from time import perf_counter
+start = perf_counter()
+from cnlearn.search.dictionary import Dictionary
+imported = perf_counter()
+dictionary = Dictionary(jieba_startup=sys.argv[1])
+constructed = perf_counter()
+dictionary.search_chinese("我们不好意思")
+searched = perf_counter()
+print(json.dumps({
+    "import": imported - start,
+    "construct": constructed - imported,
+    "first_search": searched - constructed,
+    "total": searched - start,
+}))
+"""
+
+
+def measure(jieba_startup: str) -> Dict[str, float]:
+    """
+    Returns the cold start timings, in seconds, of one fresh process.
+    """
+    output: str = subprocess.run(
+        [sys.executable, "-c", MEASURE, jieba_startup],
+        check=True,
+        capture_output=True,
+        text=True,
+    ).stdout
+    return json.loads(output.splitlines()[-1])
+
+
+def run(runs: int) -> Dict[str, Dict[str, float]]:
+    """
+    Returns the median of each timing, in milliseconds, for each startup mode.
+    """
+    results: Dict[str, Dict[str, float]] = {}
+    for jieba_startup in JIEBA_STARTUP_MODES:
+        timings: List[Dict[str, float]] = [measure(jieba_startup) for _ in range(runs)]
+        results[jieba_startup] = {
+            stage: statistics.median(timing[stage] for timing in timings) * 1000 for stage in timings[0]
+        }
+    return results
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Benchmark the Dictionary cold start.")
+    parser.add_argument("--runs", type=int, default=5)
+    args = parser.parse_args()
+    for jieba_startup, timings in run(args.runs).items():
+        stages: str = "  ".join(f"{stage} {milliseconds:8.1f} ms" for stage, milliseconds in timings.items())
+        print(f"{jieba_startup:<10} {stages}")
+
+
+if __name__ == "__main__":
+    main()
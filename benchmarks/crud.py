@@ -0,0 +1,125 @@
+"""
+Times each of the functions in cnlearn.db.crud against a dictionary
+database, with each connection profile of cnlearn.db.settings and each
+way of running the statements (through the ORM or prepared). Run it
+before and after a schema change to compare:
+
+    python benchmarks/crud.py [path/to/dictionary.db] [--repeat N] [--profiles P ...] [--statements S ...]
+"""
+import argparse
+import timeit
+from types import ModuleType
+from typing import Callable, Dict, List, Tuple
+
+from sqlalchemy.orm import Session, sessionmaker
+
+from cnlearn.db import crud, statements as prepared
+from cnlearn.db.settings import CRUD_STATEMENT_MODES, DATABASE_PROFILES, create_database_engine, db
+
+
+def crud_cases(lookups: ModuleType = crud) -> List[Tuple[str, Callable[[Session], object]]]:
+    """
+    Returns (name, function) pairs, one per crud function and filter
+    combination, running the functions of lookups: cnlearn.db.crud or
+    cnlearn.db.statements, which has the functions that can be prepared.
+    """
+    get_simplified_word = lookups.get_simplified_word
+    get_simplified_word_containing_char = crud.get_simplified_word_containing_char
+    get_simplified_character = lookups.get_simplified_character
+    get_word_and_character = lookups.get_word_and_character
+    get_words_and_characters_bulk = lookups.get_words_and_characters_bulk
+    return [
+        ("get_simplified_word", lambda session: get_simplified_word(session, "不好意思")),
+        (
+            "get_simplified_word[pinyin_clean]",
+            lambda session: get_simplified_word(session, "好", pinyin_clean="hao"),
+        ),
+        (
+            "get_simplified_word_containing_char",
+            lambda session: get_simplified_word_containing_char(session, "是"),
+        ),
+        (
+            "get_simplified_word_containing_char[pinyin_clean]",
+            lambda session: get_simplified_word_containing_char(session, "是", pinyin_clean="shi"),
+        ),
+        (
+            "get_simplified_word_containing_char[limit]",
+            lambda session: get_simplified_word_containing_char(session, "是", limit=20),
+        ),
+        (
+            "get_simplified_word_containing_char[multiple]",
+            lambda session: get_simplified_word_containing_char(session, "不好"),
+        ),
+        ("get_simplified_character", lambda session: get_simplified_character(session, "好")),
+        ("get_word_and_character", lambda session: get_word_and_character(session, "好")),
+        (
+            "get_word_and_character[pinyin_clean]",
+            lambda session: get_word_and_character(session, "好", pinyin_clean="hao"),
+        ),
+        (
+            "get_word_and_character[pinyin_accent]",
+            lambda session: get_word_and_character(session, "好", pinyin_accent="hǎo"),
+        ),
+        (
+            "get_words_and_characters_bulk",
+            lambda session: get_words_and_characters_bulk(
+                session, [("不", "bù"), ("好", "hǎo"), ("意", "yì"), ("思", "si")]
+            ),
+        ),
+    ]
+
+
+def run(database: str, repeat: int, profile: str = "default", statements: str = "orm") -> Dict[str, float]:
+    """
+    Returns the best time per call, in milliseconds, for each case.
+    """
+    lookups: ModuleType = prepared if statements == "prepared" else crud
+    engine = create_database_engine(profile, database)
+    make_session = sessionmaker(bind=engine, future=True)
+    session: Session = make_session()
+
+    def time_call(call: Callable[[], object]) -> float:
+        # warm up the page cache and SQLAlchemy's statement cache
+        call()
+        timer = timeit.Timer(call)
+        number, _ = timer.autorange()
+        return min(timer.repeat(repeat=repeat, number=number)) / number * 1000
+
+    def in_new_session(case: Callable[[Session], object]) -> None:
+        with make_session() as new_session:
+            case(new_session)
+
+    timings: Dict[str, float] = {}
+    for name, case in crud_cases(lookups):
+        timings[name] = time_call(lambda: case(session))
+    # a session per call, like an application handling requests, also
+    # pays for getting a connection
+    for name, case in crud_cases(lookups)[:2]:
+        timings[f"{name} (new session)"] = time_call(lambda: in_new_session(case))
+    session.close()
+    engine.dispose()
+    return timings
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Benchmark the crud functions.")
+    parser.add_argument("database", nargs="?", default=db, help="path to dictionary.db")
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--profiles", nargs="+", choices=DATABASE_PROFILES, default=list(DATABASE_PROFILES))
+    parser.add_argument(
+        "--statements", nargs="+", choices=CRUD_STATEMENT_MODES, default=list(CRUD_STATEMENT_MODES)
+    )
+    args = parser.parse_args()
+    timings: Dict[str, Dict[str, float]] = {
+        f"{profile}/{statements}": run(args.database, args.repeat, profile, statements)
+        for profile in args.profiles
+        for statements in args.statements
+    }
+    columns: List[str] = list(timings)
+    print(f"{'ms per call':<52}" + "".join(f" {column:>18}" for column in columns))
+    for name in timings[columns[0]]:
+        print(f"{name:<52}" + "".join(f" {timings[column][name]:18.3f}" for column in columns))
+
+
+if __name__ == "__main__":
+    main()
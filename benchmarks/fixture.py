@@ -0,0 +1,89 @@
+"""
+Builds a small dictionary database for the benchmarks, the same on every
+machine: a CEDICT file of n words is run through the build scripts in
+dict/, in a copy of the directory, and how long each script took is
+reported. The repository doesn't ship CEDICT, so by default the file is
+made up from its data files (see dict.cedict_fixture). A real CEDICT
+file can be sampled instead:
+
+    python -m benchmarks.fixture [directory] [--words N] [--cedict path/to/cedict.txt]
+
+The database, and the jieba files the Dictionary needs, end up in
+directory/build; set CNLEARN_DATABASE to directory/build/dictionary.db
+to use it.
+"""
+import argparse
+import os
+import shutil
+import subprocess
+import sys
+from time import perf_counter
+from typing import Dict, List, Optional
+
+from dict.cedict_fixture import CEDICT_FILE, DEFAULT_WORDS, DICT_DIRECTORY, generated_cedict
+
+
+# the build scripts, in the order they have to run
+BUILD_STEPS: List[str] = [
+    "add_words.py",
+    "add_characters.py",
+    "add_components.py",
+    "add_postings.py",
+    "add_fts.py",
+    "add_jieba.py",
+]
+
+
+def sampled_cedict(path: str, n_words: int = DEFAULT_WORDS) -> List[str]:
+    """
+    Returns n_words entries of a CEDICT file, evenly spread through it.
+    """
+    with open(path, encoding="utf-8") as cedict:
+        entries: List[str] = [
+            line.rstrip("\n") for line in cedict if line.strip() and not line.startswith("#")
+        ]
+    return entries[:: max(1, len(entries) // n_words)][:n_words]
+
+
+def build_fixture(
+    directory: str, n_words: int = DEFAULT_WORDS, cedict: Optional[str] = None
+) -> Dict[str, float]:
+    """
+    Builds the fixture database in directory/build, replacing any that is
+    there, and returns how long each build script took, in seconds.
+    """
+    build_directory: str = os.path.join(directory, "build")
+    shutil.rmtree(build_directory, ignore_errors=True)
+    shutil.copytree(
+        DICT_DIRECTORY,
+        build_directory,
+        ignore=shutil.ignore_patterns("__pycache__", "*.db", "jieba*", os.path.basename(CEDICT_FILE)),
+    )
+    lines: List[str] = sampled_cedict(cedict, n_words) if cedict else generated_cedict(n_words)
+    with open(os.path.join(build_directory, CEDICT_FILE), "w", encoding="utf-8") as cedict_file:
+        cedict_file.write("# CC-CEDICT benchmark fixture\n" + "\n".join(lines) + "\n")
+    timings: Dict[str, float] = {}
+    for step in BUILD_STEPS:
+        start: float = perf_counter()
+        subprocess.run([sys.executable, step], cwd=build_directory, check=True, capture_output=True)
+        timings[step] = perf_counter() - start
+    return timings
+
+
+def fixture_database(directory: str) -> str:
+    return os.path.join(directory, "build", "dictionary.db")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Build the benchmark fixture database.")
+    parser.add_argument("directory", nargs="?", default="benchmark-fixture")
+    parser.add_argument("--words", type=int, default=DEFAULT_WORDS, help="number of CEDICT entries")
+    parser.add_argument("--cedict", help="CEDICT file to sample instead of generating one")
+    args = parser.parse_args()
+    for step, seconds in build_fixture(args.directory, args.words, args.cedict).items():
+        print(f"{step:<20} {seconds:8.2f} s")
+    print(f"built {fixture_database(args.directory)}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,91 @@
+"""
+Compares the table driven pinyin conversion in dict/pinyin_utils.py with
+the previous implementation, which worked out every syllable from its
+spelling and rebuilt its lookup lists on each call:
+
+    python benchmarks/pinyin.py [--repeat N]
+"""
+import argparse
+import os
+import sys
+import timeit
+from typing import Dict, List, Union
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "dict"))
+
+from pinyin_utils import SYLLABLES, convert_pinyin_string  # noqa: E402
+
+
+def legacy_last_vowel(word: str) -> Union[int, None]:
+    vowels: List[str] = ["a", "e", "i", "o", "u", "u:", "A", "E", "I", "O", "U", "U:"]
+    reverse_word: str = word[::-1]
+    for character in reverse_word:
+        for vowel in vowels:
+            if vowel in character:
+                return word.find(vowel)
+    return None
+
+
+def legacy_convert_to_pinyin_accent(word: str) -> str:
+    vowels: List[str] = ["a", "e", "i", "o", "u", "u:", "A", "E", "I", "O", "U", "U:"]
+    vowel_dict: Dict[int, List[str]] = {
+        1: ["ā", "ē", "ī", "ō", "ū", "ǖ", "Ā", "Ē", "Ī", "Ō", "Ū", "Ǖ"],
+        2: ["á", "é", "í", "ó", "ú", "ǘ", "Á", "É", "Í", "Ó", "Ú", "Ǘ"],
+        3: ["ǎ", "ě", "ǐ", "ǒ", "ǔ", "ǚ", "Ǎ", "Ě", "Ǐ", "Ǒ", "Ǔ", "Ǚ"],
+        4: ["à", "è", "ì", "ò", "ù", "ǜ", "À", "È", "Ì", "Ò", "Ù", "Ǜ"],
+        5: ["a", "e", "i", "o", "u", "ü", "A", "E", "I", "O", "U", "Ü"],
+    }
+    tone: int = ord(word[-1]) - 48
+    if 0 < tone < 6:
+        word_without_tone = word[0:-1]
+        if tone < 5:
+            search_list: List[str] = ["a", "e", "ou"]
+            found: List[bool] = [vowel in word_without_tone for vowel in search_list]
+            if any(found):
+                pos = word_without_tone.find(search_list[found.index(True)])
+            else:
+                pos = legacy_last_vowel(word_without_tone)
+            if pos is not None:
+                try:
+                    if word_without_tone[pos + 1] == ":":
+                        to_replace = word_without_tone[pos : pos + 2]
+                    else:
+                        to_replace = word_without_tone[pos : pos + 1]
+                except IndexError:
+                    to_replace = word_without_tone[pos : pos + 1]
+                return word_without_tone.replace(to_replace, vowel_dict[tone][vowels.index(to_replace)])
+            return word_without_tone
+        return word_without_tone.replace("U:", "Ü")
+    return word
+
+
+def legacy_convert_pinyin_string(pinyin: str) -> str:
+    return " ".join(legacy_convert_to_pinyin_accent(syllable) for syllable in pinyin.split())
+
+
+def sample_pinyin() -> List[str]:
+    """
+    Returns a deterministic list of 4 syllable pinyin strings that covers
+    every syllable and tone.
+    """
+    numbered: List[str] = [f"{syllable}{tone}" for syllable in SYLLABLES for tone in range(1, 6)]
+    return [" ".join(numbered[index : index + 4]) for index in range(0, len(numbered), 4)]
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Benchmark the pinyin conversion.")
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+    pinyin_strings: List[str] = sample_pinyin()
+    n_syllables: int = sum(len(pinyin.split()) for pinyin in pinyin_strings)
+    for name, convert in [
+        ("legacy", legacy_convert_pinyin_string),
+        ("table", lambda pinyin: convert_pinyin_string(pinyin, "accent")),
+    ]:
+        timer = timeit.Timer(lambda: [convert(pinyin) for pinyin in pinyin_strings])
+        seconds: float = min(timer.repeat(repeat=args.repeat, number=10)) / 10
+        print(f"{name:<8} {n_syllables / seconds:14,.0f} syllables/sec")
+
+
+if __name__ == "__main__":
+    main()
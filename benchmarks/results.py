@@ -0,0 +1,77 @@
+"""
+Measures the cost of turning a database row into a search result: the
+validating Word/Character.from_orm against from_row, which builds the
+same structures without validation. Runs on the rows of the most
+common characters and of the words containing them:
+
+    python benchmarks/results.py [--rows N] [--repeat N]
+"""
+import argparse
+import timeit
+from typing import Callable, Dict, List, Tuple
+
+from sqlalchemy import func, select
+
+from cnlearn.db.crud import get_words_and_characters_bulk
+from cnlearn.db.models import Character as Character_model, Word as Word_model
+from cnlearn.db.settings import SessionLocal
+from cnlearn.schemas.structures import Character, Word
+
+
+def combine_from_orm(word_result: Word_model, character_result: Character_model) -> Character:
+    """
+    What Dictionary.combine_word_and_character did before from_row.
+    """
+    character: Character = Character.from_orm(word_result)
+    character.radical = character_result.radical
+    character.decomposition = character_result.decomposition
+    character.etymology = character_result.etymology
+    return character
+
+
+def combine_from_row(word_result: Word_model, character_result: Character_model) -> Character:
+    return Character.from_row(
+        word_result,
+        radical=character_result.radical,
+        decomposition=character_result.decomposition,
+        etymology=character_result.etymology,
+    )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Benchmark building search results from database rows.")
+    parser.add_argument("--rows", type=int, default=1000)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+    session = SessionLocal()
+    characters: List[str] = list(
+        session.execute(
+            select(Word_model.simplified)
+            .where(func.length(Word_model.simplified) == 1)
+            .group_by(Word_model.simplified)
+            .order_by(func.max(Word_model.frequency).desc())
+            .limit(args.rows)
+        ).scalars()
+    )
+    character_rows: List[Tuple[Word_model, Character_model]] = [
+        pair for pairs in get_words_and_characters_bulk(session, [(c, None) for c in characters]) for pair in pairs
+    ]
+    word_rows: List[Word_model] = list(
+        session.execute(select(Word_model).where(func.length(Word_model.simplified) > 1).limit(args.rows)).scalars()
+    )
+    cases: Dict[str, Tuple[Callable[[], object], int]] = {
+        "Character.from_orm": (lambda: [combine_from_orm(*pair) for pair in character_rows], len(character_rows)),
+        "Character.from_row": (lambda: [combine_from_row(*pair) for pair in character_rows], len(character_rows)),
+        "Word.from_orm": (lambda: [Word.from_orm(row) for row in word_rows], len(word_rows)),
+        "Word.from_row": (lambda: [Word.from_row(row) for row in word_rows], len(word_rows)),
+    }
+    for name, (build, n_rows) in cases.items():
+        # build about 10000 results per timing so small databases time something
+        number: int = max(1, 10000 // max(n_rows, 1))
+        best: float = min(timeit.repeat(build, number=number, repeat=args.repeat))
+        print(f"{name:<20} {n_rows:6} rows {best / number / max(n_rows, 1) * 1e6:8.2f} µs/result")
+    session.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,225 @@
+"""
+Runs the benchmarks against the fixture database (see benchmarks.fixture),
+built afresh, and the full dictionary database, if there is one, and
+writes the results to a JSON file so runs can be compared:
+
+    python -m benchmarks.suite [-o results.json] [--targets fixture full] [--compare old_results.json]
+
+For each database it measures the cold start of a Dictionary, searches
+of a character, a word and a sentence (through the cache and not) and
+each crud function with and without its pinyin filters, through the ORM
+and prepared. The pinyin conversion is measured once and the build
+scripts on the fixture's CEDICT. Each database is measured in a process
+of its own, with CNLEARN_DATABASE pointing to it. Times are in
+milliseconds, except for the build scripts' in seconds.
+"""
+import argparse
+import datetime
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import timeit
+from typing import Any, Callable, Dict, List, Optional
+
+from benchmarks import cold_start, crud, fixture
+
+
+REPOSITORY: str = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..")
+FULL_DATABASE: str = os.path.join(REPOSITORY, "src", "cnlearn", "db", "dictionary.db")
+TARGETS: List[str] = ["fixture", "full"]
+SEARCHES: Dict[str, str] = {
+    "character": "好",
+    "word": "不好意思",
+    "sentence": "我们今天晚上去看电影，你想不想一起去？",
+}
+
+
+def best_time(call: Callable[[], object], repeat: int) -> float:
+    """
+    Returns the best time per call, in milliseconds, after a warm-up call.
+    """
+    call()
+    timer = timeit.Timer(call)
+    number, _ = timer.autorange()
+    return min(timer.repeat(repeat=repeat, number=number)) / number * 1000
+
+
+def measure_searches(repeat: int) -> Dict[str, float]:
+    from cnlearn.search.dictionary import Dictionary
+
+    dictionary = Dictionary(jieba_startup="eager")
+
+    def uncached(text: str) -> None:
+        dictionary.dictionary_cache.clear()
+        dictionary.search(text)
+
+    timings: Dict[str, float] = {}
+    for name, text in SEARCHES.items():
+        timings[name] = best_time(lambda: dictionary.search(text), repeat)
+        timings[f"{name} (uncached)"] = best_time(lambda: uncached(text), repeat)
+    dictionary.close()
+    return timings
+
+
+def measure_pinyin(repeat: int) -> Dict[str, float]:
+    """
+    Returns how many syllables per second are converted to accented
+    pinyin and how many queries per second split into syllables.
+    """
+    from benchmarks.pinyin import convert_pinyin_string, sample_pinyin
+    from cnlearn.search.pinyin import split_pinyin
+
+    pinyin_strings: List[str] = sample_pinyin()
+    n_syllables: int = sum(len(pinyin.split()) for pinyin in pinyin_strings)
+    queries: List[str] = [pinyin.replace(" ", "") for pinyin in pinyin_strings]
+    convert: float = best_time(
+        lambda: [convert_pinyin_string(pinyin, "accent") for pinyin in pinyin_strings], repeat
+    )
+    split: float = best_time(lambda: [split_pinyin(query) for query in queries], repeat)
+    return {
+        "convert_syllables_per_second": n_syllables / convert * 1000,
+        "split_queries_per_second": len(queries) / split * 1000,
+    }
+
+
+def measure(database: str, repeat: int, runs: int) -> Dict[str, Any]:
+    """
+    Measures the database the cnlearn.db.settings of this process use.
+    """
+    return {
+        "cold_start": cold_start.run(runs),
+        "search": measure_searches(repeat),
+        "crud": {
+            statements: crud.run(database, repeat, statements=statements) for statements in ("orm", "prepared")
+        },
+    }
+
+
+def measure_in_process(database: str, repeat: int, runs: int) -> Dict[str, Any]:
+    """
+    Runs measure in a new process using the database.
+    """
+    options: List[str] = ["--measure", database, "--repeat", str(repeat), "--runs", str(runs)]
+    output: str = subprocess.run(
+        [sys.executable, "-m", "benchmarks.suite", *options],
+        cwd=REPOSITORY,
+        env={**os.environ, "CNLEARN_DATABASE": os.path.abspath(database)},
+        check=True,
+        capture_output=True,
+        text=True,
+    ).stdout
+    return json.loads(output.splitlines()[-1])
+
+
+def git_commit() -> Optional[str]:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "HEAD"], cwd=REPOSITORY, check=True, capture_output=True, text=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def run(
+    targets: List[str],
+    repeat: int = 5,
+    runs: int = 3,
+    words: int = fixture.DEFAULT_WORDS,
+    cedict: Optional[str] = None,
+    directory: Optional[str] = None,
+) -> Dict[str, Any]:
+    """
+    Returns the results of the benchmarks on the targets. The fixture is
+    built in directory, a temporary one by default; the full database is
+    skipped if it hasn't been built.
+    """
+    results: Dict[str, Any] = {
+        "created": datetime.datetime.now().isoformat(timespec="seconds"),
+        "commit": git_commit(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "pinyin": measure_pinyin(repeat),
+        "targets": {},
+    }
+    with tempfile.TemporaryDirectory() as temporary_directory:
+        if "fixture" in targets:
+            fixture_directory: str = directory or temporary_directory
+            build: Dict[str, float] = fixture.build_fixture(fixture_directory, words, cedict)
+            database: str = fixture.fixture_database(fixture_directory)
+            results["targets"]["fixture"] = {
+                "database": database,
+                "words": words,
+                "cedict": "sampled" if cedict else "generated",
+                "build": build,
+                **measure_in_process(database, repeat, runs),
+            }
+    if "full" in targets and os.path.exists(FULL_DATABASE):
+        results["targets"]["full"] = {
+            "database": FULL_DATABASE,
+            **measure_in_process(FULL_DATABASE, repeat, runs),
+        }
+    return results
+
+
+def flatten(results: Dict[str, Any], prefix: str = "") -> Dict[str, float]:
+    """
+    Returns the numbers of nested results keyed by their path, e.g.
+    "targets/fixture/search/word".
+    """
+    numbers: Dict[str, float] = {}
+    for key, value in results.items():
+        if isinstance(value, dict):
+            numbers.update(flatten(value, f"{prefix}{key}/"))
+        elif isinstance(value, (int, float)) and not isinstance(value, bool):
+            numbers[f"{prefix}{key}"] = value
+    return numbers
+
+
+def compare(results: Dict[str, Any], baseline: Dict[str, Any]) -> None:
+    """
+    Prints each number of the results next to the baseline's, and their ratio.
+    """
+    old_numbers: Dict[str, float] = flatten(baseline)
+    for name, new in flatten(results).items():
+        old: Optional[float] = old_numbers.get(name)
+        if old is None:
+            continue
+        ratio: str = f"{new / old:8.2f}x" if old else " " * 9
+        print(f"{name:<80} {old:14.3f} {new:14.3f} {ratio}")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Run the benchmarks and write the results to a JSON file.")
+    parser.add_argument("-o", "--output", default="benchmark-results.json")
+    parser.add_argument("--targets", nargs="+", choices=TARGETS, default=TARGETS)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--runs", type=int, default=3, help="fresh processes timed per cold start mode")
+    parser.add_argument(
+        "--words", type=int, default=fixture.DEFAULT_WORDS, help="CEDICT entries in the fixture"
+    )
+    parser.add_argument("--cedict", help="CEDICT file to sample for the fixture instead of generating one")
+    parser.add_argument(
+        "--fixture-directory", help="where to build the fixture, a temporary directory by default"
+    )
+    parser.add_argument("--compare", help="results of an earlier run to compare with")
+    parser.add_argument("--measure", metavar="DATABASE", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+    if args.measure:
+        print(json.dumps(measure(args.measure, args.repeat, args.runs)))
+        return
+    results: Dict[str, Any] = run(
+        args.targets, args.repeat, args.runs, args.words, args.cedict, args.fixture_directory
+    )
+    with open(args.output, "w", encoding="utf-8") as output:
+        json.dump(results, output, ensure_ascii=False, indent=2)
+    print(f"wrote {args.output}")
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as baseline:
+            compare(results, json.load(baseline))
+
+
+if __name__ == "__main__":
+    main()
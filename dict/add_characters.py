@@ -6,12 +6,14 @@ database. It creates a SQLite database through SQLAlchemy.
 
 # used for type hints
 from typing import Any, Tuple, List, Dict, Pattern, Match, Union
-from sqlalchemy import create_engine
-from sqlalchemy.orm import Session, sessionmaker
+from sqlalchemy.engine import Engine
 from json import loads
+from time import perf_counter
 
 # for database stuff
 from db import Word, Character
+from bulk import bulk_insert, create_build_engine, create_indexes, create_tables, report
+from cnlearn.search.frequency import FrequencyTable, load_frequency_table
 
 # for matching
 import re
@@ -22,10 +24,10 @@ CHARACTER_FILE = "files/character_data.txt"
 FREQ_FILE = "files/internet-zh.num"
 
 
-def parse_line(text_line: str, db_session: Session, freq_dict: Dict[str, float]):
+def parse_line(text_line: str, frequency_table: FrequencyTable) -> Dict[str, Any]:
     """
-    This function updates the Characters table in the database using the
-    character data file. The data file has several (some optional) fields for
+    This function parses a line of the character data file and returns
+    the record to be inserted into the Characters table. The data file has several (some optional) fields for
     each character:
         - character (unique, I think)
         - definition (optional, some have it, some don't)
@@ -73,48 +75,36 @@ def parse_line(text_line: str, db_session: Session, freq_dict: Dict[str, float])
     # matches
     matches: str = str(character_dictionary["matches"])
     # add the frequency
-    freq: float = int(max(freq_dict.values()) * 100) + 9999
-    try:
-        freq = int(freq_dict[character] * 100)
-    except KeyError:
-        pass
-
-
-    # add the data to the database
-    db_session.add(
-        Character(
-            character=character,
-            definition=definition,
-            pinyin=pinyin,
-            decomposition=decomposition,
-            etymology=etymology,
-            radical=radical,
-            matches=matches,
-            frequency=freq,
-        )
+    freq: int = frequency_table.rank(character)
+
+
+    # the record to add to the database
+    return dict(
+        character=character,
+        definition=definition,
+        pinyin=pinyin,
+        decomposition=decomposition,
+        etymology=etymology,
+        radical=radical,
+        matches=matches,
+        frequency=freq,
     )
 
 
 if __name__ == "__main__":
 
-    engine = create_engine("sqlite:///dictionary.db", future=True)
-    Session = sessionmaker(bind=engine, future=True)
-    db_session: Session = Session()
+    engine: Engine = create_build_engine()
+    create_tables(engine, Character.__table__)
 
-    # let's open the frequency file and create a dictionary
-    with open(FREQ_FILE, "r", encoding="utf-8") as freq_file:
-        freq_dict: Dict[str, float] = {
-            line.split(" ")[2].rstrip(): float(line.split(" ")[1])
-            for line in freq_file.read().splitlines()[4:]
-        }
+    # let's load the frequency table (only read once)
+    frequency_table: FrequencyTable = load_frequency_table(FREQ_FILE)
 
+    start: float = perf_counter()
     with open(CHARACTER_FILE, "r", encoding="utf-8") as f:
-
-        for line in f:
-            parse_line(line, db_session, freq_dict)
-
-        # commit the changes to the databaes
-        db_session.commit()
-        # # close the connection
-        db_session.close()
-        engine.dispose()
+        n_rows: int = bulk_insert(
+            engine, Character.__table__, (parse_line(line, frequency_table) for line in f)
+        )
+    # the indexes are built once all the rows are in
+    create_indexes(engine, Character.__table__)
+    report("characters", n_rows, perf_counter() - start)
+    engine.dispose()
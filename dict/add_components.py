@@ -0,0 +1,30 @@
+"""
+This script is run after add_words.py and add_characters.py. It links
+every single character word to its row in the characters table and
+fills the word_components table with the component characters of the
+multiple character words, so searching a word loads everything it needs
+in one query.
+"""
+from time import perf_counter
+
+from sqlalchemy.engine import Engine
+
+from bulk import create_build_engine, create_tables, report
+from cnlearn.db.components import build_word_components, link_characters
+from db import WordComponent
+
+
+if __name__ == "__main__":
+    engine: Engine = create_build_engine()
+    create_tables(engine, WordComponent.__table__)
+
+    start: float = perf_counter()
+    with engine.begin() as connection:
+        n_linked: int = link_characters(connection)
+    report("character links", n_linked, perf_counter() - start)
+
+    start = perf_counter()
+    with engine.begin() as connection:
+        n_rows: int = build_word_components(connection)
+    report("word components", n_rows, perf_counter() - start)
+    engine.dispose()
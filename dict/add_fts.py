@@ -0,0 +1,32 @@
+"""
+This script is run after add_words.py. It builds the FTS5 full text
+index over the English definitions that Dictionary.search_english uses.
+"""
+import argparse
+from time import perf_counter
+
+from sqlalchemy import func, select
+from sqlalchemy.engine import Engine
+
+from bulk import create_build_engine, report
+from cnlearn.db.fts import DEFAULT_FTS_TOKENIZER, FTS_TOKENIZERS, create_definitions_index
+from db import Word
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Build the full text index of the definitions.")
+    parser.add_argument(
+        "--tokenizer",
+        choices=FTS_TOKENIZERS,
+        default=DEFAULT_FTS_TOKENIZER,
+        help="porter (default) also matches other forms of the words, unicode61 only exact words",
+    )
+    args = parser.parse_args()
+    engine: Engine = create_build_engine()
+
+    start: float = perf_counter()
+    with engine.begin() as connection:
+        create_definitions_index(connection, args.tokenizer)
+        n_rows: int = connection.execute(select(func.count(Word.id))).scalar()
+    report("definitions index", n_rows, perf_counter() - start)
+    engine.dispose()
@@ -0,0 +1,82 @@
+"""
+This script is run after add_words.py. It exports the words table as a
+jieba dictionary (one `word frequency` line per simplified word) and
+builds jieba's prefix dictionary cache from it, so that segmentation
+produces words that are in the database and the Dictionary doesn't
+have to build the prefix dictionary when it starts. Both files are
+written next to dictionary.db and should be copied along with it.
+"""
+import marshal
+from time import perf_counter
+from typing import Dict, Iterable, Tuple
+
+from jieba import Tokenizer
+from sqlalchemy import func, select
+from sqlalchemy.engine import Engine
+
+from bulk import create_build_engine, report
+from cnlearn.search.frequency import FrequencyTable, load_frequency_table
+from db import Word
+
+
+FREQ_FILE = "files/internet-zh.num"
+JIEBA_DICTIONARY_FILE = "jieba_dict.txt"
+JIEBA_CACHE_FILE = "jieba.cache"
+
+
+def jieba_frequencies(
+    words: Iterable[Tuple[str, int]], frequency_table: FrequencyTable
+) -> Dict[str, int]:
+    """
+    Returns the jieba frequency of each simplified word: the highest
+    frequency among its entries. Words that aren't in the corpus have the
+    fallback rank in the database, which would make them the most common
+    words of all, so they get the frequency of the rarest corpus word.
+    """
+    frequencies: Dict[str, int] = {}
+    for simplified, frequency in words:
+        # jieba splits its dictionary lines on spaces
+        if not simplified or " " in simplified:
+            continue
+        if frequency >= frequency_table.fallback_rank:
+            frequency = 0
+        frequencies[simplified] = max(frequency, frequencies.get(simplified, 0))
+    rarest: int = max(1, min((frequency for frequency in frequencies.values() if frequency), default=1))
+    return {simplified: frequency or rarest for simplified, frequency in frequencies.items()}
+
+
+def export_dictionary(engine: Engine, frequency_table: FrequencyTable, dictionary_file: str) -> int:
+    """
+    Writes the jieba dictionary file. Returns the number of words in it.
+    """
+    with engine.connect() as connection:
+        words = connection.execute(
+            select(Word.simplified, func.max(Word.frequency)).group_by(Word.simplified)
+        ).all()
+    frequencies: Dict[str, int] = jieba_frequencies(words, frequency_table)
+    with open(dictionary_file, "w", encoding="utf-8") as jieba_dictionary:
+        for simplified, frequency in frequencies.items():
+            jieba_dictionary.write(f"{simplified} {frequency}\n")
+    return len(frequencies)
+
+
+def build_cache(dictionary_file: str, cache_file: str) -> None:
+    """
+    Builds jieba's prefix dictionary from the exported dictionary and
+    saves it in jieba's own cache format.
+    """
+    with open(dictionary_file, "rb") as jieba_dictionary:
+        prefix_dictionary, total = Tokenizer.gen_pfdict(jieba_dictionary)
+    with open(cache_file, "wb") as cache:
+        marshal.dump((prefix_dictionary, total), cache)
+
+
+if __name__ == "__main__":
+    engine: Engine = create_build_engine()
+    frequency_table: FrequencyTable = load_frequency_table(FREQ_FILE)
+
+    start: float = perf_counter()
+    n_words: int = export_dictionary(engine, frequency_table, JIEBA_DICTIONARY_FILE)
+    build_cache(JIEBA_DICTIONARY_FILE, JIEBA_CACHE_FILE)
+    report("jieba dictionary", n_words, perf_counter() - start)
+    engine.dispose()
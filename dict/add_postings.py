@@ -0,0 +1,24 @@
+"""
+This script is run after add_words.py. It fills the character_postings
+table, an inverted index from each character to the words containing
+it, used to find the words that contain some characters without
+scanning the whole words table.
+"""
+from time import perf_counter
+
+from sqlalchemy.engine import Engine
+
+from bulk import create_build_engine, create_tables, report
+from cnlearn.db.components import build_character_postings
+from db import CharacterPosting
+
+
+if __name__ == "__main__":
+    engine: Engine = create_build_engine()
+    create_tables(engine, CharacterPosting.__table__)
+
+    start: float = perf_counter()
+    with engine.begin() as connection:
+        n_rows: int = build_character_postings(connection)
+    report("character postings", n_rows, perf_counter() - start)
+    engine.dispose()
@@ -1,23 +1,45 @@
-from db import Word
-from pinyin_utils import convert_pinyin
-from sqlalchemy import create_engine
-from sqlalchemy.orm import Session, sessionmaker
+from db import BuildInfo, Word
+from bulk import (
+    bulk_insert,
+    chunked,
+    create_build_engine,
+    create_indexes,
+    create_tables,
+    report,
+    table_checksum,
+)
+from cnlearn.db.crud import FALLBACK_FREQUENCY
+from cnlearn.search.frequency import FrequencyTable, load_frequency_table
+from pinyin_utils import convert_pinyin_string
+from sqlalchemy import delete, insert
+from sqlalchemy.engine import Engine
+import argparse
+from collections import deque
+from concurrent.futures import Future, ProcessPoolExecutor
 import re
-from typing import Tuple, List, Dict, Pattern, Match
+from time import perf_counter
+from typing import Any, Deque, Iterable, Iterator, Tuple, List, Dict, Optional, Pattern, Match
 
 
 FREQ_FILE = "files/internet-zh.num"
 CEDICT_FILE = "files/cedict_1_0_ts_utf-8_mdbg.txt"
+# number of lines sent to a worker process at a time
+PARSE_CHUNK_SIZE = 2000
+# chunks being parsed or waiting to be inserted per worker, which bounds
+# how much of the file is read ahead of the writer
+CHUNKS_PER_WORKER = 2
 
+# set in each worker process by init_worker
+worker_frequency_table: Optional[FrequencyTable] = None
 
 
-def parse_line(text_line: str, db_session: Session, freq_dict: Dict[str, float]):
+def parse_line(text_line: str, frequency_table: FrequencyTable) -> Dict[str, Any]:
     """
-    This function updates the python dictionary and the database
-    as each line is read from the CEDICT file.
+    This function parses a line read from the CEDICT file and returns
+    the record to be inserted into the words table.
     What things can be present in a line? Traditional, simplified, numbered pinyin
     and definitions. But in the definitions we can also have "also written as",
-    "also pronounced as", "classifiers". Finally, we will also use the freq_dict
+    "also pronounced as", "classifiers". Finally, we will also use the frequency_table
     to sort the database by frequency.
     """
 
@@ -28,8 +50,8 @@ def parse_line(text_line: str, db_session: Session, freq_dict: Dict[str, float])
     pinyin_accent: str
     pinyin_clean: str
     try:
-        pinyin_accent = " ".join(convert_pinyin(pinyin.split(), "accent"))
-        pinyin_clean = " ".join(convert_pinyin(pinyin.split(), "clean"))
+        pinyin_accent = convert_pinyin_string(pinyin, "accent")
+        pinyin_clean = convert_pinyin_string(pinyin, "clean")
     except TypeError:
         pinyin_accent = ""
         pinyin_clean = ""
@@ -46,7 +68,7 @@ def parse_line(text_line: str, db_session: Session, freq_dict: Dict[str, float])
     pattern: Pattern = re.compile('\[[\w ]+\]')
     for match in pattern.findall(unparsed_definitions):
         numbered_pinyin: str = match[1:-1]
-        accent_pinyin: str = " ".join(convert_pinyin(numbered_pinyin.split(), "accent"))
+        accent_pinyin: str = convert_pinyin_string(numbered_pinyin, "accent")
         unparsed_definitions = unparsed_definitions.replace(match, "("+accent_pinyin+")")
     # ok now let's deal with CL, i.e. classifiers/measure words and/or
     # also pronounced as, and/or also written as, etc.
@@ -111,47 +133,97 @@ def parse_line(text_line: str, db_session: Session, freq_dict: Dict[str, float])
             to_replace_with: str = to_be_replaced.split("|")[-1]
             definitions = definitions.replace(to_be_replaced, to_replace_with)
     # sike, there's still the frequency
-    freq: float = int(max(freq_dict.values())*100) + 9999
-    try:
-        freq = int(freq_dict[simplified]*100)
-    except KeyError:
-        pass
-
-
-    # add the data to the database
-    db_session.add(
-        Word(
-            simplified=simplified,
-            traditional=traditional,
-            pinyin_num=pinyin,
-            pinyin_accent=pinyin_accent,
-            pinyin_clean=pinyin_clean,
-            pinyin_no_spaces=pinyin_no_spaces,
-            definitions=definitions,
-            also_written=also_written,
-            also_pronounced=also_pronounced,
-            classifiers=classifiers,
-            frequency=freq
-        )
+    freq: int = frequency_table.rank(simplified)
+
+
+    # the record to add to the database
+    return dict(
+        simplified=simplified,
+        traditional=traditional,
+        pinyin_num=pinyin,
+        pinyin_accent=pinyin_accent,
+        pinyin_clean=pinyin_clean,
+        pinyin_no_spaces=pinyin_no_spaces,
+        definitions=definitions,
+        also_written=also_written,
+        also_pronounced=also_pronounced,
+        classifiers=classifiers,
+        frequency=freq
     )
 
 
 
+def init_worker(frequency_table: FrequencyTable) -> None:
+    """
+    Runs once in each worker process so the frequency table is only sent
+    to it once rather than with every chunk.
+    """
+    global worker_frequency_table
+    worker_frequency_table = frequency_table
+
+
+def parse_chunk(lines: List[str]) -> List[Dict[str, Any]]:
+    """
+    Parses a chunk of CEDICT lines in a worker process.
+    """
+    return [parse_line(line, worker_frequency_table) for line in lines]
+
+
+def parse_records(
+    lines: Iterable[str], frequency_table: FrequencyTable, workers: int = 1
+) -> Iterator[Dict[str, Any]]:
+    """
+    Yields the parsed records in the same order as the lines. With more
+    than one worker, the lines are parsed in chunks by a process pool
+    while the caller (the single writer) consumes the results in order.
+    At most CHUNKS_PER_WORKER chunks per worker are submitted ahead of
+    the one being consumed, so the file isn't read into memory at once.
+    """
+    if workers <= 1:
+        for line in lines:
+            yield parse_line(line, frequency_table)
+        return
+    with ProcessPoolExecutor(
+        max_workers=workers, initializer=init_worker, initargs=(frequency_table,)
+    ) as executor:
+        pending: Deque["Future[List[Dict[str, Any]]]"] = deque()
+        for chunk in chunked(lines, PARSE_CHUNK_SIZE):
+            pending.append(executor.submit(parse_chunk, chunk))
+            if len(pending) >= workers * CHUNKS_PER_WORKER:
+                yield from pending.popleft().result()
+        while pending:
+            yield from pending.popleft().result()
+
+
 if __name__ == "__main__":
-    engine = create_engine("sqlite:///dictionary.db", future=True)
-    Session = sessionmaker(bind=engine, future=True)
-    db_session: Session = Session()
+    parser = argparse.ArgumentParser(description="Add the CEDICT words to dictionary.db.")
+    parser.add_argument(
+        "--workers", type=int, default=1, help="number of processes parsing the CEDICT file"
+    )
+    parser.add_argument(
+        "--checksum", action="store_true", help="print a checksum of the rows in the words table"
+    )
+    args = parser.parse_args()
+
+    engine: Engine = create_build_engine()
+    create_tables(engine, Word.__table__, BuildInfo.__table__)
 
-    # let's open the frequency file and create a dictionary
-    with open(FREQ_FILE, "r", encoding="utf-8") as freq_file:
-        freq_dict: Dict[str, float] = {
-            line.split(" ")[2].rstrip(): float(line.split(" ")[1])
-            for line in freq_file.read().splitlines()[4:]
-        }
+    # let's load the frequency table (only read once)
+    frequency_table: FrequencyTable = load_frequency_table(FREQ_FILE)
 
+    start: float = perf_counter()
     with open(CEDICT_FILE, "r", encoding="utf-8") as dict_file:
-        for line in dict_file:
-            parse_line(line, db_session, freq_dict)
-        db_session.commit()
-        db_session.close()
-        engine.dispose()
\ No newline at end of file
+        n_rows: int = bulk_insert(
+            engine, Word.__table__, parse_records(dict_file, frequency_table, args.workers)
+        )
+    create_indexes(engine, Word.__table__)
+    # so the searches can tell the words that aren't in the corpus apart
+    with engine.begin() as connection:
+        connection.execute(delete(BuildInfo.__table__).where(BuildInfo.name == FALLBACK_FREQUENCY))
+        connection.execute(
+            insert(BuildInfo.__table__), dict(name=FALLBACK_FREQUENCY, value=str(frequency_table.fallback_rank))
+        )
+    report("words", n_rows, perf_counter() - start)
+    if args.checksum:
+        print(f"words checksum: {table_checksum(engine, Word.__table__)}")
+    engine.dispose()
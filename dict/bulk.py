@@ -0,0 +1,112 @@
+"""
+Helpers shared by the build scripts to load the parsed dictionary data
+into SQLite quickly. Records are streamed in chunks through Core insert()
+executemany calls instead of going through the ORM unit of work, the
+connection uses pragmas that only make sense for a throwaway build, and
+the indexes are created once the data is in.
+"""
+from hashlib import sha256
+from itertools import islice
+from typing import Any, Dict, Iterable, Iterator, List, Tuple
+
+from sqlalchemy import create_engine, event, insert, select
+from sqlalchemy.engine import Engine
+from sqlalchemy.schema import CreateTable, Table
+
+
+DATABASE_FILE = "dictionary.db"
+CHUNK_SIZE = 10000
+# the database is rebuilt from scratch if anything goes wrong, so there
+# is no need for a rollback journal or for waiting on fsync
+BUILD_PRAGMAS: Tuple[str, ...] = (
+    "PRAGMA journal_mode = OFF",
+    "PRAGMA synchronous = OFF",
+    "PRAGMA cache_size = -262144",  # 256 MiB
+    "PRAGMA locking_mode = EXCLUSIVE",
+    "PRAGMA temp_store = MEMORY",
+)
+
+
+def create_build_engine(database: str = DATABASE_FILE) -> Engine:
+    """
+    Returns an engine whose connections are set up for bulk loading.
+    """
+    engine: Engine = create_engine(f"sqlite:///{database}", future=True)
+
+    @event.listens_for(engine, "connect")
+    def set_build_pragmas(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        for pragma in BUILD_PRAGMAS:
+            cursor.execute(pragma)
+        cursor.close()
+
+    return engine
+
+
+def create_tables(engine: Engine, *tables: Table) -> None:
+    """
+    Creates the tables (if they don't exist) without their indexes.
+    """
+    with engine.begin() as connection:
+        for table in tables:
+            if not engine.dialect.has_table(connection, table.name):
+                connection.execute(CreateTable(table))
+
+
+def create_indexes(engine: Engine, *tables: Table) -> None:
+    """
+    Creates the indexes declared on the tables. Done after the load so
+    each index is built once instead of being updated for every row.
+    """
+    with engine.begin() as connection:
+        for table in tables:
+            for index in table.indexes:
+                index.create(connection, checkfirst=True)
+
+
+def chunked(records: Iterable[Any], chunk_size: int = CHUNK_SIZE) -> Iterator[List[Any]]:
+    """
+    Splits an iterable into lists of at most chunk_size items.
+    """
+    iterator: Iterator[Any] = iter(records)
+    while True:
+        chunk: List[Any] = list(islice(iterator, chunk_size))
+        if not chunk:
+            return
+        yield chunk
+
+
+def bulk_insert(
+    engine: Engine, table: Table, records: Iterable[Dict[str, Any]], chunk_size: int = CHUNK_SIZE
+) -> int:
+    """
+    Inserts the records into the table with one executemany call per chunk,
+    all inside a single transaction. Returns the number of rows inserted.
+    """
+    n_rows: int = 0
+    with engine.begin() as connection:
+        for chunk in chunked(records, chunk_size):
+            connection.execute(insert(table), chunk)
+            n_rows += len(chunk)
+    return n_rows
+
+
+def report(name: str, n_rows: int, seconds: float) -> None:
+    """
+    Prints how many rows were loaded and how fast.
+    """
+    rate: float = n_rows / seconds if seconds else float("inf")
+    print(f"{name}: {n_rows} rows in {seconds:.2f}s ({rate:,.0f} rows/sec)")
+
+
+def table_checksum(engine: Engine, table: Table) -> str:
+    """
+    Returns a SHA-256 checksum of every row of the table, taken in primary
+    key order. Two builds with the same checksum have identical rows.
+    """
+    checksum = sha256()
+    with engine.connect() as connection:
+        rows = connection.execute(select(table).order_by(*table.primary_key.columns))
+        for row in rows:
+            checksum.update(repr(tuple(row)).encode("utf-8"))
+    return checksum.hexdigest()
@@ -0,0 +1,72 @@
+"""
+Makes up a CEDICT file from the repository's data files, for the tests
+of the build scripts and for the benchmarks' fixture database (see
+benchmarks.fixture): the repository doesn't ship CEDICT. The entries are
+the most frequent words of internet-zh.num whose characters are all in
+character_data.txt, with the pinyin and definitions of their characters.
+"""
+import json
+import os
+from typing import Dict, Iterator, List, Tuple
+
+from cnlearn.search.pinyin import normalize_letters
+
+
+DICT_DIRECTORY: str = os.path.dirname(os.path.abspath(__file__))
+CHARACTER_FILE: str = os.path.join(DICT_DIRECTORY, "files", "character_data.txt")
+FREQ_FILE: str = os.path.join(DICT_DIRECTORY, "files", "internet-zh.num")
+# where the build scripts read CEDICT from, relative to their directory
+CEDICT_FILE: str = os.path.join("files", "cedict_1_0_ts_utf-8_mdbg.txt")
+DEFAULT_WORDS: int = 5000
+
+
+def numbered_syllable(syllable: str) -> str:
+    """
+    Turns a syllable with a tone mark (e.g. "hǎo") into CEDICT's numbered
+    pinyin ("hao3"), the neutral tone being 5.
+    """
+    spelling, tones = normalize_letters(syllable)
+    return f"{spelling}{next((tone for tone in tones if tone), 5)}"
+
+
+def corpus_words() -> Iterator[str]:
+    """
+    Yields the words of internet-zh.num, most frequent first.
+    """
+    with open(FREQ_FILE, encoding="utf-8") as frequency_file:
+        for line in frequency_file:
+            fields: List[str] = line.split()
+            if len(fields) == 3 and fields[0].isdigit():
+                yield fields[2]
+
+
+def generated_cedict(n_words: int = DEFAULT_WORDS) -> List[str]:
+    """
+    Returns the lines of a CEDICT file made up from the repository's data
+    files: an entry per reading of the single characters and, for longer
+    words, one with the first reading and definition of each character.
+    """
+    characters: Dict[str, Tuple[List[str], str]] = {}
+    with open(CHARACTER_FILE, encoding="utf-8") as character_file:
+        for line in character_file:
+            data = json.loads(line)
+            if data["pinyin"] and data.get("definition"):
+                # keep the CEDICT line format intact
+                definition: str = data["definition"].replace("/", ";").replace("[", "(").replace("]", ")")
+                characters[data["character"]] = (data["pinyin"], definition)
+    lines: List[str] = []
+    for word in corpus_words():
+        if len(lines) >= n_words:
+            break
+        if not all(character in characters for character in word):
+            continue
+        if len(word) == 1:
+            readings, definition = characters[word]
+            lines.extend(
+                f"{word} {word} [{numbered_syllable(reading)}] /{definition}/" for reading in readings
+            )
+        else:
+            pinyin: str = " ".join(numbered_syllable(characters[character][0][0]) for character in word)
+            definition = "; ".join(characters[character][1].split(",")[0] for character in word)
+            lines.append(f"{word} {word} [{pinyin}] /{definition}/")
+    return lines[:n_words]
@@ -1,32 +1,41 @@
-from typing import Union, Dict, List
+from typing import Union, Dict, Iterable, List, Tuple
+
+from cnlearn.search.pinyin import SYLLABLES
+
+# the list below is a list of vowels that appear in the CEDICT pinyin
+VOWELS: List[str] = ["a", "e", "i", "o", "u", "u:", "A", "E", "I", "O", "U", "U:"]
+# the single letter vowels, used to find the last vowel of a syllable
+VOWEL_LETTERS: str = "aeiouAEIOU"
+# the dictionary below will convert the vowels to vowels with accents
+# depening on their tone as specified at the end of the word
+VOWEL_DICT: Dict[int, List[str]] = {
+    1: ["ā", "ē", "ī", "ō", "ū", "ǖ", "Ā", "Ē", "Ī", "Ō", "Ū", "Ǖ"],
+    2: ["á", "é", "í", "ó", "ú", "ǘ", "Á", "É", "Í", "Ó", "Ú", "Ǘ"],
+    3: ["ǎ", "ě", "ǐ", "ǒ", "ǔ", "ǚ", "Ǎ", "Ě", "Ǐ", "Ǒ", "Ǔ", "Ǚ"],
+    4: ["à", "è", "ì", "ò", "ù", "ǜ", "À", "È", "Ì", "Ò", "Ù", "Ǜ"],
+    5: ["a", "e", "i", "o", "u", "ü", "A", "E", "I", "O", "U", "Ü"],
+}
+# the following vowels/pairs always get the marker
+MARKED_VOWELS: List[str] = ["a", "e", "ou"]
+
 
 def convert_to_pinyin_accent(word: str) -> str:
     """
     This function converts a pinyin with numbers to pinyin with accents.
+    It works out the accent from the spelling, convert_pinyin uses the
+    precomputed ACCENT_TABLE instead for any syllable in SYLLABLES.
     """
-    # the list below is a list of vowels that appear in the CEDICT pinyin
-    vowels: List[str] = ["a", "e", "i", "o", "u", "u:", "A", "E", "I", "O", "U", "U:"]
-    # the dictionary below will convert the vowels to vowels with accents
-    # depening on their tone as specified at the end of the word
-    vowel_dict: Dict[int, List[str]] = {
-        1: ["ā", "ē", "ī", "ō", "ū", "ǖ", "Ā", "Ē", "Ī", "Ō", "Ū", "Ǖ"],
-        2: ["á", "é", "í", "ó", "ú", "ǘ", "Á", "É", "Í", "Ó", "Ú", "Ǘ"],
-        3: ["ǎ", "ě", "ǐ", "ǒ", "ǔ", "ǚ", "Ǎ", "Ě", "Ǐ", "Ǒ", "Ǔ", "Ǚ"],
-        4: ["à", "è", "ì", "ò", "ù", "ǜ", "À", "È", "Ì", "Ò", "Ù", "Ǜ"],
-        5: ["a", "e", "i", "o", "u", "ü", "A", "E", "I", "O", "U", "Ü"],
-    }
     tone: int = ord(word[-1]) - 48
     pos: Union[int, None]
     pinyin_word: str
     if 0 < tone < 6:
         word_without_tone = word[0:-1]
         if tone < 5:
-            # the following vowels/pairs always get the marker
-            search_list: List[str] = ["a", "e", "ou"]
-            # check if the word_without_tone has any of them
-            found: List[bool] = [vowel in word_without_tone for vowel in search_list]
+            # check if the word_without_tone has any of the vowels that
+            # always get the marker
+            found: List[bool] = [vowel in word_without_tone for vowel in MARKED_VOWELS]
             if any(found):
-                vowel: str = search_list[found.index(True)]
+                vowel: str = MARKED_VOWELS[found.index(True)]
                 pos = word_without_tone.find(vowel)
             else:
                 pos = last_vowel(word_without_tone)
@@ -43,13 +52,14 @@ def convert_to_pinyin_accent(word: str) -> str:
                 except IndexError:
                     to_replace = word_without_tone[pos : pos + 1]
                 pinyin_word = word_without_tone.replace(
-                    to_replace, vowel_dict[tone][vowels.index(to_replace)]
+                    to_replace, VOWEL_DICT[tone][VOWELS.index(to_replace)]
                 )
             else:
                 pinyin_word = word_without_tone
         else:
-            pinyin_word = word_without_tone.replace("u:", "ü")
-            pinyin_word = word_without_tone.replace("U:", "Ü")
+            pinyin_word = word_without_tone
+        # a u: that didn't get the marker (e.g. lu:e4 or nu:5) is still a ü
+        pinyin_word = pinyin_word.replace("u:", "ü").replace("U:", "Ü")
     else:
         pinyin_word = word
     return pinyin_word
@@ -73,16 +83,45 @@ def last_vowel(word: str) -> Union[int, None]:
     """
     This function returns the position of the last vowel in a word.
     """
-    # another way to reverse a string is ''.join(list(reversed(word)))
-    vowels: List[str] = ["a", "e", "i", "o", "u", "u:", "A", "E", "I", "O", "U", "U:"]
-    reverse_word: str = word[::-1]
-    for character in reverse_word:
-        for vowel in vowels:
-            if vowel in character:
-                return word.find(vowel)
+    for character in reversed(word):
+        if character in VOWEL_LETTERS:
+            return word.find(character)
     return None
 
 
+def build_syllable_tables() -> Tuple[Dict[str, str], Dict[str, str]]:
+    """
+    Precomputes the accent and clean versions of every numbered syllable
+    (all five tones, lower case and capitalised) so that converting them
+    is a dictionary lookup.
+    """
+    accent_table: Dict[str, str] = {}
+    clean_table: Dict[str, str] = {}
+    for syllable in SYLLABLES:
+        for spelling in (syllable, syllable.capitalize()):
+            for tone in range(1, 6):
+                numbered: str = f"{spelling}{tone}"
+                accent_table[numbered] = convert_to_pinyin_accent(numbered)
+                clean_table[numbered] = convert_to_pinyin_clean(numbered)
+    return accent_table, clean_table
+
+
+ACCENT_TABLE, CLEAN_TABLE = build_syllable_tables()
+
+
+def convert_syllable(syllable: str, flag: str) -> str:
+    """
+    Converts a single numbered syllable, looking it up in the precomputed
+    tables and only working it out for anything that isn't in them
+    (letters, punctuation, placeholders like xx5).
+    """
+    if flag == "accent":
+        converted = ACCENT_TABLE.get(syllable)
+        return converted if converted is not None else convert_to_pinyin_accent(syllable)
+    converted = CLEAN_TABLE.get(syllable)
+    return converted if converted is not None else convert_to_pinyin_clean(syllable)
+
+
 def convert_pinyin(
     item: Union[str, List[str]], flag: str
 ) -> Union[str, List[str], None]:
@@ -92,14 +131,24 @@ def convert_pinyin(
     """
     if flag in ("accent", "clean"):
         if isinstance(item, str):
-            if flag == "accent":
-                return convert_to_pinyin_accent(item)
-            # flag is clean
-            return convert_to_pinyin_clean(item)
+            return convert_syllable(item, flag)
         if isinstance(item, list):
-            pinyin_list: List = []
-            for i in item:
-                pinyin_list.append(convert_pinyin(i, flag))
-            return pinyin_list
+            return [convert_pinyin(i, flag) for i in item]
         raise ValueError("Text must be a string or list of strings.")
     raise ValueError("Flag must be `accent` or `clean`.")
+
+
+def convert_pinyin_string(pinyin: str, flag: str) -> str:
+    """
+    Converts a whole space separated pinyin string, e.g. "bu4 hao3 yi4 si5".
+    """
+    if flag not in ("accent", "clean"):
+        raise ValueError("Flag must be `accent` or `clean`.")
+    return " ".join(convert_syllable(syllable, flag) for syllable in pinyin.split())
+
+
+def convert_pinyin_strings(pinyin_strings: Iterable[str], flag: str) -> List[str]:
+    """
+    Converts several space separated pinyin strings.
+    """
+    return [convert_pinyin_string(pinyin, flag) for pinyin in pinyin_strings]
@@ -0,0 +1,42 @@
+import os
+import re
+import shutil
+import subprocess
+import sys
+
+from .cedict_fixture import CEDICT_FILE, DICT_DIRECTORY, generated_cedict
+
+
+def words_checksum(directory: str, workers: int) -> str:
+    """
+    Builds the words table in directory with add_words.py and returns
+    its checksum.
+    """
+    database: str = os.path.join(directory, "dictionary.db")
+    if os.path.exists(database):
+        os.remove(database)
+    output: str = subprocess.run(
+        [sys.executable, "add_words.py", "--workers", str(workers), "--checksum"],
+        cwd=directory,
+        check=True,
+        capture_output=True,
+        text=True,
+    ).stdout
+    return re.search(r"words checksum: (\w+)", output).group(1)
+
+
+def test_workers_build_the_same_table(tmp_path):
+    """
+    Parsing the fixture CEDICT with a process pool inserts the same rows
+    as parsing it in the writer's process. The fixture is large enough
+    to be split into several chunks.
+    """
+    directory: str = str(tmp_path / "build")
+    shutil.copytree(
+        DICT_DIRECTORY,
+        directory,
+        ignore=shutil.ignore_patterns("__pycache__", "*.db", "jieba*", os.path.basename(CEDICT_FILE)),
+    )
+    with open(os.path.join(directory, CEDICT_FILE), "w", encoding="utf-8") as cedict_file:
+        cedict_file.write("# CC-CEDICT test fixture\n" + "\n".join(generated_cedict(5000)) + "\n")
+    assert words_checksum(directory, workers=1) == words_checksum(directory, workers=2)
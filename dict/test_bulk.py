@@ -0,0 +1,82 @@
+import pytest
+from sqlalchemy import func, inspect, select
+from sqlalchemy.engine import Engine
+
+from .bulk import (
+    bulk_insert,
+    chunked,
+    create_build_engine,
+    create_indexes,
+    create_tables,
+    table_checksum,
+)
+from .db import Character, Word
+
+
+@pytest.fixture
+def build_engine(tmp_path) -> Engine:
+    """
+    Returns a build engine bound to an empty database.
+    """
+    engine: Engine = create_build_engine(str(tmp_path / "dictionary.db"))
+    yield engine
+    engine.dispose()
+
+
+@pytest.mark.parametrize("n_items,chunk_size,sizes", [(0, 3, []), (7, 3, [3, 3, 1]), (6, 3, [3, 3])])
+def test_chunked(n_items: int, chunk_size: int, sizes):
+    assert [len(chunk) for chunk in chunked(range(n_items), chunk_size)] == sizes
+
+
+def test_bulk_insert(build_engine: Engine):
+    create_tables(build_engine, Character.__table__)
+    assert inspect(build_engine).get_indexes("characters") == []
+    records = (
+        dict(
+            character=character,
+            definition=None,
+            pinyin="",
+            decomposition=None,
+            etymology={"type": "ideographic"} if index % 2 else None,
+            radical=character,
+            matches="[]",
+            frequency=index,
+        )
+        for index, character in enumerate("一二三四五六七")
+    )
+    assert bulk_insert(build_engine, Character.__table__, records, chunk_size=3) == 7
+    create_indexes(build_engine, Character.__table__)
+    with build_engine.connect() as connection:
+        assert connection.execute(select(func.count()).select_from(Character.__table__)).scalar() == 7
+        etymology = connection.execute(
+            select(Character.etymology).where(Character.character == "二")
+        ).scalar()
+    assert etymology == {"type": "ideographic"}
+    index_names = {index["name"] for index in inspect(build_engine).get_indexes("characters")}
+    assert index_names == {"ix_characters_character"}
+
+
+def test_create_tables_only_creates_requested(build_engine: Engine):
+    create_tables(build_engine, Word.__table__)
+    create_tables(build_engine, Word.__table__)
+    assert inspect(build_engine).get_table_names() == ["words"]
+
+
+def test_table_checksum(tmp_path):
+    """
+    Two tables with the same rows have the same checksum, whatever order
+    they were inserted in, and dropping a row changes it.
+    """
+    records = [
+        dict(id=index, simplified=simplified, pinyin_clean=pinyin, frequency=index)
+        for index, (simplified, pinyin) in enumerate([("好", "hao"), ("不", "bu"), ("是", "shi")], start=1)
+    ]
+    checksums = []
+    for name, ordered_records in [("a", records), ("b", records[::-1]), ("c", records[:-1])]:
+        engine: Engine = create_build_engine(str(tmp_path / f"{name}.db"))
+        create_tables(engine, Word.__table__)
+        bulk_insert(engine, Word.__table__, ordered_records)
+        checksums.append(table_checksum(engine, Word.__table__))
+        engine.dispose()
+    assert checksums[0] == checksums[1]
+    assert checksums[0] != checksums[2]
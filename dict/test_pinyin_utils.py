@@ -0,0 +1,55 @@
+import pytest
+
+from .pinyin_utils import (
+    ACCENT_TABLE,
+    CLEAN_TABLE,
+    convert_pinyin,
+    convert_pinyin_string,
+    convert_pinyin_strings,
+    convert_to_pinyin_accent,
+    convert_to_pinyin_clean,
+)
+
+
+def test_tables_match_conversion():
+    """
+    The precomputed tables hold the same values the conversion
+    functions work out from the spelling.
+    """
+    assert len(ACCENT_TABLE) == len(CLEAN_TABLE) > 4000
+    for numbered, accent in ACCENT_TABLE.items():
+        assert accent == convert_to_pinyin_accent(numbered)
+        assert CLEAN_TABLE[numbered] == convert_to_pinyin_clean(numbered)
+
+
+@pytest.mark.parametrize(
+    "numbered,accent",
+    [
+        ("hao3", "hǎo"),
+        ("Yi4", "Yì"),
+        ("si5", "si"),
+        ("lu:4", "lǜ"),
+        ("nu:3", "nǚ"),
+        ("lu:e4", "lüè"),
+        ("lu:5", "lü"),
+        ("Lu:5", "Lü"),
+        ("NU:5", "NÜ"),
+        ("xx5", "xx"),
+        ("B", "B"),
+        ("·", "·"),
+    ],
+)
+def test_convert_syllables(numbered: str, accent: str):
+    assert convert_pinyin(numbered, "accent") == accent
+
+
+def test_convert_pinyin_string():
+    assert convert_pinyin_string("bu4 hao3 yi4 si5", "accent") == "bù hǎo yì si"
+    assert convert_pinyin_string("bu4 hao3 yi4 si5", "clean") == "bu hao yi si"
+    assert convert_pinyin_string("U S B ji4 yi4 bang4", "accent") == "U S B jì yì bàng"
+    assert convert_pinyin_strings(["wo3 men5", "Yi4 da4 li4"], "accent") == ["wǒ men", "Yì dà lì"]
+
+
+@pytest.mark.xfail(raises=ValueError)
+def test_convert_pinyin_string_wrong_flag():
+    convert_pinyin_string("hao3", "country")
@@ -0,0 +1,129 @@
+"""
+This module fills the tables derived from the words table: the
+component characters of the words, so that searching a word doesn't
+have to work them out, and the character postings used to find the
+words containing some characters. It is used by dict/add_components.py
+and dict/add_postings.py when the database is built and by
+cnlearn.db.upgrade for databases built before.
+"""
+import string
+from collections import defaultdict
+from itertools import islice
+from typing import Any, DefaultDict, Dict, Iterable, Iterator, List, Optional, Tuple
+
+from sqlalchemy import Table, delete, func, insert, select, update
+from sqlalchemy.engine import Connection
+
+from cnlearn.db.models import Character, CharacterPosting, Word, WordComponent
+from cnlearn.search.textutils import extract_chinese_characters
+
+
+# number of rows inserted per statement
+CHUNK_SIZE: int = 10000
+# lower cases the ASCII letters only, the ones LIKE matches whatever their case
+ASCII_FOLD: Dict[int, int] = str.maketrans(string.ascii_uppercase, string.ascii_lowercase)
+
+
+def fold_ascii(text: str) -> str:
+    """
+    Lower cases the ASCII letters of text, like the character postings.
+    """
+    return text.translate(ASCII_FOLD)
+
+
+def link_characters(connection: Connection) -> int:
+    """
+    Sets character_id on every single character word that has a row in
+    the characters table. Returns the number of words updated.
+    """
+    character_id = (
+        select(func.min(Character.id)).where(Character.character == Word.simplified).scalar_subquery()
+    )
+    result = connection.execute(
+        update(Word.__table__).where(func.length(Word.simplified) == 1).values(character_id=character_id)
+    )
+    return result.rowcount
+
+
+def component_records(
+    words: Iterable[Tuple[int, str, Optional[str]]],
+    character_words: Iterable[Tuple[int, str, Optional[str], int]],
+) -> Iterator[Dict[str, int]]:
+    """
+    Yields the word_components rows of the words.
+    - words are (id, simplified, pinyin_accent) tuples
+    - character_words are the (id, simplified, pinyin_accent, character_id)
+      tuples of the single character words, most frequent first
+    Each character of a word is paired with the syllable in the same
+    position. The single character words with that pinyin are its
+    components; if there are none, all the ones for the character are.
+    """
+    by_character: DefaultDict[str, List[Tuple[int, Optional[str], int]]] = defaultdict(list)
+    for word_id, simplified, pinyin_accent, character_id in character_words:
+        by_character[simplified].append((word_id, pinyin_accent, character_id))
+    for word_id, simplified, pinyin_accent in words:
+        syllables: List[str] = pinyin_accent.split() if pinyin_accent else []
+        for position, (character, syllable) in enumerate(zip(extract_chinese_characters(simplified), syllables)):
+            candidates = by_character.get(character, [])
+            matching = [candidate for candidate in candidates if candidate[1] == syllable]
+            for char_word_id, _, character_id in matching or candidates:
+                yield dict(
+                    word_id=word_id, position=position, char_word_id=char_word_id, character_id=character_id
+                )
+
+
+def build_word_components(connection: Connection, chunk_size: int = CHUNK_SIZE) -> int:
+    """
+    Fills the word_components table for all the multiple character words,
+    replacing whatever was in it. link_characters must have been run
+    first. Returns the number of rows inserted.
+    """
+    connection.execute(delete(WordComponent.__table__))
+    character_words = connection.execute(
+        select(Word.id, Word.simplified, Word.pinyin_accent, Word.character_id)
+        .where(Word.character_id.isnot(None))
+        .order_by(Word.frequency, Word.id)
+    ).all()
+    words = connection.execute(
+        select(Word.id, Word.simplified, Word.pinyin_accent).where(func.length(Word.simplified) > 1)
+    ).all()
+    records: Iterator[Dict[str, int]] = component_records(words, character_words)
+    return insert_records(connection, WordComponent.__table__, records, chunk_size)
+
+
+def posting_records(words: Iterable[Tuple[int, str, Optional[int]]]) -> Iterator[Dict[str, Any]]:
+    """
+    Yields the character_postings rows of the words, given as (id,
+    simplified, frequency) tuples: one for each distinct character, the
+    ASCII letters in lower case (see fold_ascii).
+    """
+    for word_id, simplified, frequency in words:
+        for character in dict.fromkeys(fold_ascii(simplified or "")):
+            yield dict(character=character, frequency=frequency or 0, word_id=word_id)
+
+
+def build_character_postings(connection: Connection, chunk_size: int = CHUNK_SIZE) -> int:
+    """
+    Fills the character_postings table, replacing whatever was in it.
+    Returns the number of rows inserted.
+    """
+    connection.execute(delete(CharacterPosting.__table__))
+    words = connection.execute(select(Word.id, Word.simplified, Word.frequency)).all()
+    return insert_records(connection, CharacterPosting.__table__, posting_records(words), chunk_size)
+
+
+def insert_records(
+    connection: Connection, table: Table, records: Iterable[Dict[str, Any]], chunk_size: int = CHUNK_SIZE
+) -> int:
+    """
+    Inserts the records chunk_size at a time, so they don't all have to be
+    in memory at once. Returns the number of rows inserted.
+    """
+    records = iter(records)
+    n_rows: int = 0
+    while True:
+        chunk: List[Dict[str, Any]] = list(islice(records, chunk_size))
+        if not chunk:
+            return n_rows
+        connection.execute(insert(table), chunk)
+        n_rows += len(chunk)
@@ -1,67 +1,227 @@
-from sqlalchemy.orm import Session
-from sqlalchemy import and_
-from sqlalchemy import select
+from sqlalchemy.orm import Session, aliased
+from sqlalchemy import func, inspect, literal_column, select, tuple_
 from sqlalchemy.sql.selectable import Select
 from sqlalchemy.engine import ChunkedIteratorResult, Row
-from cnlearn.db.models import Word, Character
-from typing import List
+from sqlalchemy.exc import OperationalError
+from cnlearn.db.components import fold_ascii
+from cnlearn.db.fts import FTS_TABLE, MissingDefinitionsIndex, definitions_fts, has_definitions_index
+from cnlearn.db.models import BuildInfo, Word, CharacterPosting
+from cnlearn.db.selects import (
+    group_words_and_characters,
+    select_simplified_character,
+    select_simplified_word,
+    select_word_and_character,
+    select_words_and_characters,
+    select_words_by_pinyin,
+    select_words_with_components,
+)
+from cnlearn.search.frequency import FALLBACK_MARGIN
+from typing import List, Optional, Sequence, Tuple
+
+# the build_info name of the frequency of the words that aren't in the corpus
+FALLBACK_FREQUENCY: str = "fallback_frequency"
+
+# The lookups below with a select_* function (see cnlearn.db.selects)
+# building their statement also have a precompiled version in
+# cnlearn.db.statements, whose rows hold namedtuple records rather than
+# ORM objects. The functions here always return ORM objects.
 
 
 def get_simplified_word(
     db: Session, simplified: str, pinyin_clean: str = None
 ) -> List[Row]:
-    word_selection: Select = (
-        select(Word).where(Word.simplified == simplified).order_by(Word.frequency)
-    )
-    if pinyin_clean:
-        word_selection = word_selection.where(Word.pinyin_clean == pinyin_clean)
+    word_selection: Select = select_simplified_word(simplified, pinyin_clean or None)
     result: ChunkedIteratorResult = db.execute(word_selection)
     words: List[Row] = result.all()
     return words
 
 
 def get_simplified_word_containing_char(
-    db: Session, simplified: str, pinyin_clean: str = None
+    db: Session,
+    simplified: str,
+    pinyin_clean: str = None,
+    limit: Optional[int] = None,
+    after: Optional[Tuple[int, int]] = None,
 ) -> List[Row]:
-    word_selection: Select = (
-        select(Word)
-        .where(Word.simplified.contains(simplified))
-        .order_by(Word.frequency)
-    )
+    """
+    Fetches the words whose simplified form contains the given string,
+    ordered by frequency. Instead of scanning all the words, the words are
+    found in the character_postings table: those containing every
+    character of the string, which are then checked to contain the string
+    itself. Like the LIKE it used to be, ASCII letters match whatever
+    their case.
+    - limit is the maximum number of words returned
+    - after is the (frequency, id) of the last word of the previous page,
+      to get the words that come after it
+    """
+    word_selection: Select = select(Word)
+    if simplified:
+        # the postings of ASCII letters are lower case
+        characters: List[str] = list(dict.fromkeys(fold_ascii(simplified)))
+        first_posting = aliased(CharacterPosting)
+        word_selection = (
+            word_selection.join(first_posting, first_posting.word_id == Word.id)
+            .where(first_posting.character == characters[0])
+            .order_by(first_posting.frequency, first_posting.word_id)
+        )
+        for character in characters[1:]:
+            word_selection = word_selection.where(
+                Word.id.in_(
+                    select(CharacterPosting.word_id).where(CharacterPosting.character == character)
+                )
+            )
+        if len(simplified) > 1:
+            word_selection = word_selection.where(Word.simplified.contains(simplified))
+        if after is not None:
+            word_selection = word_selection.where(
+                tuple_(first_posting.frequency, first_posting.word_id) > tuple_(*after)
+            )
+    else:
+        # every word contains the empty string
+        word_selection = word_selection.order_by(Word.frequency, Word.id)
+        if after is not None:
+            word_selection = word_selection.where(tuple_(Word.frequency, Word.id) > tuple_(*after))
     if pinyin_clean:
         word_selection = word_selection.where(Word.pinyin_clean.contains(pinyin_clean))
+    if limit is not None:
+        word_selection = word_selection.limit(limit)
     result: ChunkedIteratorResult = db.execute(word_selection)
     words: List[Row] = result.all()
     return words
 
 
 def get_simplified_character(db: Session, simplified: str) -> Row:
-    character: Row = db.execute(
-        select(Character).where(Character.character == simplified)
-    ).first()
+    character: Row = db.execute(select_simplified_character(simplified)).first()
     return character
 
 
 def get_word_and_character(
     db: Session, simplified: str, pinyin_clean: str = None, pinyin_accent: str = None
 ) -> Row:
-    word_and_character_select: Select = (
-        select(Word, Character)
-        .where(
-            and_(
-                Word.simplified == simplified,
-                Word.simplified == Character.character,
-            )
-        )
-        .order_by(Word.frequency)
+    word_and_character_select: Select = select_word_and_character(
+        simplified, pinyin_clean or None, pinyin_accent or None
     )
-    if pinyin_clean:
-        word_and_character_select = word_and_character_select.where(
-            Word.pinyin_clean == pinyin_clean
-        )
-    if pinyin_accent:
-        word_and_character_select = word_and_character_select.where(
-            Word.pinyin_accent == pinyin_accent
-        )
     word_and_character: List[Row] = db.execute(word_and_character_select).all()
     return word_and_character
+
+
+def get_words_and_characters_bulk(
+    db: Session, characters: Sequence[Tuple[str, Optional[str]]]
+) -> List[List[Row]]:
+    """
+    Batched version of get_word_and_character. It takes a sequence of
+    (simplified, pinyin_accent) pairs and fetches the Word and Character
+    rows for all of them in a single query. For each pair, the rows whose
+    pinyin_accent matches are returned; if none match (or the pinyin is
+    None), all the rows for that character are returned instead.
+    The results are returned in the same order as the pairs.
+    """
+    unique_characters: List[str] = list(dict.fromkeys(simplified for simplified, _ in characters))
+    if not unique_characters:
+        return []
+    rows: List[Row] = db.execute(select_words_and_characters(unique_characters)).all()
+    return group_words_and_characters(characters, rows)
+
+
+def get_word_with_components(db: Session, simplified: str) -> List[Row]:
+    """
+    Fetches the words with the given simplified form along with their
+    component characters (from the word_components table) in one query.
+    There is a (Word, component Word, Character) row for each component,
+    in position order, and a (Word, None, None) row for a word without
+    components. The words are ordered by frequency.
+    """
+    word_selection: Select = select_words_with_components().where(Word.simplified == simplified)
+    return db.execute(word_selection).all()
+
+
+def get_words_with_components_bulk(db: Session, simplified: Sequence[str]) -> List[Row]:
+    """
+    Batched version of get_word_with_components: the rows of the words
+    with any of the given simplified forms, in one query.
+    """
+    unique_simplified: List[str] = list(dict.fromkeys(simplified))
+    if not unique_simplified:
+        return []
+    word_selection: Select = select_words_with_components().where(Word.simplified.in_(unique_simplified))
+    return db.execute(word_selection).all()
+
+
+def get_words_by_definition(db: Session, match_query: str, limit: int) -> List[Row]:
+    """
+    Full text search of the definitions. match_query is an FTS5 query
+    (see cnlearn.db.fts.fts_query). Returns up to limit (Word, score)
+    rows, best bm25 score (the lowest) first. Raises
+    MissingDefinitionsIndex if the database doesn't have the FTS5 table.
+    """
+    score = func.bm25(literal_column(FTS_TABLE)).label("score")
+    word_selection: Select = (
+        select(Word, score)
+        .join(definitions_fts, definitions_fts.c.rowid == Word.id)
+        .where(literal_column(FTS_TABLE).op("MATCH")(match_query))
+        .order_by(score, Word.id)
+        .limit(limit)
+    )
+    try:
+        return db.execute(word_selection).all()
+    except OperationalError as error:
+        if not has_definitions_index(db.connection()):
+            raise MissingDefinitionsIndex() from error
+        raise
+
+
+def get_words_by_pinyin(
+    db: Session,
+    pinyin_clean: Sequence[str],
+    fallback_frequency: Optional[int] = None,
+    limit: Optional[int] = None,
+    offset: int = 0,
+) -> List[Row]:
+    """
+    Fetches the words whose pinyin_clean is one of the given ones, in
+    lower case with the syllables separated by spaces (e.g. "xi an"), most
+    frequent first. It uses the index on lower(pinyin_clean).
+    - fallback_frequency is that of the words that aren't in the frequency
+      corpus (see get_fallback_frequency), which then come last
+    - limit is the maximum number of words returned, after skipping the
+      first offset ones
+    """
+    if not pinyin_clean:
+        return []
+    return db.execute(select_words_by_pinyin(pinyin_clean, fallback_frequency, limit, offset or None)).all()
+
+
+def get_fallback_frequency(db: Session) -> Optional[int]:
+    """
+    Returns the frequency the words that aren't in the frequency corpus
+    were given when the database was built, or None if there are none.
+    It is recorded in build_info; for a database built before that it is
+    guessed (see guess_fallback_frequency).
+    """
+    if not inspect(db.connection()).has_table(BuildInfo.__tablename__):
+        return guess_fallback_frequency(db)
+    value: Optional[str] = db.execute(
+        select(BuildInfo.value).where(BuildInfo.name == FALLBACK_FREQUENCY)
+    ).scalar()
+    return int(value) if value is not None else None
+
+
+def guess_fallback_frequency(db: Session) -> Optional[int]:
+    """
+    Guesses the frequency given to the words that aren't in the corpus:
+    the highest frequency, if more than one word has it and it is at
+    least FALLBACK_MARGIN above the next one, as the fallback is. Returns
+    None otherwise.
+    """
+    highest: Optional[int] = db.execute(select(func.max(Word.frequency))).scalar()
+    if highest is None:
+        return None
+    n_words: int = db.execute(
+        select(func.count(func.distinct(Word.simplified))).where(Word.frequency == highest)
+    ).scalar()
+    next_highest: Optional[int] = db.execute(
+        select(func.max(Word.frequency)).where(Word.frequency < highest)
+    ).scalar()
+    if n_words > 1 and (next_highest is None or highest - next_highest >= FALLBACK_MARGIN):
+        return highest
+    return None
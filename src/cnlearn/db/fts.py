@@ -0,0 +1,75 @@
+"""
+This module manages the full text index over the English definitions of
+the words, an SQLite FTS5 table used for English to Chinese searches.
+It is created by dict/add_fts.py when the database is built and by
+cnlearn.db.upgrade for databases built before.
+"""
+import re
+from typing import List, Pattern
+
+from sqlalchemy import column, inspect, table, text
+from sqlalchemy.engine import Connection
+
+
+FTS_TABLE: str = "definitions_fts"
+# porter stems English words so embarrassed matches embarrassing
+FTS_TOKENIZERS: List[str] = ["porter", "unicode61"]
+DEFAULT_FTS_TOKENIZER: str = "porter"
+
+definitions_fts = table(FTS_TABLE, column("rowid"), column("definitions"))
+
+TERM_PATTERN: Pattern = re.compile(r"\w+")
+
+
+class MissingDefinitionsIndex(RuntimeError):
+    """
+    Raised by the English searches when the database was built without
+    the full text index of the definitions.
+    """
+
+    def __init__(self):
+        super().__init__(
+            f"The database has no {FTS_TABLE} table for English searches, "
+            "run python -m cnlearn.db.upgrade to add it."
+        )
+
+
+def fts5_available(connection: Connection) -> bool:
+    """
+    Returns whether the SQLite library was compiled with FTS5.
+    """
+    return bool(connection.execute(text("SELECT sqlite_compileoption_used('ENABLE_FTS5')")).scalar())
+
+
+def has_definitions_index(connection: Connection) -> bool:
+    return inspect(connection).has_table(FTS_TABLE)
+
+
+def create_definitions_index(connection: Connection, tokenizer: str = DEFAULT_FTS_TOKENIZER) -> None:
+    """
+    (Re)creates the FTS5 table over words.definitions and fills it. It is
+    an external content table, so it only stores the index and reads the
+    definitions from the words table.
+    - tokenizer is one of FTS_TOKENIZERS
+    """
+    if tokenizer not in FTS_TOKENIZERS:
+        raise ValueError(f"tokenizer must be one of {', '.join(FTS_TOKENIZERS)}.")
+    tokenize: str = "porter unicode61" if tokenizer == "porter" else "unicode61"
+    connection.execute(text(f"DROP TABLE IF EXISTS {FTS_TABLE}"))
+    connection.execute(
+        text(
+            f"CREATE VIRTUAL TABLE {FTS_TABLE} USING fts5("
+            f"definitions, content='words', content_rowid='id', tokenize='{tokenize}')"
+        )
+    )
+    connection.execute(text(f"INSERT INTO {FTS_TABLE}({FTS_TABLE}) VALUES ('rebuild')"))
+
+
+def fts_query(query: str) -> str:
+    """
+    Turns free text into an FTS5 query matching definitions that contain
+    all of its words. Each word is quoted so that FTS5 operators and
+    punctuation in the text are taken literally. Returns "" if there are
+    no words in it.
+    """
+    return " ".join(f'"{term}"' for term in TERM_PATTERN.findall(query))
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, JSON
+from sqlalchemy import Column, ForeignKey, Index, Integer, String, JSON, func
 from sqlalchemy.orm import registry
 
 
@@ -8,6 +8,10 @@ mapper_registry = registry()
 @mapper_registry.mapped
 class Word:
     __tablename__ = "words"
+    __table_args__ = (
+        Index("ix_words_simplified_frequency", "simplified", "frequency"),
+        Index("ix_words_pinyin_clean_frequency", "pinyin_clean", "frequency"),
+    )
 
     id = Column(Integer, primary_key=True)
     simplified = Column(String(50))
@@ -21,14 +25,21 @@ class Word:
     classifiers = Column(String(100))
     definitions = Column(String(500))
     frequency = Column(Integer)
+    # the characters row of a single character word, None otherwise
+    character_id = Column(Integer, ForeignKey("characters.id"), nullable=True)
 
     def __repr__(self):
         return f"<Word(simplified='{self.simplified}', pinyin='{self.pinyin_accent}>'"
 
 
+# pinyin searches match the lower case pinyin_clean
+Index("ix_words_pinyin_clean_lower_frequency", func.lower(Word.pinyin_clean), Word.frequency)
+
+
 @mapper_registry.mapped
 class Character:
     __tablename__ = "characters"
+    __table_args__ = (Index("ix_characters_character", "character"),)
 
     id = Column(Integer, primary_key=True)
     character = Column(String(1))
@@ -41,4 +52,56 @@ class Character:
     frequency = Column(Integer)
 
     def __repr__(self):
-        return f"<Character({self.character}, radical='{self.radical})>"
\ No newline at end of file
+        return f"<Character({self.character}, radical='{self.radical})>"
+
+
+@mapper_registry.mapped
+class BuildInfo:
+    """
+    Values recorded when the database was built, by name, e.g. the
+    fallback_frequency given to the words that aren't in the frequency
+    corpus.
+    """
+    __tablename__ = "build_info"
+
+    name = Column(String(50), primary_key=True)
+    value = Column(String(100))
+
+    def __repr__(self):
+        return f"<BuildInfo({self.name}={self.value})>"
+
+
+@mapper_registry.mapped
+class WordComponent:
+    """
+    The component characters of a multiple character word. For each
+    character position, the single character words (and their characters
+    row) whose pinyin matches the word's, or all of them if none match.
+    """
+    __tablename__ = "word_components"
+
+    word_id = Column(Integer, ForeignKey("words.id"), primary_key=True)
+    position = Column(Integer, primary_key=True)
+    char_word_id = Column(Integer, ForeignKey("words.id"), primary_key=True)
+    character_id = Column(Integer, ForeignKey("characters.id"))
+
+    def __repr__(self):
+        return f"<WordComponent(word_id={self.word_id}, position={self.position}, char={self.char_word_id})>"
+
+
+@mapper_registry.mapped
+class CharacterPosting:
+    """
+    Inverted index of the words: a row for each distinct character of
+    each word. The primary key keeps the words containing a character in
+    frequency order.
+    """
+    __tablename__ = "character_postings"
+    __table_args__ = {"sqlite_with_rowid": False}
+
+    character = Column(String(1), primary_key=True)
+    frequency = Column(Integer, primary_key=True)
+    word_id = Column(Integer, ForeignKey("words.id"), primary_key=True)
+
+    def __repr__(self):
+        return f"<CharacterPosting({self.character}, word_id={self.word_id})>"
\ No newline at end of file
@@ -0,0 +1,128 @@
+"""
+This module builds the select statements of the cnlearn.db.crud lookups,
+which cnlearn.db.statements also compiles into prepared statements. The
+select_* functions take either the values to look up or bind parameters,
+and a filter that is None isn't applied. The words of equal frequency
+are always ordered by their id, so a lookup of a single word and the
+bulk lookups return them in the same order.
+"""
+from collections import defaultdict
+from typing import Any, DefaultDict, List, Optional, Sequence, Tuple
+
+from sqlalchemy import and_, func, select
+from sqlalchemy.engine import Row
+from sqlalchemy.orm import aliased
+from sqlalchemy.sql.selectable import Select
+
+from cnlearn.db.models import Character, Word, WordComponent
+
+
+def select_simplified_word(simplified: Any, pinyin_clean: Any = None) -> Select:
+    word_selection: Select = (
+        select(Word).where(Word.simplified == simplified).order_by(Word.frequency, Word.id)
+    )
+    if pinyin_clean is not None:
+        word_selection = word_selection.where(Word.pinyin_clean == pinyin_clean)
+    return word_selection
+
+
+def select_simplified_character(simplified: Any) -> Select:
+    return select(Character).where(Character.character == simplified)
+
+
+def select_word_and_character(simplified: Any, pinyin_clean: Any = None, pinyin_accent: Any = None) -> Select:
+    word_and_character_select: Select = (
+        select(Word, Character)
+        .where(
+            and_(
+                Word.simplified == simplified,
+                Word.character_id == Character.id,
+            )
+        )
+        .order_by(Word.frequency, Word.id)
+    )
+    if pinyin_clean is not None:
+        word_and_character_select = word_and_character_select.where(
+            Word.pinyin_clean == pinyin_clean
+        )
+    if pinyin_accent is not None:
+        word_and_character_select = word_and_character_select.where(
+            Word.pinyin_accent == pinyin_accent
+        )
+    return word_and_character_select
+
+
+def select_words_and_characters(characters: Sequence[Any]) -> Select:
+    """
+    Returns the select statement behind get_words_and_characters_bulk,
+    for the words (and their characters rows) with any of the simplified
+    forms given.
+    """
+    return (
+        select(Word, Character)
+        .where(
+            and_(
+                Word.simplified.in_(list(characters)),
+                Word.character_id == Character.id,
+            )
+        )
+        .order_by(Word.frequency, Word.id)
+    )
+
+
+def group_words_and_characters(
+    characters: Sequence[Tuple[str, Optional[str]]], rows: Sequence[Row]
+) -> List[List[Row]]:
+    """
+    Splits the (Word, Character) rows of select_words_and_characters
+    between the (simplified, pinyin_accent) pairs, as described in
+    get_words_and_characters_bulk.
+    """
+    rows_by_character: DefaultDict[str, List[Row]] = defaultdict(list)
+    for row in rows:
+        rows_by_character[row.Word.simplified].append(row)
+    results: List[List[Row]] = []
+    for simplified, pinyin_accent in characters:
+        character_rows: List[Row] = rows_by_character.get(simplified, [])
+        matching_rows: List[Row] = [
+            row for row in character_rows if pinyin_accent and row.Word.pinyin_accent == pinyin_accent
+        ]
+        results.append(matching_rows or list(character_rows))
+    return results
+
+
+def select_words_with_components() -> Select:
+    """
+    Returns the select statement behind get_word_with_components, without
+    the condition on the words.
+    """
+    component_word = aliased(Word, name="component_word")
+    return (
+        select(Word, component_word, Character)
+        .outerjoin(WordComponent, WordComponent.word_id == Word.id)
+        .outerjoin(component_word, component_word.id == WordComponent.char_word_id)
+        .outerjoin(Character, Character.id == WordComponent.character_id)
+        .order_by(
+            Word.frequency, Word.id, WordComponent.position, component_word.frequency, component_word.id
+        )
+    )
+
+
+def select_words_by_pinyin(
+    pinyin_clean: Sequence[Any], fallback_frequency: Any = None, limit: Any = None, offset: Any = None
+) -> Select:
+    """
+    Returns the select statement behind get_words_by_pinyin. The words
+    with fallback_frequency or more, those that aren't in the frequency
+    corpus, come after all the others; limit and offset page through them.
+    """
+    word_selection: Select = select(Word).where(func.lower(Word.pinyin_clean).in_(list(pinyin_clean)))
+    if fallback_frequency is not None:
+        # false, the words in the corpus, sorts first
+        word_selection = word_selection.order_by(Word.frequency >= fallback_frequency)
+    word_selection = word_selection.order_by(Word.frequency.desc(), Word.id)
+    if limit is not None:
+        word_selection = word_selection.limit(limit)
+    if offset is not None:
+        word_selection = word_selection.offset(offset)
+    return word_selection
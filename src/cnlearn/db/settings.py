@@ -1,12 +1,164 @@
 import os
-from sqlalchemy import create_engine
+import sqlite3
+from itertools import count
+from pathlib import Path
+from threading import Lock
+from typing import Callable, Dict, Iterator, List, Tuple, Union
+
+from sqlalchemy import create_engine, event
+from sqlalchemy.engine import Engine
 from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import NullPool, QueuePool
 
 
 path = os.path.dirname(os.path.abspath(__file__))
-db = os.path.join(path, 'dictionary.db')
+# the CNLEARN_DATABASE environment variable points to another database,
+# e.g. one built for benchmarks; its jieba files are looked for next to it
+db = os.environ.get("CNLEARN_DATABASE") or os.path.join(path, 'dictionary.db')
 SQLALCHEMY_DATABASE = "sqlite+pysqlite:////{db}".format(db=db)
-engine = create_engine(
-    SQLALCHEMY_DATABASE, echo=False, future=True
-)
-SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine, future=True)
\ No newline at end of file
+
+# connection profiles of the runtime engine, picked with the
+# CNLEARN_DB_PROFILE environment variable:
+# - default: read-write connections with SQLite's default settings
+# - read_only: pooled connections opening the database read-only and
+#   immutable (so SQLite doesn't lock it), memory mapped, with a bigger
+#   page cache; the file must not change while they are open
+# - memory: the whole database is copied into memory when the engine
+#   first connects, then used like read_only
+DATABASE_PROFILES: Tuple[str, ...] = ("default", "read_only", "memory")
+DATABASE_PROFILE: str = os.environ.get("CNLEARN_DB_PROFILE", "default")
+# set on every connection of the read_only and memory profiles
+READ_ONLY_PRAGMAS: Dict[str, Union[int, str]] = {
+    "mmap_size": 256 * 1024 * 1024,
+    # negative sizes are in KiB
+    "cache_size": -64 * 1024,
+    "temp_store": "MEMORY",
+    "query_only": "ON",
+}
+
+# how the Dictionary's lookups run, picked with the
+# CNLEARN_CRUD_STATEMENTS environment variable:
+# - orm: with the cnlearn.db.crud functions, whose statements are built,
+#   compiled and loaded by SQLAlchemy on every call
+# - prepared: with the cnlearn.db.statements functions, whose statements
+#   are compiled once per filter combination and run on the sqlite3
+#   connection, and whose rows hold namedtuples rather than ORM objects
+CRUD_STATEMENT_MODES: Tuple[str, ...] = ("orm", "prepared")
+CRUD_STATEMENTS: str = os.environ.get("CNLEARN_CRUD_STATEMENTS", "orm")
+if CRUD_STATEMENTS not in CRUD_STATEMENT_MODES:
+    raise ValueError(f"CNLEARN_CRUD_STATEMENTS must be one of {', '.join(CRUD_STATEMENT_MODES)}.")
+
+# connections keeping the in-memory copies made by copy_to_memory alive
+_memory_databases: List[sqlite3.Connection] = []
+_memory_database_ids: Iterator[int] = count()
+
+
+def set_pragmas(engine: Engine, pragmas: Dict[str, Union[int, str]]) -> None:
+    """
+    Sets the pragmas on every connection the engine opens.
+    """
+    @event.listens_for(engine, "connect")
+    def on_connect(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        for name, value in pragmas.items():
+            cursor.execute(f"PRAGMA {name} = {value}")
+        cursor.close()
+
+
+def copy_to_memory(database: str) -> str:
+    """
+    Copies a database into a shared in-memory database with the sqlite
+    backup API and returns its URI. An in-memory database is gone once
+    all its connections are closed, so one is kept open for the life of
+    the process.
+    """
+    uri: str = f"file:cnlearn-{next(_memory_database_ids)}?mode=memory&cache=shared"
+    memory: sqlite3.Connection = sqlite3.connect(uri, uri=True, check_same_thread=False)
+    source: sqlite3.Connection = sqlite3.connect(f"{Path(database).resolve().as_uri()}?mode=ro", uri=True)
+    try:
+        source.backup(memory)
+    finally:
+        source.close()
+    _memory_databases.append(memory)
+    return uri
+
+
+def memory_connector(database: str) -> Callable[[], sqlite3.Connection]:
+    """
+    Returns a function opening connections to an in-memory copy of the
+    database, made by the first of them rather than with the engine: the
+    processes that import this module without searching, like the
+    workers of cnlearn.search.annotate, don't copy the database.
+    """
+    uris: List[str] = []
+    lock: Lock = Lock()
+
+    def connect() -> sqlite3.Connection:
+        with lock:
+            if not uris:
+                uris.append(copy_to_memory(database))
+        return sqlite3.connect(uris[0], uri=True, check_same_thread=False)
+
+    return connect
+
+
+def create_database_engine(profile: str = "default", database: str = db) -> Engine:
+    """
+    Returns an engine for the database, set up with one of DATABASE_PROFILES.
+    """
+    if profile not in DATABASE_PROFILES:
+        raise ValueError(f"profile must be one of {', '.join(DATABASE_PROFILES)}.")
+    if profile == "default":
+        return create_engine(f"sqlite+pysqlite:///{database}", echo=False, future=True)
+    if profile == "memory":
+        creator: Callable[[], sqlite3.Connection] = memory_connector(database)
+    else:
+        uri: str = f"{Path(database).resolve().as_uri()}?mode=ro&immutable=1"
+        creator = lambda: sqlite3.connect(uri, uri=True, check_same_thread=False)
+    # the pool keeps the connections, and their page caches, between
+    # sessions, with no limit on how many are open (a thread-safe
+    # Dictionary holds one per thread). They may be used by a thread other
+    # than the one that opened them, though never by two at once
+    engine: Engine = create_engine(
+        "sqlite+pysqlite://",
+        creator=creator,
+        poolclass=QueuePool,
+        max_overflow=-1,
+        echo=False,
+        future=True,
+    )
+    set_pragmas(engine, READ_ONLY_PRAGMAS)
+    return engine
+
+
+def create_read_only_engine(database: str = db) -> Engine:
+    """
+    Returns an engine opening the database read-only, though not immutable
+    so its connections still see the database being rebuilt. They may be
+    closed by a thread other than the one that opened them.
+    """
+    uri: str = f"{Path(database).resolve().as_uri()}?mode=ro"
+    # a connection per session, as for the file URL of the default profile
+    return create_engine(
+        "sqlite+pysqlite://",
+        creator=lambda: sqlite3.connect(uri, uri=True, check_same_thread=False),
+        poolclass=NullPool,
+        echo=False,
+        future=True,
+    )
+
+
+engine = create_database_engine(DATABASE_PROFILE)
+SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine, future=True)
+
+# read-only connections for searching from several threads, see
+# Dictionary(thread_safe=True); the runtime engine itself unless it
+# is the read-write default, which keeps plain read-only connections
+# rather than the immutable ones of the read_only profile
+read_only_engine = create_read_only_engine() if DATABASE_PROFILE == "default" else engine
+ReadOnlySessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=read_only_engine, future=True)
+
+# jieba dictionary generated from the words table, and its prefix dict
+# cache, both written by dict/add_jieba.py next to dictionary.db
+JIEBA_DICTIONARY = os.path.join(os.path.dirname(db), 'jieba_dict.txt')
+JIEBA_CACHE = os.path.join(os.path.dirname(db), 'jieba.cache')
@@ -0,0 +1,224 @@
+"""
+This module runs the cnlearn.db.crud lookups as precompiled statements.
+For point lookups, building the select, compiling it (or working out its
+cache key) and loading ORM objects from the rows cost SQLAlchemy more
+than SQLite spends on the query. Here each crud select is compiled once
+per filter combination, with bind parameters, and run directly on the
+session's sqlite3 connection, which keeps the statement prepared.
+
+The functions are named and called like their crud counterparts, but
+their rows are namedtuples rather than ORM objects: they have the same
+attributes as the ORM's rows and the models they hold, but they aren't
+Word or Character instances, have no relationships and aren't in the
+session. The Dictionary uses them when settings.CRUD_STATEMENTS is
+"prepared", as it only reads those attributes.
+"""
+import sqlite3
+from collections import namedtuple
+from functools import lru_cache
+from typing import Any, Callable, List, Optional, Sequence, Tuple, Type
+
+from sqlalchemy import bindparam, inspect
+from sqlalchemy.dialects import sqlite
+from sqlalchemy.engine import Dialect
+from sqlalchemy.orm import Session
+from sqlalchemy.sql.selectable import Select
+
+from cnlearn.db import selects
+from cnlearn.db.models import Word
+
+
+DIALECT: Dialect = sqlite.dialect()
+# a model's namedtuple, the position of its primary key among its columns
+# and the functions converting their values
+RecordType = Tuple[Type[tuple], int, List[Optional[Callable[[Any], Any]]]]
+
+
+def record_type(model: Any) -> RecordType:
+    """
+    Returns the namedtuple standing for a model (or an alias of one) in
+    the rows, where its primary key is among the model's columns and the
+    functions converting their values the way SQLAlchemy does (e.g.
+    parsing JSON), None where there's nothing to do.
+    """
+    mapper = inspect(model).mapper
+    columns = list(mapper.columns)
+    record = namedtuple(f"{mapper.class_.__name__}Record", [column.key for column in columns])
+    key_index: int = columns.index(mapper.primary_key[0])
+    processors = [column.type.dialect_impl(DIALECT).result_processor(DIALECT, None) for column in columns]
+    return record, key_index, processors
+
+
+class PreparedStatement:
+    """
+    A crud select, compiled once. Its rows are namedtuples named like the
+    ORM's rows (e.g. row.Word), holding a record of each model, or None
+    where an outer join found nothing.
+    """
+
+    def __init__(self, selection: Select):
+        compiled = selection.compile(dialect=DIALECT)
+        self.sql: str = str(compiled)
+        self.parameters: Tuple[str, ...] = tuple(compiled.positiontup)
+        descriptions = selection.column_descriptions
+        self.row_type: Type[tuple] = namedtuple("Row", [description["name"] for description in descriptions])
+        self.records: List[RecordType] = [record_type(description["entity"]) for description in descriptions]
+        self.processed: bool = any(processor for _, _, processors in self.records for processor in processors)
+
+    def make_row(self, values: Tuple[Any, ...]) -> tuple:
+        entities: List[Optional[tuple]] = []
+        start: int = 0
+        for record, key_index, processors in self.records:
+            end: int = start + len(processors)
+            record_values: Tuple[Any, ...] = values[start:end]
+            # a missing primary key means the outer join found nothing
+            if record_values[key_index] is None:
+                entities.append(None)
+            elif self.processed:
+                entities.append(
+                    record._make(
+                        processor(value) if processor else value
+                        for value, processor in zip(record_values, processors)
+                    )
+                )
+            else:
+                entities.append(record._make(record_values))
+            start = end
+        return self.row_type._make(entities)
+
+    def execute(self, db: Session, **parameters: Any) -> List[tuple]:
+        """
+        Runs the statement on the session's connection, so within its
+        transaction, and returns all the rows.
+        """
+        connection: sqlite3.Connection = db.connection().connection.dbapi_connection
+        cursor: sqlite3.Cursor = connection.execute(self.sql, [parameters[name] for name in self.parameters])
+        return [self.make_row(values) for values in cursor.fetchall()]
+
+
+def padded(values: Sequence[Any]) -> List[Any]:
+    """
+    Pads the values of an IN list, repeating the last one, to the next
+    power of two, so a few statements cover lists of any length.
+    """
+    size: int = 1 << (len(values) - 1).bit_length()
+    return list(values) + [values[-1]] * (size - len(values))
+
+
+def in_parameters(size: int) -> List[Any]:
+    return [bindparam(f"value_{index}") for index in range(size)]
+
+
+def in_values(values: Sequence[Any]) -> dict:
+    return {f"value_{index}": value for index, value in enumerate(padded(values))}
+
+
+@lru_cache(maxsize=None)
+def simplified_word_statement(pinyin_clean: bool) -> PreparedStatement:
+    return PreparedStatement(
+        selects.select_simplified_word(bindparam("simplified"), bindparam("pinyin_clean") if pinyin_clean else None)
+    )
+
+
+@lru_cache(maxsize=None)
+def simplified_character_statement() -> PreparedStatement:
+    return PreparedStatement(selects.select_simplified_character(bindparam("simplified")))
+
+
+@lru_cache(maxsize=None)
+def word_and_character_statement(pinyin_clean: bool, pinyin_accent: bool) -> PreparedStatement:
+    return PreparedStatement(
+        selects.select_word_and_character(
+            bindparam("simplified"),
+            bindparam("pinyin_clean") if pinyin_clean else None,
+            bindparam("pinyin_accent") if pinyin_accent else None,
+        )
+    )
+
+
+@lru_cache(maxsize=None)
+def words_and_characters_statement(size: int) -> PreparedStatement:
+    return PreparedStatement(selects.select_words_and_characters(in_parameters(size)))
+
+
+@lru_cache(maxsize=None)
+def word_with_components_statement() -> PreparedStatement:
+    return PreparedStatement(selects.select_words_with_components().where(Word.simplified == bindparam("simplified")))
+
+
+@lru_cache(maxsize=None)
+def words_with_components_statement(size: int) -> PreparedStatement:
+    return PreparedStatement(selects.select_words_with_components().where(Word.simplified.in_(in_parameters(size))))
+
+
+@lru_cache(maxsize=None)
+def words_by_pinyin_statement(size: int, fallback_frequency: bool, limit: bool) -> PreparedStatement:
+    return PreparedStatement(
+        selects.select_words_by_pinyin(
+            in_parameters(size),
+            bindparam("fallback_frequency") if fallback_frequency else None,
+            bindparam("limit") if limit else None,
+            bindparam("offset") if limit else None,
+        )
+    )
+
+
+def get_simplified_word(db: Session, simplified: str, pinyin_clean: Optional[str] = None) -> List[tuple]:
+    return simplified_word_statement(bool(pinyin_clean)).execute(
+        db, simplified=simplified, pinyin_clean=pinyin_clean
+    )
+
+
+def get_simplified_character(db: Session, simplified: str) -> Optional[tuple]:
+    rows: List[tuple] = simplified_character_statement().execute(db, simplified=simplified)
+    return rows[0] if rows else None
+
+
+def get_word_and_character(
+    db: Session, simplified: str, pinyin_clean: Optional[str] = None, pinyin_accent: Optional[str] = None
+) -> List[tuple]:
+    return word_and_character_statement(bool(pinyin_clean), bool(pinyin_accent)).execute(
+        db, simplified=simplified, pinyin_clean=pinyin_clean, pinyin_accent=pinyin_accent
+    )
+
+
+def get_words_and_characters_bulk(
+    db: Session, characters: Sequence[Tuple[str, Optional[str]]]
+) -> List[List[tuple]]:
+    unique_characters: List[str] = list(dict.fromkeys(simplified for simplified, _ in characters))
+    if not unique_characters:
+        return []
+    parameters: dict = in_values(unique_characters)
+    rows: List[tuple] = words_and_characters_statement(len(parameters)).execute(db, **parameters)
+    return selects.group_words_and_characters(characters, rows)
+
+
+def get_word_with_components(db: Session, simplified: str) -> List[tuple]:
+    return word_with_components_statement().execute(db, simplified=simplified)
+
+
+def get_words_with_components_bulk(db: Session, simplified: Sequence[str]) -> List[tuple]:
+    unique_simplified: List[str] = list(dict.fromkeys(simplified))
+    if not unique_simplified:
+        return []
+    parameters: dict = in_values(unique_simplified)
+    return words_with_components_statement(len(parameters)).execute(db, **parameters)
+
+
+def get_words_by_pinyin(
+    db: Session,
+    pinyin_clean: Sequence[str],
+    fallback_frequency: Optional[int] = None,
+    limit: Optional[int] = None,
+    offset: int = 0,
+) -> List[tuple]:
+    if not pinyin_clean:
+        return []
+    parameters: dict = in_values(pinyin_clean)
+    statement: PreparedStatement = words_by_pinyin_statement(
+        len(parameters), fallback_frequency is not None, limit is not None or bool(offset)
+    )
+    # to SQLite, LIMIT -1 is no limit
+    return statement.execute(
+        db, fallback_frequency=fallback_frequency, limit=-1 if limit is None else limit, offset=offset, **parameters
+    )
@@ -0,0 +1,139 @@
+"""
+This module upgrades an already built dictionary.db so that it matches the
+schema declared in cnlearn.db.models. It only adds what is missing, so it
+is safe to run it more than once:
+
+    python -m cnlearn.db.upgrade [path/to/dictionary.db]
+"""
+import argparse
+from typing import List, Optional, Set
+
+from sqlalchemy import create_engine, insert, inspect, text
+from sqlalchemy.engine import Connection, Engine
+from sqlalchemy.schema import CreateTable
+
+from cnlearn.db.components import build_character_postings, build_word_components, link_characters
+from cnlearn.db.crud import FALLBACK_FREQUENCY, guess_fallback_frequency
+from cnlearn.db.fts import FTS_TABLE, create_definitions_index, fts5_available, has_definitions_index
+from cnlearn.db.models import BuildInfo, CharacterPosting, WordComponent, mapper_registry
+from cnlearn.db.settings import db
+
+
+def add_missing_columns(connection: Connection) -> List[str]:
+    """
+    Adds the columns declared on the models that the existing tables
+    don't have yet. Returns them as table.column names.
+    """
+    inspector = inspect(connection)
+    added_columns: List[str] = []
+    for table in mapper_registry.metadata.sorted_tables:
+        if not inspector.has_table(table.name):
+            continue
+        existing_columns: Set[str] = {column["name"] for column in inspector.get_columns(table.name)}
+        for column in table.columns:
+            if column.name not in existing_columns:
+                column_type: str = column.type.compile(dialect=connection.dialect)
+                connection.execute(text(f"ALTER TABLE {table.name} ADD COLUMN {column.name} {column_type}"))
+                added_columns.append(f"{table.name}.{column.name}")
+    return added_columns
+
+
+def create_missing_tables(connection: Connection) -> List[str]:
+    """
+    Creates the tables declared on the models that are not in the
+    database. Their indexes are left to create_missing_indexes.
+    """
+    inspector = inspect(connection)
+    created_tables: List[str] = []
+    for table in mapper_registry.metadata.sorted_tables:
+        if not inspector.has_table(table.name):
+            connection.execute(CreateTable(table))
+            created_tables.append(table.name)
+    return created_tables
+
+
+def create_missing_indexes(connection: Connection) -> List[str]:
+    """
+    Creates the indexes declared on the models that are not yet present
+    in the database. Returns the names of the indexes that were created.
+    """
+    inspector = inspect(connection)
+    created_indexes: List[str] = []
+    for table in mapper_registry.metadata.sorted_tables:
+        if not inspector.has_table(table.name):
+            continue
+        # the inspector leaves out expression indexes so ask sqlite_master
+        existing_indexes: Set[str] = set(
+            connection.execute(
+                text("SELECT name FROM sqlite_master WHERE type = 'index' AND tbl_name = :table"),
+                {"table": table.name},
+            ).scalars()
+        )
+        for index in table.indexes:
+            if index.name not in existing_indexes:
+                index.create(connection)
+                created_indexes.append(index.name)
+    return created_indexes
+
+
+def has_unfolded_postings(connection: Connection) -> bool:
+    """
+    Tells whether the character postings were built before their ASCII
+    letters were lower cased (see cnlearn.db.components.fold_ascii).
+    """
+    return (
+        connection.execute(
+            text(f"SELECT 1 FROM {CharacterPosting.__tablename__} WHERE character GLOB '[A-Z]' LIMIT 1")
+        ).first()
+        is not None
+    )
+
+
+def upgrade_database(engine: Engine) -> List[str]:
+    """
+    Upgrades the database the engine is bound to. Returns a list
+    describing the changes that were made (empty if it was up to date).
+    """
+    with engine.begin() as connection:
+        changes: List[str] = add_missing_columns(connection)
+        changes.extend(create_missing_tables(connection))
+        if "words.character_id" in changes or WordComponent.__tablename__ in changes:
+            link_characters(connection)
+            build_word_components(connection)
+            changes.append("word components")
+        if BuildInfo.__tablename__ in changes:
+            # the build didn't record it, the best that can be done is a guess
+            fallback_frequency: Optional[int] = guess_fallback_frequency(connection)
+            if fallback_frequency is not None:
+                connection.execute(
+                    insert(BuildInfo.__table__), dict(name=FALLBACK_FREQUENCY, value=str(fallback_frequency))
+                )
+        if CharacterPosting.__tablename__ in changes or has_unfolded_postings(connection):
+            build_character_postings(connection)
+            changes.append("character postings")
+        if fts5_available(connection) and not has_definitions_index(connection):
+            create_definitions_index(connection)
+            changes.append(FTS_TABLE)
+        changes.extend(create_missing_indexes(connection))
+        if changes:
+            # refresh the statistics the query planner uses to pick indexes
+            connection.execute(text("ANALYZE"))
+    return changes
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description="Upgrade an existing CNLearn dictionary database.")
+    parser.add_argument("database", nargs="?", default=db, help="path to dictionary.db")
+    args = parser.parse_args(argv)
+    engine: Engine = create_engine(f"sqlite+pysqlite:///{args.database}", future=True)
+    changes: List[str] = upgrade_database(engine)
+    engine.dispose()
+    if changes:
+        for change in changes:
+            print(f"upgraded {change}")
+    else:
+        print("database is up to date")
+
+
+if __name__ == "__main__":
+    main()
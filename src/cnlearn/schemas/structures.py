@@ -1,9 +1,15 @@
-from typing import Dict, List, Optional
+from functools import lru_cache
+from typing import Any, Dict, List, Optional, Tuple, Type, TypeVar
 from pydantic import BaseModel
 from abc import ABC, abstractmethod
 from enum import Enum, IntEnum
 
 
+# stands for a field missing from a database row
+_MISSING = object()
+CommonType = TypeVar("CommonType", bound="Common")
+
+
 class CharacterType(str, Enum):
     象形 = "象形"
     指事 = "指事"
@@ -47,6 +53,37 @@ class Common(BaseModel, ABC):
     class Config:
         orm_mode = True
 
+    @classmethod
+    def from_row(cls: Type[CommonType], row: Any, **values: Any) -> CommonType:
+        """
+        Builds the structure from a database row like from_orm, but
+        without validating it: the columns already have the types of the
+        fields, and validating every row was most of the cost of a search.
+        - values are set on top of the row's, e.g. a Character's radical
+        """
+        # the columns SQLAlchemy has loaded, read directly rather than
+        # through its attributes, which is several times slower
+        loaded: Dict[str, Any] = getattr(row, "__dict__", {})
+        for name in cls._row_fields(type(row)):
+            if name not in values:
+                value: Any = loaded.get(name, _MISSING)
+                if value is _MISSING:
+                    value = getattr(row, name, _MISSING)
+                if value is not _MISSING:
+                    values[name] = value
+        return cls.construct(**values)
+
+    @classmethod
+    @lru_cache(maxsize=None)
+    def _row_fields(cls, row_type: type) -> Tuple[str, ...]:
+        """
+        Returns the fields a type of row can have: those its class has
+        attributes for (e.g. the columns of a model), or all of them if it
+        declares none, like a Row.
+        """
+        fields: Tuple[str, ...] = tuple(cls.__fields__)
+        return tuple(name for name in fields if hasattr(row_type, name)) or fields
+
     @abstractmethod
     def list_components(self):
         pass
@@ -0,0 +1,226 @@
+"""
+This module annotates whole documents (chapters, articles) with the
+dictionary entries of their words:
+
+    python -m cnlearn.search.annotate path/to/text.txt [-o annotated.jsonl]
+
+The text is read a line at a time and split into sentences, which are
+grouped into chunks and segmented by a pool of worker processes, since
+jieba is CPU-bound; a text that fits in a single chunk is segmented in
+this process instead. Each distinct segment of a chunk is looked up once
+(and usually comes from the Dictionary's cache after that) and every
+sentence is written out as a JSON line as soon as its chunk is done, so
+memory doesn't grow with the size of the document.
+"""
+import argparse
+import json
+import os
+import re
+import sys
+from collections import deque
+from concurrent.futures import Future, ProcessPoolExecutor
+from itertools import chain, islice
+from typing import Any, Deque, Dict, Iterable, Iterator, List, Optional, Pattern, TextIO, Tuple, Union
+
+from jieba import Tokenizer
+
+from cnlearn.schemas.structures import Character, Word
+from cnlearn.search.dictionary import Dictionary
+from cnlearn.search.persistent_cache import result_records
+from cnlearn.search.segmentation import create_tokenizer, initialize_tokenizer, uses_exported_dictionary
+from cnlearn.search.stats import SearchStats
+
+
+# a sentence: anything up to and including its final punctuation and
+# the closing quotes or brackets after it
+SENTENCE_PATTERN: Pattern = re.compile(r"[^。！？!?；;]*[。！？!?；;]*[”’」』）》)\"']*")
+# most characters segmented together by a worker
+CHUNK_SIZE: int = 20000
+# chunks waiting to be written out per worker, which bounds the memory used
+CHUNKS_PER_WORKER: int = 2
+
+# (line number, sentence) pairs
+Sentences = List[Tuple[int, str]]
+
+# the tokenizer of a worker process, set up by initialize_worker
+_worker_tokenizer: Optional[Tokenizer] = None
+
+
+def iter_sentences(lines: Iterable[str]) -> Iterator[Tuple[int, str]]:
+    """
+    Yields the sentences of the lines, with the (1-based) number of the
+    line they are on. The end of a line always ends a sentence and blank
+    sentences are skipped.
+    """
+    for line_number, line in enumerate(lines, start=1):
+        for sentence in SENTENCE_PATTERN.findall(line.rstrip("\r\n")):
+            if sentence.strip():
+                yield line_number, sentence
+
+
+def iter_chunks(sentences: Iterable[Tuple[int, str]], chunk_size: int = CHUNK_SIZE) -> Iterator[Sentences]:
+    """
+    Groups the sentences into chunks of about chunk_size characters. A
+    sentence is never split, so a long one makes a chunk of its own.
+    """
+    chunk: Sentences = []
+    n_characters: int = 0
+    for line_number, sentence in sentences:
+        chunk.append((line_number, sentence))
+        n_characters += len(sentence)
+        if n_characters >= chunk_size:
+            yield chunk
+            chunk, n_characters = [], 0
+    if chunk:
+        yield chunk
+
+
+def initialize_worker() -> None:
+    """
+    Loads jieba in a worker process, once for all the chunks it segments.
+    """
+    global _worker_tokenizer
+    _worker_tokenizer = create_tokenizer()
+    initialize_tokenizer(_worker_tokenizer)
+
+
+def segment_sentences(sentences: List[str]) -> List[List[str]]:
+    """
+    Segments sentences in a worker process, the way Dictionary.segment does.
+    """
+    tokenizer: Tokenizer = _worker_tokenizer
+    use_hmm: bool = not uses_exported_dictionary(tokenizer)
+    return [list(tokenizer.cut(sentence, cut_all=False, HMM=use_hmm)) for sentence in sentences]
+
+
+def segment_chunks(
+    chunks: Iterable[Sentences], dictionary: Dictionary, workers: int
+) -> Iterator[Tuple[Sentences, List[List[str]]]]:
+    """
+    Yields the chunks, in order, with the segments of each sentence. With
+    more than one worker, and more than one chunk, they are segmented by
+    a pool of that many processes, at most CHUNKS_PER_WORKER chunks per
+    worker being segmented or waiting at any time; otherwise they are
+    segmented in this process.
+    """
+    chunks = iter(chunks)
+    # starting the processes and loading jieba in each of them only pays
+    # off when there is more than one chunk
+    first_chunks: List[Sentences] = list(islice(chunks, 2))
+    chunks = chain(first_chunks, chunks)
+    if workers == 1 or len(first_chunks) < 2:
+        for chunk in chunks:
+            yield chunk, [list(dictionary.segment(sentence)) for _, sentence in chunk]
+        return
+    with ProcessPoolExecutor(max_workers=workers, initializer=initialize_worker) as executor:
+        pending: Deque[Tuple[Sentences, "Future[List[List[str]]]"]] = deque()
+        for chunk in chunks:
+            pending.append((chunk, executor.submit(segment_sentences, [sentence for _, sentence in chunk])))
+            if len(pending) >= workers * CHUNKS_PER_WORKER:
+                done_chunk, future = pending.popleft()
+                yield done_chunk, future.result()
+        while pending:
+            done_chunk, future = pending.popleft()
+            yield done_chunk, future.result()
+
+
+def annotate_chunk(
+    dictionary: Dictionary, chunk: Sentences, segmented: List[List[str]], max_results: Optional[int] = None
+) -> Iterator[str]:
+    """
+    Yields the JSON lines of a segmented chunk. Each distinct segment is
+    looked up and serialized once for the whole chunk. If the dictionary
+    is instrumented, the sentences are recorded as searches, without the
+    time spent segmenting them.
+    """
+    words: List[str] = list(dict.fromkeys(word for segments in segmented for word in segments if word.strip()))
+    stats: Optional[SearchStats] = None
+    if dictionary.instrument:
+        stats = SearchStats()
+        stats.searches = len(chunk)
+        stats.segments = sum(1 for segments in segmented for word in segments if word.strip())
+    try:
+        word_results: Dict[str, List[Union[Word, Character]]] = dictionary.resolve_words(words, stats)
+    finally:
+        if stats is not None:
+            dictionary.record_search_stats(stats)
+    records: Dict[str, List[Dict[str, Any]]] = {
+        word: result_records(word_results[word][:max_results]) for word in words
+    }
+    for (line_number, sentence), segments in zip(chunk, segmented):
+        annotated_sentence: Dict[str, Any] = {
+            "line": line_number,
+            "text": sentence,
+            "segments": [{"segment": word, "results": records.get(word, [])} for word in segments],
+        }
+        yield json.dumps(annotated_sentence, ensure_ascii=False)
+
+
+def annotate_document(
+    lines: Iterable[str],
+    dictionary: Optional[Dictionary] = None,
+    workers: Optional[int] = None,
+    chunk_size: int = CHUNK_SIZE,
+    max_results: Optional[int] = None,
+) -> Iterator[str]:
+    """
+    Yields a JSON line for every sentence of the document, in order, with
+    its line number, its text and its segments, each with its results
+    serialized like in the PersistentCache. Unlike search_chinese, it
+    doesn't change search_term, words_found or search_history.
+    - lines are the lines of the document, e.g. an open file
+    - dictionary does the lookups, a new one (closed at the end) by default
+    - workers is the number of segmenting processes, os.cpu_count() by
+      default; with 1 the text is segmented in this process
+    - chunk_size is about how many characters a worker segments at once
+    - max_results is the most results written per segment, all by default
+    """
+    if workers is None:
+        workers = os.cpu_count() or 1
+    if workers < 1:
+        raise ValueError("workers must be at least 1.")
+    own_dictionary: bool = dictionary is None
+    if dictionary is None:
+        dictionary = Dictionary(jieba_startup="lazy")
+    chunks: Iterator[Sentences] = iter_chunks(iter_sentences(lines), chunk_size)
+    try:
+        for chunk, segmented in segment_chunks(chunks, dictionary, workers):
+            yield from annotate_chunk(dictionary, chunk, segmented, max_results)
+    finally:
+        if own_dictionary:
+            dictionary.close()
+
+
+def annotate_file(path: str, output: TextIO, **options) -> int:
+    """
+    Annotates a UTF-8 text file, writing the JSON lines to output, and
+    returns the number of sentences. The options are those of
+    annotate_document.
+    """
+    n_sentences: int = 0
+    with open(path, encoding="utf-8") as document:
+        for annotated_sentence in annotate_document(document, **options):
+            output.write(annotated_sentence + "\n")
+            n_sentences += 1
+    return n_sentences
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description="Annotate a Chinese text file with dictionary entries.")
+    parser.add_argument("path", help="UTF-8 text file to annotate")
+    parser.add_argument("-o", "--output", help="JSON lines file to write, standard output by default")
+    parser.add_argument("--workers", type=int, default=None, help="segmenting processes, 1 to segment in this process")
+    parser.add_argument("--chunk-size", type=int, default=CHUNK_SIZE, help="characters segmented at once")
+    parser.add_argument("--max-results", type=int, default=None, help="most results written per segment")
+    args = parser.parse_args(argv)
+    options = dict(workers=args.workers, chunk_size=args.chunk_size, max_results=args.max_results)
+    if args.output is None:
+        annotate_file(args.path, sys.stdout, **options)
+        return
+    with open(args.output, "w", encoding="utf-8") as output:
+        n_sentences: int = annotate_file(args.path, output, **options)
+    print(f"annotated {n_sentences} sentences")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,132 @@
+"""
+This module provides AsyncDictionary, an asyncio interface to the
+Dictionary for use in async applications. SQLite and jieba are both
+blocking, so segmenting and looking up are done in a worker thread and
+the event loop only waits for them. The worker thread owns the
+Dictionary's session and cache, so neither is ever used by two threads
+at once.
+
+The requests that arrive while the worker is busy are handled together
+in its next batch: their texts are segmented in one go and their
+segments deduplicated and looked up with bulk queries, as in
+Dictionary.search_chinese_many. The busier the application, the larger
+the batches and the fewer the queries per request.
+"""
+import asyncio
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from typing import Deque, List, Optional, Sequence, Tuple, Union
+
+from cnlearn.schemas.structures import Character, Word
+from cnlearn.search.dictionary import Dictionary
+
+
+# most texts searched in one batch
+DEFAULT_MAX_BATCH_SIZE: int = 512
+
+
+class AsyncDictionary:
+    """
+    Asyncio version of the Dictionary's Chinese search.
+    - dictionary is the Dictionary doing the work, a new one by default;
+      it shouldn't be used directly while the AsyncDictionary is open
+    - max_batch_size is the most texts searched together in one batch
+
+    It can be used as an async context manager, which closes it at the end.
+    """
+
+    def __init__(self, dictionary: Optional[Dictionary] = None, max_batch_size: int = DEFAULT_MAX_BATCH_SIZE):
+        self.dictionary: Dictionary = dictionary if dictionary is not None else Dictionary()
+        self.max_batch_size: int = max_batch_size
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="cnlearn-search")
+        # requests waiting for the next batch: their texts and the future for their results
+        self._pending: Deque[Tuple[List[str], "asyncio.Future[List[List[Union[Word, Character]]]]"]] = deque()
+        self._batcher: Optional["asyncio.Task[None]"] = None
+
+    def _search_batch(self, texts: List[str]) -> List[List[Union[Word, Character]]]:
+        """
+        Searches a batch of texts. Runs in the worker thread.
+        """
+        return self.dictionary.search_chinese_many(texts)
+
+    async def _run_batches(self) -> None:
+        """
+        Hands the pending requests to the worker thread, a batch at a
+        time, until there are none left.
+        """
+        loop = asyncio.get_running_loop()
+        batch: List[Tuple[List[str], asyncio.Future]] = []
+        try:
+            while self._pending:
+                batch = []
+                n_texts: int = 0
+                while self._pending and (not batch or n_texts + len(self._pending[0][0]) <= self.max_batch_size):
+                    texts, future = self._pending.popleft()
+                    batch.append((texts, future))
+                    n_texts += len(texts)
+                all_texts: List[str] = [text for texts, _ in batch for text in texts]
+                try:
+                    results = await loop.run_in_executor(self._executor, self._search_batch, all_texts)
+                except Exception as error:
+                    for _, future in batch:
+                        if not future.done():
+                            future.set_exception(error)
+                    continue
+                start: int = 0
+                for texts, future in batch:
+                    if not future.done():
+                        future.set_result(results[start : start + len(texts)])
+                    start += len(texts)
+        finally:
+            # when cancelled (e.g. as the loop shuts down) the requests of
+            # the batch and those waiting are cancelled too, rather than
+            # left waiting forever, and the next request starts a new batcher
+            self._batcher = None
+            for _, future in batch:
+                if not future.done():
+                    future.cancel()
+            while self._pending:
+                _, future = self._pending.popleft()
+                if not future.done():
+                    future.cancel()
+
+    async def _submit(self, texts: List[str]) -> List[List[Union[Word, Character]]]:
+        future: asyncio.Future = asyncio.get_running_loop().create_future()
+        self._pending.append((texts, future))
+        # a batcher cancelled before it started never got to reset itself
+        if self._batcher is None or self._batcher.done():
+            self._batcher = asyncio.create_task(self._run_batches())
+        return await future
+
+    async def search_chinese(self, search_term: str) -> List[Union[Word, Character]]:
+        """
+        Returns the results of a Chinese text, like the words_found of
+        Dictionary.search_chinese.
+        """
+        results: List[List[Union[Word, Character]]] = await self._submit([search_term])
+        return results[0]
+
+    async def search_many(self, texts: Sequence[str]) -> List[List[Union[Word, Character]]]:
+        """
+        Returns the results of each of the texts, like
+        Dictionary.search_chinese_many.
+        """
+        texts = list(texts)
+        if not texts:
+            return []
+        return await self._submit(texts)
+
+    async def close(self) -> None:
+        """
+        Waits for the searches in progress and closes the database session.
+        """
+        if self._batcher is not None and not self._batcher.done():
+            await self._batcher
+        await asyncio.get_running_loop().run_in_executor(self._executor, self.dictionary.close)
+        self._executor.shutdown(wait=True)
+
+    async def __aenter__(self) -> "AsyncDictionary":
+        return self
+
+    async def __aexit__(self, *exc_info) -> None:
+        await self.close()
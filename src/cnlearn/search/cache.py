@@ -0,0 +1,151 @@
+"""
+This module provides the cache the Dictionary keeps its search results
+in. Any class implementing SearchCache can be passed to the Dictionary;
+the default is a bounded LRUCache with an optional time to live, which
+can be shared by the threads searching with a thread-safe Dictionary.
+Results are cached per segment and a segment with no results is cached
+as an empty list, so unknown words don't hit the database every time.
+"""
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from threading import Lock
+from time import monotonic
+from typing import Any, Callable, Hashable, List, Optional, Tuple
+
+
+class CacheStats:
+    """
+    Counters describing how a cache has been used.
+    """
+
+    def __init__(self):
+        self.hits: int = 0
+        self.misses: int = 0
+        self.evictions: int = 0
+        self.expirations: int = 0
+
+    @property
+    def lookups(self) -> int:
+        return self.hits + self.misses
+
+    @property
+    def hit_ratio(self) -> float:
+        """
+        Returns the fraction of lookups that were hits (0 if there were none).
+        """
+        return self.hits / self.lookups if self.lookups else 0.0
+
+    def __repr__(self):
+        return (
+            f"<CacheStats(hits={self.hits}, misses={self.misses}, "
+            f"evictions={self.evictions}, expirations={self.expirations})>"
+        )
+
+
+class SearchCache(ABC):
+    """
+    Interface of the caches the Dictionary can use. get returns None when
+    a key isn't cached, so an empty list means a cached miss. A thread-safe
+    Dictionary calls the methods from several threads at once.
+    """
+
+    stats: CacheStats
+
+    @abstractmethod
+    def get(self, key: Hashable) -> Optional[List[Any]]:
+        pass
+
+    @abstractmethod
+    def put(self, key: Hashable, value: List[Any]) -> None:
+        pass
+
+    @abstractmethod
+    def clear(self) -> None:
+        pass
+
+    @abstractmethod
+    def __contains__(self, key: Hashable) -> bool:
+        pass
+
+    @abstractmethod
+    def __len__(self) -> int:
+        pass
+
+    def __getitem__(self, key: Hashable) -> List[Any]:
+        value: Optional[List[Any]] = self.get(key)
+        if value is None:
+            raise KeyError(key)
+        return value
+
+
+class LRUCache(SearchCache):
+    """
+    Cache holding at most max_size entries. When it is full, the least
+    recently used entry is evicted. If ttl (in seconds) is given, entries
+    older than that are treated as missing and dropped. It can be used
+    from several threads at once.
+    """
+
+    def __init__(
+        self, max_size: int = 10000, ttl: Optional[float] = None, clock: Callable[[], float] = monotonic
+    ):
+        if max_size < 1:
+            raise ValueError("max_size must be at least 1.")
+        self.max_size: int = max_size
+        self.ttl: Optional[float] = ttl
+        self.stats: CacheStats = CacheStats()
+        self._clock: Callable[[], float] = clock
+        # key -> (value, time it expires at or None)
+        self._entries: "OrderedDict[Hashable, Tuple[List[Any], Optional[float]]]" = OrderedDict()
+        # held for every access to the entries and stats
+        self._lock: Lock = Lock()
+
+    def _live_entry(self, key: Hashable) -> Optional[Tuple[List[Any], Optional[float]]]:
+        """
+        Returns the entry for the key, dropping it if it has expired.
+        """
+        entry = self._entries.get(key)
+        if entry is not None and entry[1] is not None and entry[1] <= self._clock():
+            del self._entries[key]
+            self.stats.expirations += 1
+            return None
+        return entry
+
+    def get(self, key: Hashable) -> Optional[List[Any]]:
+        with self._lock:
+            entry = self._live_entry(key)
+            if entry is None:
+                self.stats.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.stats.hits += 1
+            return entry[0]
+
+    def put(self, key: Hashable, value: List[Any]) -> None:
+        expires: Optional[float] = self._clock() + self.ttl if self.ttl is not None else None
+        with self._lock:
+            self._entries[key] = (value, expires)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+                self.stats.evictions += 1
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def __getitem__(self, key: Hashable) -> List[Any]:
+        # unlike get, this doesn't count as a lookup or refresh the entry
+        with self._lock:
+            entry = self._live_entry(key)
+        if entry is None:
+            raise KeyError(key)
+        return entry[0]
+
+    def __contains__(self, key: Hashable) -> bool:
+        with self._lock:
+            return self._live_entry(key) is not None
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._entries)
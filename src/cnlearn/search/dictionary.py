@@ -3,45 +3,205 @@ This module provides the implementation of the Dictionary object and
 its search methods.
 """
 from collections import defaultdict
-from cnlearn.db.crud import get_simplified_word, get_word_and_character
+from math import log1p
+from threading import Lock, Thread, local
+from time import perf_counter
+from cnlearn.db import crud, settings, statements
+from cnlearn.db.crud import get_fallback_frequency, get_words_by_definition
 from typing import (
-    ClassVar,
+    Callable,
     DefaultDict,
+    Dict,
     Generator,
+    Iterable,
+    Iterator,
     List,
+    Optional,
     Tuple,
     Union,
     Sequence,
 )
 
+from sqlalchemy.engine import Row
 from sqlalchemy.orm import Session
-from cnlearn.db.settings import SessionLocal
+from cnlearn.db.fts import fts_query
+from cnlearn.db.settings import ReadOnlySessionLocal, SessionLocal
 from cnlearn.schemas.structures import Word, Character
 from cnlearn.db.models import Word as Word_model, Character as Character_model
-from jieba import initialize, cut
-from cnlearn.search.textutils import extract_chinese_characters
+from cnlearn.search.cache import LRUCache, SearchCache
+from cnlearn.search.pinyin import Split, matches_tones, split_pinyin
+from cnlearn.search.segmentation import (
+    create_tokenizer,
+    initialize_tokenizer,
+    uses_exported_dictionary,
+)
+from cnlearn.search.stats import SearchStats
+
+
+# how jieba's prefix dictionary gets loaded:
+# - eager: while the Dictionary is being created
+# - background: in a thread started when the Dictionary is created
+# - lazy: the first time something is segmented
+JIEBA_STARTUP_MODES: Tuple[str, ...] = ("eager", "background", "lazy")
+# number of segments whose results are cached by default
+DEFAULT_CACHE_SIZE: int = 10000
+# most segments looked up in one bulk query
+BULK_QUERY_SIZE: int = 500
+# English searches rerank this many bm25 candidates per result wanted
+ENGLISH_CANDIDATES_PER_RESULT: int = 10
+# how much the word frequency counts against the bm25 score
+FREQUENCY_WEIGHT: float = 0.1
+
+
+# The Dictionary looks words up with the cnlearn.db.crud functions, or
+# with their precompiled versions in cnlearn.db.statements when
+# settings.CRUD_STATEMENTS is "prepared". Only the attributes of the rows
+# are read, so it doesn't matter that the latter's hold namedtuples
+# rather than ORM objects.
+def get_word_and_character(db: Session, simplified: str) -> List[Row]:
+    if settings.CRUD_STATEMENTS == "prepared":
+        return statements.get_word_and_character(db, simplified)
+    return crud.get_word_and_character(db, simplified)
+
+
+def get_word_with_components(db: Session, simplified: str) -> List[Row]:
+    if settings.CRUD_STATEMENTS == "prepared":
+        return statements.get_word_with_components(db, simplified)
+    return crud.get_word_with_components(db, simplified)
+
+
+def get_words_and_characters_bulk(
+    db: Session, characters: Sequence[Tuple[str, Optional[str]]]
+) -> List[List[Row]]:
+    if settings.CRUD_STATEMENTS == "prepared":
+        return statements.get_words_and_characters_bulk(db, characters)
+    return crud.get_words_and_characters_bulk(db, characters)
+
+
+def get_words_with_components_bulk(db: Session, simplified: Sequence[str]) -> List[Row]:
+    if settings.CRUD_STATEMENTS == "prepared":
+        return statements.get_words_with_components_bulk(db, simplified)
+    return crud.get_words_with_components_bulk(db, simplified)
+
+
+def get_words_by_pinyin(
+    db: Session,
+    pinyin_clean: Sequence[str],
+    fallback_frequency: Optional[int] = None,
+    limit: Optional[int] = None,
+    offset: int = 0,
+) -> List[Row]:
+    if settings.CRUD_STATEMENTS == "prepared":
+        return statements.get_words_by_pinyin(db, pinyin_clean, fallback_frequency, limit, offset)
+    return crud.get_words_by_pinyin(db, pinyin_clean, fallback_frequency, limit, offset)
+
+
+def timed_segments(words: Iterator[str], stats: SearchStats) -> Iterator[str]:
+    """
+    Yields the segments of jieba's generator, adding the time it takes to
+    produce them to stats.segmentation.
+    """
+    start: float = perf_counter()
+    for word in words:
+        stats.segmentation += perf_counter() - start
+        yield word
+        start = perf_counter()
+    stats.segmentation += perf_counter() - start
 
 
 class Dictionary():
     """
     Dictionary object. Will handle connecting to the database and
     implement search, segment and other methods.
+    - jieba_startup is one of JIEBA_STARTUP_MODES, 'background' default
+    - cache is where search results are kept, a LRUCache of
+      DEFAULT_CACHE_SIZE segments by default
+    - thread_safe makes it usable from several threads at once: each
+      thread gets its own read-only session and they share the cache.
+      The threads should use search, which returns the results, rather
+      than search_chinese, which stores them on the Dictionary.
+    - instrument makes every Chinese search record where its time goes,
+      see SearchStats: search_stats adds up those of all the searches and
+      last_search_stats holds those of the last search_chinese; each of
+      search_listeners is called with the stats of every search, e.g. to
+      export them (see cnlearn.search.metrics)
     """
-    def __init__(self):
-        initialize()
-        self._dictionary: ClassVar[Session] = SessionLocal()
+    def __init__(
+        self,
+        jieba_startup: str = "background",
+        cache: Optional[SearchCache] = None,
+        thread_safe: bool = False,
+        instrument: bool = False,
+    ):
+        if jieba_startup not in JIEBA_STARTUP_MODES:
+            raise ValueError(f"jieba_startup must be one of {', '.join(JIEBA_STARTUP_MODES)}.")
+        self._tokenizer = create_tokenizer()
+        # jieba's HMM guesses words that aren't in its dictionary, which
+        # with the exported dictionary would be words that aren't in ours
+        self._use_hmm: bool = not uses_exported_dictionary(self._tokenizer)
+        self._jieba_thread: Optional[Thread] = None
+        if jieba_startup == "eager":
+            initialize_tokenizer(self._tokenizer)
+        elif jieba_startup == "background":
+            self._jieba_thread = Thread(
+                target=initialize_tokenizer, args=(self._tokenizer,), name="jieba-initialize", daemon=True
+            )
+            self._jieba_thread.start()
+        self.thread_safe: bool = thread_safe
+        # the session of each thread when thread_safe, otherwise just the one
+        self._session: Optional[Session] = None if thread_safe else SessionLocal()
+        self._thread_sessions = local()
+        self._sessions: List[Session] = []
+        # guards _sessions and search_history
+        self._lock: Lock = Lock()
         self.search_term: str = ""
         self.segmented_words: Generator[str, None, None]
-        self.dictionary_cache: DefaultDict[str, List[Union[Character, Word]]] = defaultdict(list)
+        self.dictionary_cache: SearchCache = cache if cache is not None else LRUCache(DEFAULT_CACHE_SIZE)
         self.words_found: List[Union[Word, Character]] = []
         self.unknown_words: List[str] = []
         self.search_history: DefaultDict[str, int] = defaultdict(int)
+        # looked up on first use
+        self._fallback_frequency: Optional[int] = None
+        self._fallback_frequency_loaded: bool = False
+        self.instrument: bool = instrument
+        # guarded by _lock
+        self.search_stats: SearchStats = SearchStats()
+        self.last_search_stats: Optional[SearchStats] = None
+        self.search_listeners: List[Callable[[SearchStats], None]] = []
+
+    @property
+    def _dictionary(self) -> Session:
+        """
+        The database session of the calling thread.
+        """
+        if self._session is not None:
+            return self._session
+        session: Optional[Session] = getattr(self._thread_sessions, "session", None)
+        if session is None:
+            session = self._thread_sessions.session = ReadOnlySessionLocal()
+            with self._lock:
+                self._sessions.append(session)
+        return session
 
     def segment_words(self) -> None:
         """
         This method segments the string into words using Jieba.
+        If jieba is still loading in the background, it waits for it.
         """
-        self.segmented_words = cut(self.search_term, cut_all=False)
+        self.segmented_words = self.segment(self.search_term)
+
+    def segment(self, text: str) -> Generator[str, None, None]:
+        """
+        Segments a text with Jieba, without touching search_term or
+        segmented_words.
+        """
+        jieba_thread: Optional[Thread] = self._jieba_thread
+        if jieba_thread is not None:
+            jieba_thread.join()
+            self._jieba_thread = None
+        elif not self._tokenizer.initialized:
+            initialize_tokenizer(self._tokenizer)
+        return self._tokenizer.cut(text, cut_all=False, HMM=self._use_hmm)
 
     def search_chinese(self, search_term: str) -> None:
         """
@@ -52,63 +212,389 @@ class Dictionary():
         self.search_term = search_term
         # clear words found from previous search (still in cache)
         self.words_found.clear()
-        # segment the search term
-        self.segment_words()
-        # iterate through each segmented word
-        for word in self.segmented_words:
-            # only look for it if it's not empty space
-            if word.strip(): 
-            # increase its value in the search_history
-                self.search_history[word] += 1
-                # first check to see if it's not cached
-                if not self.dictionary_cache.get(word):
-                    # check to see if it's a multiple character word, or single character word
-                    if len(word) == 1:
-                        word_character_results: List[
-                            Tuple[Word_model, Character_model]
-                        ] = get_word_and_character(self._dictionary, word)
-                        # if the list is empty the next thing won't run
-                        for word_result, character_result in word_character_results:
-                            # use the Character structure
-                            character: Character = self.combine_word_and_character(word_result, character_result)
-                            self.words_found.append(character)
-                            self.dictionary_cache[character.simplified].append(character)
-                    else:
-                        current_words = get_simplified_word(self._dictionary, word)
-                        # for each of the words found, get their component characters
-                        for result in current_words:
-                            word = result.Word
-                            component_characters = extract_chinese_characters(
-                                word.simplified
-                            )
-                            current_word: Word = Word.from_orm(word)
-                            for character, pinyin in zip(
-                                component_characters, current_word.pinyin_accent.split()
-                            ):
-                                word_character_results = get_word_and_character(
-                                    self._dictionary, character, pinyin_accent=pinyin
-                                )
-                                if len(word_character_results) == 0:
-                                    word_character_results = get_word_and_character(
-                                        self._dictionary, character
-                                    )
-                                for word_result, character_result in word_character_results:
-                                    character: Character = self.combine_word_and_character(word_result, character_result)
-                                    current_word.components.append(character)
-                            self.words_found.append(current_word)
-                            self.dictionary_cache[current_word.simplified].append(current_word)
-                else:
-                    cached_result = self.dictionary_cache.get(word)
-                    self.words_found.extend(cached_result)
+        stats: Optional[SearchStats] = SearchStats() if self.instrument else None
         # the result is stored in words_found
+        self.words_found.extend(self.search(search_term, stats))
+        self.last_search_stats = stats
+
+    def search(self, search_term: str, stats: Optional[SearchStats] = None) -> List[Union[Word, Character]]:
+        """
+        Searches a Chinese string and returns the results, without touching
+        search_term, segmented_words or words_found, so several threads can
+        search with the same thread-safe Dictionary.
+        - stats, if given, gets the stats of the search added to it
+        """
+        words_found: List[Union[Word, Character]] = []
+        for _, results in self.iter_search_chinese(search_term, stats=stats):
+            words_found.extend(results)
+        return words_found
+
+    def iter_search_chinese(
+        self, search_term: str, max_results: Optional[int] = None, stats: Optional[SearchStats] = None
+    ) -> Iterator[Tuple[str, List[Union[Word, Character]]]]:
+        """
+        Searches a Chinese string like search, but yields each segment with
+        its results as soon as it has been looked up, so a long text
+        doesn't have to be searched in full before the first results can
+        be shown.
+        - max_results is the most results yielded per segment, all of them
+          by default
+        - stats, if given, gets the stats of the search added to it once
+          it's done, and so does search_stats; passing it instruments the
+          search even if the Dictionary doesn't instrument them all
+        """
+        if max_results is not None and max_results < 0:
+            raise ValueError("max_results can't be negative.")
+        search_stats: Optional[SearchStats] = None
+        if stats is not None or self.instrument:
+            search_stats = SearchStats()
+            search_stats.searches = 1
+            start: float = perf_counter()
+            words: Iterator[str] = timed_segments(self.segment(search_term), search_stats)
+            search_stats.segmentation += perf_counter() - start
+        else:
+            words = self.segment(search_term)
+        try:
+            # iterate through each segmented word
+            for word in words:
+                # only look for it if it's not empty space
+                if word.strip():
+                    # increase its value in the search_history
+                    if self.thread_safe:
+                        with self._lock:
+                            self.search_history[word] += 1
+                    else:
+                        self.search_history[word] += 1
+                    if search_stats is not None:
+                        search_stats.segments += 1
+                    # a copy, so the caller can't change the cached results
+                    yield word, self.lookup_segment(word, search_stats)[:max_results]
+        finally:
+            if search_stats is not None:
+                if stats is not None:
+                    stats.merge(search_stats)
+                self.record_search_stats(search_stats)
+
+    def record_search_stats(self, search_stats: SearchStats) -> None:
+        """
+        Adds the stats of a search to search_stats and hands them to the
+        search_listeners.
+        """
+        with self._lock:
+            self.search_stats.merge(search_stats)
+        for listener in self.search_listeners:
+            listener(search_stats)
+
+    def search_chinese_many(
+        self, texts: Iterable[str], stats: Optional[SearchStats] = None
+    ) -> List[List[Union[Word, Character]]]:
+        """
+        Searches many texts at once and returns the results of each, in
+        the same order as the texts. The segments are deduplicated across
+        all the texts and those that aren't cached are looked up with a
+        few bulk queries. Unlike search_chinese, it doesn't change
+        search_term, words_found or search_history.
+        - stats, if given, gets the stats of the searches added to it, as
+          in iter_search_chinese; the texts are recorded as one search each
+        """
+        search_stats: Optional[SearchStats] = SearchStats() if stats is not None or self.instrument else None
+        start: float = perf_counter() if search_stats is not None else 0.0
+        segmented_texts: List[List[str]] = [
+            [word for word in self.segment(text) if word.strip()] for text in texts
+        ]
+        if search_stats is None:
+            return self.resolve_segments(segmented_texts)
+        search_stats.segmentation += perf_counter() - start
+        return self._resolve_segments(segmented_texts, search_stats, stats)
+
+    def resolve_segments(
+        self, segmented_texts: Sequence[Sequence[str]], stats: Optional[SearchStats] = None
+    ) -> List[List[Union[Word, Character]]]:
+        """
+        Returns the results of already segmented texts (without the blank
+        segments), looking each distinct segment up only once.
+        - stats, if given, gets the stats of the searches added to it, as
+          in search_chinese_many, but without any segmentation time
+        """
+        if stats is None and not self.instrument:
+            results: Dict[str, List[Union[Word, Character]]] = self.resolve_words(
+                dict.fromkeys(word for segments in segmented_texts for word in segments)
+            )
+            return [[result for word in segments for result in results[word]] for segments in segmented_texts]
+        return self._resolve_segments(segmented_texts, SearchStats(), stats)
+
+    def _resolve_segments(
+        self, segmented_texts: Sequence[Sequence[str]], search_stats: SearchStats, stats: Optional[SearchStats]
+    ) -> List[List[Union[Word, Character]]]:
+        """
+        resolve_segments recording into search_stats, which are then added
+        to stats, if given, and recorded.
+        """
+        search_stats.searches += len(segmented_texts)
+        search_stats.segments += sum(len(segments) for segments in segmented_texts)
+        try:
+            results: Dict[str, List[Union[Word, Character]]] = self.resolve_words(
+                dict.fromkeys(word for segments in segmented_texts for word in segments), search_stats
+            )
+            return [[result for word in segments for result in results[word]] for segments in segmented_texts]
+        finally:
+            if stats is not None:
+                stats.merge(search_stats)
+            self.record_search_stats(search_stats)
+
+    def resolve_words(
+        self, words: Iterable[str], stats: Optional[SearchStats] = None
+    ) -> Dict[str, List[Union[Word, Character]]]:
+        """
+        Returns the results of each of the distinct words, from the cache
+        if they're there and looked up in bulk otherwise.
+        - stats, if given, records the time spent in each stage, as in
+          lookup_segment
+        """
+        results: Dict[str, List[Union[Word, Character]]] = {}
+        missing_words: List[str] = []
+        start: float = perf_counter() if stats is not None else 0.0
+        for word in words:
+            cached_result: Optional[List[Union[Word, Character]]] = self.dictionary_cache.get(word)
+            if cached_result is None:
+                missing_words.append(word)
+            else:
+                results[word] = cached_result
+        if stats is not None:
+            stats.cache += perf_counter() - start
+            stats.cache_hits += len(results)
+            stats.cache_misses += len(missing_words)
+        results.update(self.lookup_segments(missing_words, stats))
+        return results
+
+    def lookup_segments(
+        self, words: Sequence[str], stats: Optional[SearchStats] = None
+    ) -> Dict[str, List[Union[Word, Character]]]:
+        """
+        Looks up several segments in the database, BULK_QUERY_SIZE at a
+        time, and caches their results. The single character segments and
+        the longer ones each take one query per chunk.
+        - stats, if given, records the time spent in each stage
+        """
+        results: Dict[str, List[Union[Word, Character]]] = {word: [] for word in words}
+        characters: List[str] = [word for word in words if len(word) == 1]
+        longer_words: List[str] = [word for word in words if len(word) > 1]
+        for start in range(0, len(characters), BULK_QUERY_SIZE):
+            chunk: List[str] = characters[start : start + BULK_QUERY_SIZE]
+            query_start: float = perf_counter() if stats is not None else 0.0
+            chunk_results = get_words_and_characters_bulk(self._dictionary, [(word, None) for word in chunk])
+            if stats is not None:
+                query_start = stats.add_query(query_start, sum(len(rows) for rows in chunk_results))
+            for word, word_character_results in zip(chunk, chunk_results):
+                results[word] = [
+                    self.combine_word_and_character(word_result, character_result)
+                    for word_result, character_result in word_character_results
+                ]
+            if stats is not None:
+                stats.results += perf_counter() - query_start
+        for start in range(0, len(longer_words), BULK_QUERY_SIZE):
+            chunk = longer_words[start : start + BULK_QUERY_SIZE]
+            query_start = perf_counter() if stats is not None else 0.0
+            word_rows: List[Row] = get_words_with_components_bulk(self._dictionary, chunk)
+            if stats is not None:
+                query_start = stats.add_query(query_start, len(word_rows))
+            rows_by_word: DefaultDict[str, List[Row]] = defaultdict(list)
+            for row in word_rows:
+                rows_by_word[row.Word.simplified].append(row)
+            for word, rows in rows_by_word.items():
+                results[word] = self.assemble_words(rows)
+            if stats is not None:
+                stats.results += perf_counter() - query_start
+        put_start: float = perf_counter() if stats is not None else 0.0
+        for word, result in results.items():
+            self.dictionary_cache.put(word, result)
+        if stats is not None:
+            stats.cache += perf_counter() - put_start
+        return results
+
+    def lookup_segment(self, word: str, stats: Optional[SearchStats] = None) -> List[Union[Word, Character]]:
+        """
+        Returns the results for a single segment, from the cache if it's
+        there (including cached misses) and from the database otherwise.
+        - stats, if given, records the time spent in each stage
+        """
+        start: float = perf_counter() if stats is not None else 0.0
+        cached_result: Optional[List[Union[Word, Character]]] = self.dictionary_cache.get(word)
+        if stats is not None:
+            stats.add_cache_lookup(start, cached_result is not None)
+        if cached_result is not None:
+            return cached_result
+        # check to see if it's a multiple character word, or single character word
+        if len(word) == 1:
+            result: List[Union[Word, Character]] = self.search_character(word, stats)
+        else:
+            result = self.search_word(word, stats)
+        start = perf_counter() if stats is not None else 0.0
+        # cache it even if nothing was found so it isn't looked up again
+        self.dictionary_cache.put(word, result)
+        if stats is not None:
+            stats.cache += perf_counter() - start
+        return result
+
+    def search_character(self, word: str, stats: Optional[SearchStats] = None) -> List[Character]:
+        """
+        Looks up a single character word in the database.
+        - stats, if given, records the time spent querying and building
+          the results
+        """
+        start: float = perf_counter() if stats is not None else 0.0
+        word_character_results: List[
+            Tuple[Word_model, Character_model]
+        ] = get_word_and_character(self._dictionary, word)
+        if stats is not None:
+            start = stats.add_query(start, len(word_character_results))
+        # use the Character structure
+        characters: List[Character] = [
+            self.combine_word_and_character(word_result, character_result)
+            for word_result, character_result in word_character_results
+        ]
+        if stats is not None:
+            stats.results += perf_counter() - start
+        return characters
+
+    def search_word(self, word: str, stats: Optional[SearchStats] = None) -> List[Word]:
+        """
+        Looks up a multiple character word in the database, along with
+        its component characters.
+        - stats, if given, records the time spent querying and building
+          the results
+        """
+        start: float = perf_counter() if stats is not None else 0.0
+        # the words and their precomputed components come in one query,
+        # a row per component
+        word_rows: List[Row] = get_word_with_components(self._dictionary, word)
+        if stats is not None:
+            start = stats.add_query(start, len(word_rows))
+        words: List[Word] = self.assemble_words(word_rows)
+        if stats is not None:
+            stats.results += perf_counter() - start
+        return words
+
+    def assemble_words(self, word_rows: Iterable[Row]) -> List[Word]:
+        """
+        Builds the Word structures, with their components, from the
+        (Word, component Word, Character) rows of get_word_with_components.
+        """
+        words: Dict[int, Word] = {}
+        for word_result, component_result, character_result in word_rows:
+            current_word: Optional[Word] = words.get(word_result.id)
+            if current_word is None:
+                current_word = words[word_result.id] = Word.from_row(word_result)
+            if component_result is not None:
+                character: Character = self.combine_word_and_character(component_result, character_result)
+                current_word.components.append(character)
+        return list(words.values())
+
+    def search_english(self, query: str, limit: int = 20) -> List[Word]:
+        """
+        Looks up words by their English definitions, e.g. "embarrassed".
+        The definitions that contain all the words of the query are ranked
+        by their bm25 score together with how frequent the word is.
+        The words are returned without their components. Raises
+        MissingDefinitionsIndex (see cnlearn.db.fts) if the database was
+        built without the definitions' index.
+        """
+        match_query: str = fts_query(query)
+        if not match_query or limit < 1:
+            return []
+        candidates = get_words_by_definition(
+            self._dictionary, match_query, limit * ENGLISH_CANDIDATES_PER_RESULT
+        )
+
+        def combined_score(candidate) -> float:
+            word_result, score = candidate
+            # bm25 scores are negative, the lower the better
+            return score - FREQUENCY_WEIGHT * log1p(self.corpus_frequency(word_result))
+
+        return [Word.from_row(word_result) for word_result, _ in sorted(candidates, key=combined_score)[:limit]]
+
+    def search_pinyin(self, query: str, limit: int = 50) -> List[Word]:
+        """
+        Looks up words by their pinyin, e.g. "buhaoyisi", "bu4 hao3 yi4 si5",
+        "xi'an" or "nǐhǎo". Pinyin without separators can often be split
+        into syllables in more than one way (xian or xi an) and the words
+        for all of them are returned, most frequent first and those that
+        aren't in the frequency corpus last. Where a tone is given, by
+        number or by mark, only words with that tone match.
+        The words are returned without their components. They are read
+        from the database in pages: of limit words if no tone is given,
+        otherwise of limit words per pinyin looked up, until limit of them
+        have the tones.
+        """
+        splits: List[Split] = split_pinyin(query)
+        if not splits or limit < 1:
+            return []
+        splits_by_pinyin: DefaultDict[str, List[Split]] = defaultdict(list)
+        for split in splits:
+            splits_by_pinyin[" ".join(syllable for syllable, _ in split)].append(split)
+        has_tones: bool = any(tone for split in splits for _, tone in split)
+        page_size: int = limit * len(splits_by_pinyin) if has_tones else limit
+        word_results: List[Word_model] = []
+        offset: int = 0
+        while len(word_results) < limit:
+            rows: List[Row] = get_words_by_pinyin(
+                self._dictionary, list(splits_by_pinyin), self.fallback_frequency, page_size, offset
+            )
+            word_results.extend(
+                row.Word
+                for row in rows
+                if any(
+                    matches_tones(row.Word.pinyin_num, split)
+                    for split in splits_by_pinyin[row.Word.pinyin_clean.lower()]
+                )
+            )
+            if len(rows) < page_size:
+                break
+            offset += page_size
+        return [Word.from_row(word_result) for word_result in word_results[:limit]]
+
+    def corpus_frequency(self, word_result: Word_model) -> int:
+        """
+        Returns the frequency of a word, 0 for the words that aren't in
+        the frequency corpus: they were given a higher frequency than any
+        other when the database was built (see get_fallback_frequency).
+        """
+        fallback_frequency: Optional[int] = self.fallback_frequency
+        frequency: int = word_result.frequency or 0
+        if fallback_frequency is not None and frequency >= fallback_frequency:
+            return 0
+        return frequency
+
+    @property
+    def fallback_frequency(self) -> Optional[int]:
+        """
+        The frequency of the words that aren't in the frequency corpus,
+        None if there are none.
+        """
+        if not self._fallback_frequency_loaded:
+            self._fallback_frequency = get_fallback_frequency(self._dictionary)
+            self._fallback_frequency_loaded = True
+        return self._fallback_frequency
+
+    def close(self) -> None:
+        """
+        Closes the database session, or those of all the threads.
+        """
+        if self._session is not None:
+            self._session.close()
+        with self._lock:
+            sessions, self._sessions = self._sessions, []
+        for session in sessions:
+            session.close()
 
     @staticmethod
     def combine_word_and_character(
         word_result: Word_model, character_result: Character_model
     ) -> Character:
-        character: Character = Character.from_orm(word_result)
-        character.radical = character_result.radical
-        character.decomposition = character_result.decomposition
-        character.etymology = character_result.etymology
-        return character
+        return Character.from_row(
+            word_result,
+            radical=character_result.radical,
+            decomposition=character_result.decomposition,
+            etymology=character_result.etymology,
+        )
 
@@ -0,0 +1,87 @@
+"""
+This module provides the word frequency table built from a corpus
+frequency list such as dict/files/internet-zh.num. It is used by the
+dictionary build scripts to fill in the frequency column and can be used
+at runtime to rank words that are not in the database.
+"""
+from array import array
+from functools import lru_cache
+from typing import Dict, Iterable, List, Sequence
+
+
+# how much larger than the largest rank of the table the fallback rank is
+FALLBACK_MARGIN: int = 9999
+
+class FrequencyTable:
+    """
+    Maps words to their frequency rank: the corpus frequency multiplied by
+    100 and truncated to an integer. Words that are not in the corpus get
+    the fallback rank, which is larger than any rank in the table.
+    The ranks are kept in an int array indexed through a vocabulary map
+    rather than as a dictionary of floats.
+    """
+
+    # number of header lines at the top of the frequency files
+    header_lines: int = 4
+
+    def __init__(self, words: Sequence[str], ranks: Sequence[int]):
+        self._vocabulary: Dict[str, int] = {word: index for index, word in enumerate(words)}
+        known_ranks: List[int] = [ranks[index] for index in self._vocabulary.values()]
+        self.fallback_rank: int = (max(known_ranks) if known_ranks else 0) + FALLBACK_MARGIN
+        # unknown words point at the last slot, which holds the fallback rank
+        self._unknown: int = len(ranks)
+        self._ranks: array = array("l", ranks)
+        self._ranks.append(self.fallback_rank)
+
+    @classmethod
+    def from_lines(cls, lines: Iterable[str]) -> "FrequencyTable":
+        """
+        Creates the table from the lines of a frequency file, e.g.
+        `2 45402.97 的`. If a word appears more than once, its last
+        frequency is kept.
+        """
+        words: List[str] = []
+        ranks: List[int] = []
+        for line in lines:
+            fields: List[str] = line.split(" ")
+            words.append(fields[2].rstrip())
+            ranks.append(int(float(fields[1]) * 100))
+        return cls(words, ranks)
+
+    @classmethod
+    def from_file(cls, path: str) -> "FrequencyTable":
+        """
+        Creates the table from a frequency file.
+        """
+        with open(path, "r", encoding="utf-8") as freq_file:
+            return cls.from_lines(freq_file.read().splitlines()[cls.header_lines :])
+
+    def rank(self, word: str) -> int:
+        """
+        Returns the rank of a word, or the fallback rank if it's unknown.
+        """
+        return self._ranks[self._vocabulary.get(word, self._unknown)]
+
+    def bulk_rank(self, words: Iterable[str]) -> List[int]:
+        """
+        Returns the ranks of several words, in the same order.
+        """
+        ranks: array = self._ranks
+        unknown: int = self._unknown
+        get_index = self._vocabulary.get
+        return [ranks[get_index(word, unknown)] for word in words]
+
+    def __contains__(self, word: str) -> bool:
+        return word in self._vocabulary
+
+    def __len__(self) -> int:
+        return len(self._vocabulary)
+
+
+@lru_cache(maxsize=None)
+def load_frequency_table(path: str) -> FrequencyTable:
+    """
+    Loads the frequency table from a file. The file is only read once
+    per process, later calls return the same table.
+    """
+    return FrequencyTable.from_file(path)
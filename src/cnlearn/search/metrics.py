@@ -0,0 +1,296 @@
+"""
+This module provides the metrics of a Dictionary running in a long-lived
+process, e.g. a web service: how long searches take and where that time
+goes, how the cache is doing, how many queries are run, the database
+connection pool and how fast text gets segmented. They can be exported
+in the Prometheus text format or as a dict, and served over HTTP:
+
+    dictionary = Dictionary(thread_safe=True)
+    registry = MetricsRegistry(dictionary)
+    server = serve_metrics(registry, port=9464)
+
+Prometheus then scrapes http://127.0.0.1:9464/metrics; /metrics.json
+returns the snapshot. The registry instruments the Dictionary's Chinese
+searches (see SearchStats), which only costs them a few timer calls.
+Those of search_chinese, search, iter_search_chinese, search_chinese_many
+and resolve_segments are all recorded, and so are those of the
+AsyncDictionary and of annotate_document. A call searching several texts
+at once counts a search per text but is a single observation of the
+latency histogram.
+"""
+import json
+from bisect import bisect_left
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from threading import Lock, Thread
+from typing import Any, Dict, List, Optional, Sequence, Tuple, Union
+
+from sqlalchemy.engine import Engine
+
+from cnlearn.db import settings
+from cnlearn.search.cache import SearchCache
+from cnlearn.search.dictionary import Dictionary
+from cnlearn.search.stats import SearchStats
+
+
+# upper bounds, in seconds, of the buckets of the search latency histogram
+LATENCY_BUCKETS: Tuple[float, ...] = (
+    0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5
+)
+PROMETHEUS_CONTENT_TYPE: str = "text/plain; version=0.0.4; charset=utf-8"
+
+Number = Union[int, float]
+
+
+class Histogram:
+    """
+    Counts observations in buckets, like a Prometheus histogram: the
+    count of a bucket is that of the observations less than or equal to
+    its upper bound.
+    """
+
+    def __init__(self, buckets: Sequence[float] = LATENCY_BUCKETS):
+        self.buckets: Tuple[float, ...] = tuple(sorted(buckets))
+        # the observations in each bucket only, the last one above them all
+        self._counts: List[int] = [0] * (len(self.buckets) + 1)
+        self.sum: float = 0.0
+        self.count: int = 0
+        self._lock: Lock = Lock()
+
+    def observe(self, value: float) -> None:
+        index: int = bisect_left(self.buckets, value)
+        with self._lock:
+            self._counts[index] += 1
+            self.sum += value
+            self.count += 1
+
+    def cumulative_counts(self) -> Dict[str, int]:
+        """
+        Returns the count of each bucket keyed by its upper bound, "+Inf"
+        being that of all the observations.
+        """
+        with self._lock:
+            counts: List[int] = list(self._counts)
+        cumulative: Dict[str, int] = {}
+        total: int = 0
+        for bound, count in zip(self.buckets + (float("inf"),), counts):
+            total += count
+            cumulative[format_value(bound)] = total
+        return cumulative
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self._lock:
+            total, count = self.sum, self.count
+        return {"buckets": self.cumulative_counts(), "sum": total, "count": count}
+
+
+class Metric:
+    """
+    A metric as Prometheus sees it: its name, type (counter, gauge or
+    histogram), description and value, which is a number, a Histogram or,
+    for a metric with a label, the value for each value of the label.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        kind: str,
+        description: str,
+        value: Union[Number, Histogram, Dict[str, Number]],
+        label: Optional[str] = None,
+    ):
+        self.name: str = name
+        self.kind: str = kind
+        self.description: str = description
+        self.value: Union[Number, Histogram, Dict[str, Number]] = value
+        self.label: Optional[str] = label
+
+    def samples(self) -> List[Tuple[str, Dict[str, str], Number]]:
+        """
+        Returns the (name, labels, value) samples of the metric.
+        """
+        if isinstance(self.value, Histogram):
+            snapshot: Dict[str, Any] = self.value.snapshot()
+            buckets: Dict[str, int] = snapshot["buckets"]
+            return [
+                *((f"{self.name}_bucket", {"le": bound}, count) for bound, count in buckets.items()),
+                (f"{self.name}_sum", {}, snapshot["sum"]),
+                (f"{self.name}_count", {}, snapshot["count"]),
+            ]
+        if isinstance(self.value, dict):
+            return [(self.name, {self.label: key}, value) for key, value in self.value.items()]
+        return [(self.name, {}, self.value)]
+
+    def snapshot(self) -> Union[Number, Dict[str, Any]]:
+        if isinstance(self.value, Histogram):
+            return self.value.snapshot()
+        if isinstance(self.value, dict):
+            return dict(self.value)
+        return self.value
+
+
+def format_value(value: Number) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    return str(value)
+
+
+def format_labels(labels: Dict[str, str]) -> str:
+    if not labels:
+        return ""
+    escaped: Dict[str, str] = {
+        name: value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+        for name, value in labels.items()
+    }
+    return "{" + ",".join(f'{name}="{value}"' for name, value in escaped.items()) + "}"
+
+
+class MetricsRegistry:
+    """
+    Collects the metrics of a Dictionary. Registering turns on the
+    instrumentation of its searches, whose stats are added up here from
+    then on.
+    - dictionary is the Dictionary to watch
+    - buckets are the upper bounds, in seconds, of the latency histogram
+    """
+
+    def __init__(self, dictionary: Dictionary, buckets: Sequence[float] = LATENCY_BUCKETS):
+        self.dictionary: Dictionary = dictionary
+        self.search_latency: Histogram = Histogram(buckets)
+        self.search_stats: SearchStats = SearchStats()
+        self._lock: Lock = Lock()
+        dictionary.instrument = True
+        dictionary.search_listeners.append(self.observe_search)
+
+    def observe_search(self, stats: SearchStats) -> None:
+        self.search_latency.observe(stats.total)
+        with self._lock:
+            self.search_stats.merge(stats)
+
+    @property
+    def engine(self) -> Engine:
+        """
+        The engine the Dictionary's sessions come from.
+        """
+        return settings.read_only_engine if self.dictionary.thread_safe else settings.engine
+
+    def collect(self) -> List[Metric]:
+        """
+        Returns the current value of every metric.
+        """
+        with self._lock:
+            stats: SearchStats = SearchStats() + self.search_stats
+        cache: SearchCache = self.dictionary.dictionary_cache
+        metrics: List[Metric] = [
+            Metric("cnlearn_searches_total", "counter", "Chinese searches.", stats.searches),
+            Metric(
+                "cnlearn_search_duration_seconds",
+                "histogram",
+                "Time spent in Chinese searches.",
+                self.search_latency,
+            ),
+            Metric(
+                "cnlearn_search_stage_seconds_total",
+                "counter",
+                "Time spent in each stage of the Chinese searches.",
+                {stage: getattr(stats, stage) for stage in SearchStats.STAGES},
+                label="stage",
+            ),
+            Metric("cnlearn_search_segments_total", "counter", "Segments searched.", stats.segments),
+            Metric("cnlearn_queries_total", "counter", "Queries run by the searches.", stats.queries),
+            Metric("cnlearn_query_rows_total", "counter", "Rows returned by the queries.", stats.rows),
+            Metric(
+                "cnlearn_segmentation_segments_per_second",
+                "gauge",
+                "Segments produced per second of segmentation.",
+                stats.segments / stats.segmentation if stats.segmentation else 0.0,
+            ),
+            Metric("cnlearn_cache_size", "gauge", "Segments in the search cache.", len(cache)),
+            Metric("cnlearn_cache_hits_total", "counter", "Search cache hits.", cache.stats.hits),
+            Metric("cnlearn_cache_misses_total", "counter", "Search cache misses.", cache.stats.misses),
+            Metric(
+                "cnlearn_cache_evictions_total", "counter", "Search cache evictions.", cache.stats.evictions
+            ),
+            Metric(
+                "cnlearn_cache_hit_ratio", "gauge", "Fraction of the cache lookups that hit.", cache.stats.hit_ratio
+            ),
+            Metric(
+                "cnlearn_search_history_words",
+                "gauge",
+                "Distinct words in the search history.",
+                len(self.dictionary.search_history),
+            ),
+        ]
+        pool = self.engine.pool
+        # only pools that keep connections, like the read-only profiles',
+        # have anything to report
+        if hasattr(pool, "checkedout"):
+            connections: Dict[str, Number] = {
+                "checked_in": pool.checkedin(),
+                "checked_out": pool.checkedout(),
+                "overflow": pool.overflow(),
+            }
+            metrics.append(Metric("cnlearn_db_pool_size", "gauge", "Size of the connection pool.", pool.size()))
+            metrics.append(
+                Metric(
+                    "cnlearn_db_pool_connections",
+                    "gauge",
+                    "Connections of the pool, by state.",
+                    connections,
+                    label="state",
+                )
+            )
+        return metrics
+
+    def snapshot(self) -> Dict[str, Any]:
+        """
+        Returns the metrics as a dict keyed by their names.
+        """
+        return {metric.name: metric.snapshot() for metric in self.collect()}
+
+    def prometheus_text(self) -> str:
+        """
+        Returns the metrics in the Prometheus text exposition format.
+        """
+        lines: List[str] = []
+        for metric in self.collect():
+            lines.append(f"# HELP {metric.name} {metric.description}")
+            lines.append(f"# TYPE {metric.name} {metric.kind}")
+            for name, labels, value in metric.samples():
+                lines.append(f"{name}{format_labels(labels)} {format_value(value)}")
+        return "\n".join(lines) + "\n"
+
+
+def serve_metrics(
+    registry: MetricsRegistry, port: int = 9464, host: str = "127.0.0.1"
+) -> ThreadingHTTPServer:
+    """
+    Serves the metrics from a daemon thread, in the Prometheus text format
+    at /metrics and as JSON at /metrics.json, and returns the server; its
+    shutdown method stops it. Port 0 picks a free port (server_port).
+    """
+
+    class MetricsHandler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            path: str = self.path.split("?")[0]
+            if path == "/metrics":
+                body: bytes = registry.prometheus_text().encode("utf-8")
+                content_type: str = PROMETHEUS_CONTENT_TYPE
+            elif path == "/metrics.json":
+                body = json.dumps(registry.snapshot()).encode("utf-8")
+                content_type = "application/json"
+            else:
+                self.send_error(404)
+                return
+            self.send_response(200)
+            self.send_header("Content-Type", content_type)
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, format, *args):
+            # scrapes every few seconds would flood stderr
+            pass
+
+    server = ThreadingHTTPServer((host, port), MetricsHandler)
+    Thread(target=server.serve_forever, name="metrics-server", daemon=True).start()
+    return server
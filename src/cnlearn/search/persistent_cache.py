@@ -0,0 +1,176 @@
+"""
+This module provides a SearchCache that keeps the assembled search results
+in a side SQLite file as well as in memory, so that new processes (after a
+restart, or other workers) start with a warm cache. The file records a
+content hash of the dictionary database it was filled from, and the
+format of the results it holds, and is emptied automatically when either
+changes.
+"""
+import json
+import os
+import sqlite3
+from hashlib import sha256
+from threading import Lock
+from typing import Any, Dict, Hashable, List, Optional, Union
+
+from cnlearn.db.settings import db
+from cnlearn.schemas.structures import Character, Word
+from cnlearn.search.cache import CacheStats, LRUCache, SearchCache
+
+
+RESULT_TYPES: Dict[str, Any] = {"Word": Word, "Character": Character}
+# the format of the cached results, to be increased whenever their
+# serialization or the Word and Character structures change, so the
+# results cached by older versions are thrown away
+CACHE_FORMAT_VERSION: str = "1"
+
+
+def default_cache_path() -> str:
+    """
+    Returns the default location of the result cache file, in the user's
+    cache directory.
+    """
+    cache_home: str = os.environ.get("XDG_CACHE_HOME") or os.path.join(os.path.expanduser("~"), ".cache")
+    return os.path.join(cache_home, "cnlearn", "results.sqlite")
+
+
+def file_hash(path: str) -> str:
+    """
+    Returns the SHA-256 of a file's contents.
+    """
+    checksum = sha256()
+    with open(path, "rb") as database_file:
+        for block in iter(lambda: database_file.read(1 << 20), b""):
+            checksum.update(block)
+    return checksum.hexdigest()
+
+
+def result_records(results: List[Union[Word, Character]]) -> List[Dict[str, Any]]:
+    """
+    Returns the results as the JSON-ready records they are serialized to.
+    """
+    return [{"type": type(result).__name__, "data": result.dict()} for result in results]
+
+
+def serialize_results(results: List[Union[Word, Character]]) -> str:
+    return json.dumps(result_records(results), ensure_ascii=False)
+
+
+def deserialize_results(value: str) -> List[Union[Word, Character]]:
+    return [RESULT_TYPES[result["type"]].parse_obj(result["data"]) for result in json.loads(value)]
+
+
+class PersistentCache(SearchCache):
+    """
+    Two level cache: a SearchCache in memory (a LRUCache by default) in
+    front of a SQLite file holding every result that was ever put.
+    - path is the cache file, default_cache_path() by default
+    - database is the dictionary database the results come from; the cache
+      is cleared whenever its contents, or CACHE_FORMAT_VERSION, change
+
+    Its length is that of the file, every result ever cached, rather than
+    that of the front cache, len(front).
+    """
+
+    def __init__(
+        self, path: Optional[str] = None, database: str = db, front: Optional[SearchCache] = None
+    ):
+        self.path: str = path or default_cache_path()
+        self.database: str = database
+        self.front: SearchCache = front if front is not None else LRUCache()
+        self.stats: CacheStats = CacheStats()
+        self._lock: Lock = Lock()
+        os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+        self._connection: sqlite3.Connection = sqlite3.connect(
+            self.path, timeout=30, check_same_thread=False, isolation_level=None
+        )
+        # WAL so several processes can share the file
+        self._connection.execute("PRAGMA journal_mode = WAL")
+        self._connection.execute("PRAGMA synchronous = NORMAL")
+        self._connection.execute("CREATE TABLE IF NOT EXISTS results (key TEXT PRIMARY KEY, value TEXT NOT NULL)")
+        self._connection.execute("CREATE TABLE IF NOT EXISTS meta (name TEXT PRIMARY KEY, value TEXT NOT NULL)")
+        self.database_version: str = self._check_database_version()
+
+    def _meta(self) -> Dict[str, str]:
+        return dict(self._connection.execute("SELECT name, value FROM meta").fetchall())
+
+    def _check_database_version(self) -> str:
+        """
+        Works out the content hash of the dictionary database and clears
+        the cached results if they were made from a different one, or are
+        in another format than CACHE_FORMAT_VERSION. The hash is only
+        recomputed when the database's size or modification time differ
+        from the ones recorded with it.
+        """
+        stat: os.stat_result = os.stat(self.database)
+        size, mtime = str(stat.st_size), str(stat.st_mtime_ns)
+        meta: Dict[str, str] = self._meta()
+        if (
+            meta.get("format_version") == CACHE_FORMAT_VERSION
+            and meta.get("database_size") == size
+            and meta.get("database_mtime") == mtime
+            and "database_hash" in meta
+        ):
+            return meta["database_hash"]
+        version: str = file_hash(self.database)
+        with self._lock:
+            self._connection.execute("BEGIN IMMEDIATE")
+            meta = self._meta()
+            if meta.get("database_hash") != version or meta.get("format_version") != CACHE_FORMAT_VERSION:
+                self._connection.execute("DELETE FROM results")
+            self._connection.executemany(
+                "INSERT OR REPLACE INTO meta (name, value) VALUES (?, ?)",
+                [
+                    ("database_hash", version),
+                    ("database_size", size),
+                    ("database_mtime", mtime),
+                    ("format_version", CACHE_FORMAT_VERSION),
+                ],
+            )
+            self._connection.execute("COMMIT")
+        return version
+
+    def get(self, key: Hashable) -> Optional[List[Any]]:
+        result: Optional[List[Any]] = self.front.get(key)
+        if result is None:
+            with self._lock:
+                row = self._connection.execute("SELECT value FROM results WHERE key = ?", (key,)).fetchone()
+            if row is not None:
+                result = deserialize_results(row[0])
+                self.front.put(key, result)
+        with self._lock:
+            if result is None:
+                self.stats.misses += 1
+            else:
+                self.stats.hits += 1
+        return result
+
+    def put(self, key: Hashable, value: List[Any]) -> None:
+        self.front.put(key, value)
+        serialized: str = serialize_results(value)
+        with self._lock:
+            self._connection.execute(
+                "INSERT OR REPLACE INTO results (key, value) VALUES (?, ?)", (key, serialized)
+            )
+
+    def clear(self) -> None:
+        self.front.clear()
+        with self._lock:
+            self._connection.execute("DELETE FROM results")
+
+    def close(self) -> None:
+        with self._lock:
+            self._connection.close()
+
+    def __contains__(self, key: Hashable) -> bool:
+        if key in self.front:
+            return True
+        with self._lock:
+            return self._connection.execute("SELECT 1 FROM results WHERE key = ?", (key,)).fetchone() is not None
+
+    def __len__(self) -> int:
+        """
+        Returns the number of results in the file, not only in front.
+        """
+        with self._lock:
+            return self._connection.execute("SELECT count(*) FROM results").fetchone()[0]
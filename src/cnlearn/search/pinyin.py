@@ -0,0 +1,177 @@
+"""
+This module splits pinyin typed by a user (e.g. "buhaoyisi", "bu4 hao3",
+"xi'an" or "nǐhǎo") into syllables, for searching words by pinyin.
+Syllables are spelled the way CEDICT spells them, with ü written as u:.
+"""
+import re
+from functools import lru_cache
+from itertools import product
+from operator import itemgetter
+from typing import Dict, FrozenSet, List, Optional, Pattern, Tuple
+
+# every toneless Mandarin syllable, spelled the way CEDICT spells them
+# (ü is written as u: after n and l)
+SYLLABLES: Tuple[str, ...] = tuple(
+    """
+    a ai an ang ao
+    ba bai ban bang bao bei ben beng bi bian biao bie bin bing bo bu
+    ca cai can cang cao ce cen ceng cha chai chan chang chao che chen cheng chi chong chou
+    chu chua chuai chuan chuang chui chun chuo ci cong cou cu cuan cui cun cuo
+    da dai dan dang dao de dei den deng di dia dian diao die ding diu dong dou du duan dui dun duo
+    e ei en eng er
+    fa fan fang fei fen feng fo fou fu
+    ga gai gan gang gao ge gei gen geng gong gou gu gua guai guan guang gui gun guo
+    ha hai han hang hao he hei hen heng hm hng hong hou hu hua huai huan huang hui hun huo
+    ji jia jian jiang jiao jie jin jing jiong jiu ju juan jue jun
+    ka kai kan kang kao ke kei ken keng kong kou ku kua kuai kuan kuang kui kun kuo
+    la lai lan lang lao le lei leng li lia lian liang liao lie lin ling liu lo long lou
+    lu lu: lu:e luan lun luo
+    m ma mai man mang mao me mei men meng mi mian miao mie min ming miu mo mou mu
+    n na nai nan nang nao ne nei nen neng ng ni nian niang niao nie nin ning niu nong nou
+    nu nu: nu:e nuan nun nuo
+    o ou
+    pa pai pan pang pao pei pen peng pi pian piao pie pin ping po pou pu
+    qi qia qian qiang qiao qie qin qing qiong qiu qu quan que qun
+    r ran rang rao re ren reng ri rong rou ru rua ruan rui run ruo
+    sa sai san sang sao se sen seng sha shai shan shang shao she shei shen sheng shi shou
+    shu shua shuai shuan shuang shui shun shuo si song sou su suan sui sun suo
+    ta tai tan tang tao te tei teng ti tian tiao tie ting tong tou tu tuan tui tun tuo
+    wa wai wan wang wei wen weng wo wu
+    xi xia xian xiang xiao xie xin xing xiong xiu xu xuan xue xun
+    ya yan yang yao ye yi yin ying yo yong you yu yuan yue yun
+    za zai zan zang zao ze zei zen zeng zha zhai zhan zhang zhao zhe zhei zhen zheng zhi
+    zhong zhou zhu zhua zhuai zhuan zhuang zhui zhun zhuo zi zong zou zu zuan zui zun zuo
+    """.split()
+)
+SYLLABLE_SET: FrozenSet[str] = frozenset(SYLLABLES)
+LONGEST_SYLLABLE: int = max(len(syllable) for syllable in SYLLABLES)
+
+# vowels with a tone mark -> (vowel as CEDICT spells it, tone)
+TONE_MARKS: Dict[str, Tuple[str, int]] = {
+    marked: (vowel, tone)
+    for vowel, marks in {
+        "a": "āáǎà",
+        "e": "ēéěè",
+        "i": "īíǐì",
+        "o": "ōóǒò",
+        "u": "ūúǔù",
+        "u:": "ǖǘǚǜ",
+    }.items()
+    for tone, marked in enumerate(marks, start=1)
+}
+# the most splits of a query that are looked up
+MAX_SPLITS: int = 64
+
+# a run of letters, optionally followed by a tone number
+PINYIN_PART_PATTERN: Pattern = re.compile(r"([^\d\s'’-]+)([0-5]?)")
+
+# a split is a list of (syllable, tone) pairs, tone None when not given
+Split = List[Tuple[str, Optional[int]]]
+# a split of split_syllables: its number of syllables, its first one and
+# the node of the rest, the end of every split being (0, "", None)
+SplitNode = Tuple[int, str, Optional["SplitNode"]]
+
+
+def normalize_letters(letters: str) -> Tuple[str, List[Optional[int]]]:
+    """
+    Spells a run of letters the way CEDICT does (lower case, ü and v as
+    u:) and takes out the tone marks. Returns the spelling and, for each
+    of its characters, the tone marked on it (None if there isn't one).
+    """
+    spelling: List[str] = []
+    tones: List[Optional[int]] = []
+    for letter in letters.lower():
+        tone: Optional[int] = None
+        if letter in TONE_MARKS:
+            letter, tone = TONE_MARKS[letter]
+        elif letter in ("ü", "v"):
+            letter = "u:"
+        spelling.append(letter)
+        tones.extend([tone] + [None] * (len(letter) - 1))
+    return "".join(spelling), tones
+
+
+@lru_cache(maxsize=4096)
+def split_syllables(spelling: str) -> Tuple[Tuple[str, ...], ...]:
+    """
+    Returns every way of splitting a toneless spelling into syllables,
+    e.g. "xian" gives ("xian",) and ("xi", "an"). The splits with fewer
+    (so longer) syllables come first and only MAX_SPLITS are kept, so a
+    long ambiguous spelling doesn't blow up.
+    """
+    # the splits of each suffix, from the end of the spelling back, as
+    # (number of syllables, first syllable, split of the rest) nodes that
+    # share their tails, so a long spelling neither recurses once per
+    # letter nor copies its splits at every position
+    end_node: SplitNode = (0, "", None)
+    suffix_splits: List[List[SplitNode]] = [[] for _ in spelling] + [[end_node]]
+    for start in range(len(spelling) - 1, -1, -1):
+        nodes: List[SplitNode] = []
+        for end in range(min(len(spelling), start + LONGEST_SYLLABLE), start, -1):
+            syllable: str = spelling[start:end]
+            if syllable in SYLLABLE_SET:
+                nodes.extend((rest[0] + 1, syllable, rest) for rest in suffix_splits[end])
+        if len(nodes) > 1:
+            nodes = sorted(nodes, key=itemgetter(0))[:MAX_SPLITS]
+        suffix_splits[start] = nodes
+    splits: List[Tuple[str, ...]] = []
+    for node in suffix_splits[0]:
+        syllables: List[str] = []
+        while node[2] is not None:
+            syllables.append(node[1])
+            node = node[2]
+        splits.append(tuple(syllables))
+    return tuple(splits)
+
+
+def split_pinyin(query: str, max_splits: int = MAX_SPLITS) -> List[Split]:
+    """
+    Splits pinyin into syllables with their tones. Spaces, apostrophes
+    and tone numbers always end a syllable, so "xian" can be xian or
+    xi an but "xi'an" and "xi1an1" can't be xian. Tone numbers apply to the
+    syllable before them (0 and 5 are the neutral tone) and tone marks to
+    the syllable they are on. Returns at most max_splits splits, the ones
+    with the fewest syllables first, or [] if it isn't valid pinyin.
+    """
+    part_splits: List[List[Split]] = []
+    for letters, tone_number in PINYIN_PART_PATTERN.findall(query):
+        spelling, marked_tones = normalize_letters(letters)
+        splits: List[Split] = []
+        for syllables in split_syllables(spelling):
+            split: Split = []
+            start: int = 0
+            for syllable in syllables:
+                tone: Optional[int] = next(
+                    (tone for tone in marked_tones[start : start + len(syllable)] if tone), None
+                )
+                split.append((syllable, tone))
+                start += len(syllable)
+            if tone_number:
+                split[-1] = (split[-1][0], int(tone_number) or 5)
+            splits.append(split)
+        if not splits:
+            return []
+        part_splits.append(splits)
+    if not part_splits:
+        return []
+    combined: List[Split] = []
+    for parts in product(*part_splits):
+        combined.append([syllable for part in parts for syllable in part])
+        if len(combined) == max_splits:
+            break
+    return sorted(combined, key=len)
+
+
+def matches_tones(pinyin_num: str, split: Split) -> bool:
+    """
+    Checks the tones of a word's numbered pinyin (e.g. "bu4 hao3 yi4 si5")
+    against the tones given in a split with the same syllables. Syllables
+    without a tone in the split match any tone.
+    """
+    word_syllables: List[str] = pinyin_num.lower().split()
+    if len(word_syllables) != len(split):
+        return False
+    return all(
+        tone is None or word_syllable == f"{syllable}{tone}"
+        for word_syllable, (syllable, tone) in zip(word_syllables, split)
+    )
@@ -0,0 +1,57 @@
+"""
+This module sets up the jieba tokenizer used to segment search terms.
+When the dictionary build has exported the words table as a jieba
+dictionary (see dict/add_jieba.py), segmentation uses it so that the
+segments line up with the database entries, and the prefix dictionary
+is loaded straight from the cache built with it.
+"""
+import marshal
+import os
+
+import jieba
+from jieba import Tokenizer
+
+from cnlearn.db.settings import JIEBA_CACHE, JIEBA_DICTIONARY
+
+
+def create_tokenizer(dictionary: str = JIEBA_DICTIONARY) -> Tokenizer:
+    """
+    Returns a tokenizer using the exported dictionary if there is one,
+    otherwise jieba's default tokenizer (and stock dictionary).
+    """
+    if os.path.isfile(dictionary):
+        return Tokenizer(dictionary=dictionary)
+    return jieba.dt
+
+
+def uses_exported_dictionary(tokenizer: Tokenizer) -> bool:
+    """
+    Checks whether a tokenizer uses a dictionary exported from the words
+    table rather than jieba's stock dictionary.
+    """
+    return tokenizer is not jieba.dt
+
+
+def initialize_tokenizer(tokenizer: Tokenizer, cache_file: str = JIEBA_CACHE) -> None:
+    """
+    Loads the tokenizer's prefix dictionary. For an exported dictionary
+    the prebuilt cache is read directly, so jieba neither rebuilds it nor
+    compares file modification times (which installing the package can
+    change). If the cache can't be read, jieba builds the prefix
+    dictionary itself.
+    """
+    if tokenizer.initialized:
+        return
+    if uses_exported_dictionary(tokenizer) and os.path.isfile(cache_file):
+        with tokenizer.lock:
+            if tokenizer.initialized:
+                return
+            try:
+                with open(cache_file, "rb") as cache:
+                    tokenizer.FREQ, tokenizer.total = marshal.load(cache)
+            except (OSError, EOFError, ValueError, TypeError):
+                pass
+            else:
+                tokenizer.initialized = True
+                return
+    tokenizer.initialize()
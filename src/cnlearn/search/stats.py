@@ -0,0 +1,88 @@
+"""
+This module provides SearchStats, which tells where the time of Chinese
+searches goes: segmenting with jieba, the cache, the SQL queries and
+building the result structures. A Dictionary only records them when it
+is created with instrument=True or when a SearchStats is passed to a
+search, so searches that aren't instrumented don't pay for the timing.
+"""
+from time import perf_counter
+from typing import Dict, Union
+
+
+class SearchStats:
+    """
+    Durations, in seconds, and counts describing one or more searches.
+    The stats of several searches add up with merge, or +:
+    - segmentation is the time spent segmenting the text
+    - cache is the time spent getting results from and putting them in
+      the cache
+    - sql is the time spent running the queries and loading their rows
+    - results is the time spent building the Word and Character results
+    - segments are the (non blank) segments searched
+    - queries and rows are the queries run and the rows they returned
+    - cache_hits and cache_misses are the segments found in the cache or not
+    """
+
+    STAGES = ("segmentation", "cache", "sql", "results")
+    COUNTS = ("searches", "segments", "queries", "rows", "cache_hits", "cache_misses")
+
+    def __init__(self):
+        self.segmentation: float = 0.0
+        self.cache: float = 0.0
+        self.sql: float = 0.0
+        self.results: float = 0.0
+        self.searches: int = 0
+        self.segments: int = 0
+        self.queries: int = 0
+        self.rows: int = 0
+        self.cache_hits: int = 0
+        self.cache_misses: int = 0
+
+    @property
+    def total(self) -> float:
+        """
+        Returns the time spent in all the stages.
+        """
+        return self.segmentation + self.cache + self.sql + self.results
+
+    def add_cache_lookup(self, start: float, hit: bool) -> None:
+        """
+        Counts a cache lookup started at start, a perf_counter() time.
+        """
+        self.cache += perf_counter() - start
+        if hit:
+            self.cache_hits += 1
+        else:
+            self.cache_misses += 1
+
+    def add_query(self, start: float, n_rows: int) -> float:
+        """
+        Counts a query started at start, a perf_counter() time, which
+        returned n_rows rows, and returns the time it was done.
+        """
+        now: float = perf_counter()
+        self.sql += now - start
+        self.queries += 1
+        self.rows += n_rows
+        return now
+
+    def merge(self, other: "SearchStats") -> None:
+        """
+        Adds the durations and counts of other to these.
+        """
+        for name in self.STAGES + self.COUNTS:
+            setattr(self, name, getattr(self, name) + getattr(other, name))
+
+    def __add__(self, other: "SearchStats") -> "SearchStats":
+        stats = SearchStats()
+        stats.merge(self)
+        stats.merge(other)
+        return stats
+
+    def as_dict(self) -> Dict[str, Union[int, float]]:
+        return {name: getattr(self, name) for name in self.STAGES + self.COUNTS}
+
+    def __repr__(self):
+        stages: str = ", ".join(f"{name}={getattr(self, name) * 1000:.3f}ms" for name in self.STAGES)
+        counts: str = ", ".join(f"{name}={getattr(self, name)}" for name in self.COUNTS)
+        return f"<SearchStats({stages}, {counts})>"
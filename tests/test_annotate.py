@@ -0,0 +1,75 @@
+import json
+from typing import List
+
+import pytest
+
+from cnlearn.search.annotate import annotate_document, iter_chunks, iter_sentences
+from cnlearn.search.cache import LRUCache
+from cnlearn.search.dictionary import Dictionary
+from cnlearn.search.persistent_cache import deserialize_results
+
+
+DOCUMENT: List[str] = ["我们是意大利人。不好意思！\n", "\n", "“好吗？”他说。好\n"]
+
+
+@pytest.fixture
+def dictionary() -> Dictionary:
+    return Dictionary(jieba_startup="lazy", cache=LRUCache())
+
+
+def test_iter_sentences():
+    assert list(iter_sentences(DOCUMENT)) == [
+        (1, "我们是意大利人。"),
+        (1, "不好意思！"),
+        (3, "“好吗？”"),
+        (3, "他说。"),
+        (3, "好"),
+    ]
+
+
+def test_iter_chunks():
+    sentences = list(iter_sentences(DOCUMENT))
+    chunks = list(iter_chunks(sentences, chunk_size=8))
+    assert [len(chunk) for chunk in chunks] == [1, 2, 2]
+    assert [sentence for chunk in chunks for sentence in chunk] == sentences
+
+
+@pytest.mark.parametrize("workers", [1, 2])
+def test_annotate_document(dictionary: Dictionary, workers: int):
+    """
+    Every sentence comes out with all its segments and the results a
+    search finds for them.
+    """
+    annotated = [json.loads(line) for line in annotate_document(DOCUMENT, dictionary, workers, chunk_size=8)]
+    assert [(sentence["line"], sentence["text"]) for sentence in annotated] == list(iter_sentences(DOCUMENT))
+    for sentence in annotated:
+        assert "".join(segment["segment"] for segment in sentence["segments"]) == sentence["text"]
+        results = [
+            result
+            for segment in sentence["segments"]
+            for result in deserialize_results(json.dumps(segment["results"]))
+        ]
+        assert results == Dictionary(cache=LRUCache()).search(sentence["text"])
+    assert dictionary.search_history == {}
+
+
+def test_annotate_document_max_results(dictionary: Dictionary):
+    annotated = [json.loads(line) for line in annotate_document(["好"], dictionary, workers=1, max_results=1)]
+    assert len(annotated[0]["segments"][0]["results"]) == 1
+    assert len(dictionary.dictionary_cache["好"]) == 2
+
+
+def test_annotate_document_single_chunk(dictionary: Dictionary, mocker):
+    """
+    A document that fits in a single chunk is segmented in this process.
+    """
+    process_pool = mocker.patch("cnlearn.search.annotate.ProcessPoolExecutor")
+    annotated = list(annotate_document(DOCUMENT, dictionary, workers=4))
+    assert len(annotated) == len(list(iter_sentences(DOCUMENT)))
+    process_pool.assert_not_called()
+
+
+@pytest.mark.parametrize("workers", [0, -1])
+def test_annotate_document_workers(dictionary: Dictionary, workers: int):
+    with pytest.raises(ValueError):
+        next(annotate_document(DOCUMENT, dictionary, workers))
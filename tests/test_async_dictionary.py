@@ -0,0 +1,88 @@
+import asyncio
+from typing import List
+
+import pytest
+
+from cnlearn.search.async_dictionary import AsyncDictionary
+from cnlearn.search.cache import LRUCache
+from cnlearn.search.dictionary import Dictionary
+
+
+TEXTS: List[str] = ["不好意思", "意大利", "好", "我们是不满意的人", "西安"]
+
+
+@pytest.fixture
+def expected_results():
+    """
+    Returns the results of a synchronous Dictionary for TEXTS.
+    """
+    dictionary = Dictionary(cache=LRUCache())
+    results = []
+    for text in TEXTS:
+        dictionary.search_chinese(text)
+        results.append(list(dictionary.words_found))
+    return results
+
+
+def test_async_search_chinese(expected_results):
+    async def search_all():
+        async with AsyncDictionary() as dictionary:
+            return await asyncio.gather(*(dictionary.search_chinese(text) for text in TEXTS))
+
+    assert asyncio.run(search_all()) == expected_results
+
+
+def test_async_search_many(expected_results):
+    async def search_many():
+        async with AsyncDictionary() as dictionary:
+            return await dictionary.search_many(TEXTS)
+
+    assert asyncio.run(search_many()) == expected_results
+
+
+def test_async_requests_are_batched(mocker):
+    """
+    Requests made while the worker thread is busy are searched together.
+    """
+
+    async def search_all():
+        async with AsyncDictionary() as dictionary:
+            spied_batch = mocker.spy(dictionary, "_search_batch")
+            results = await asyncio.gather(
+                dictionary.search_chinese(TEXTS[0]), *(dictionary.search_chinese(text) for text in TEXTS)
+            )
+            return results, spied_batch.call_count
+
+    results, n_batches = asyncio.run(search_all())
+    assert len(results) == len(TEXTS) + 1
+    assert results[0] == results[1]
+    assert n_batches < len(TEXTS) + 1
+
+
+def test_async_search_many_empty():
+    async def search_many():
+        async with AsyncDictionary() as dictionary:
+            return await dictionary.search_many([])
+
+    assert asyncio.run(search_many()) == []
+
+
+def test_async_batcher_cancelled(expected_results):
+    """
+    Cancelling the batcher cancels the requests it had, and the next
+    request starts a new one instead of waiting forever.
+    """
+
+    async def cancel_and_search():
+        async with AsyncDictionary() as dictionary:
+            request = asyncio.ensure_future(dictionary.search_chinese(TEXTS[0]))
+            # let the request start the batcher and the batcher take it
+            while dictionary._batcher is None or dictionary._pending:
+                await asyncio.sleep(0)
+            dictionary._batcher.cancel()
+            with pytest.raises(asyncio.CancelledError):
+                await asyncio.wait_for(request, timeout=10)
+            assert dictionary._batcher is None
+            return await asyncio.wait_for(dictionary.search_chinese(TEXTS[0]), timeout=10)
+
+    assert asyncio.run(cancel_and_search()) == expected_results[0]
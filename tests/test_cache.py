@@ -0,0 +1,122 @@
+from threading import Thread
+from typing import List
+
+import pytest
+
+from cnlearn.search.cache import LRUCache
+
+
+class FakeClock:
+    """
+    Clock whose time only moves when the test says so.
+    """
+
+    def __init__(self):
+        self.now: float = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+@pytest.fixture
+def clock() -> FakeClock:
+    return FakeClock()
+
+
+def test_get_and_put():
+    cache = LRUCache(max_size=2)
+    assert cache.get("好") is None
+    cache.put("好", [1, 2])
+    assert cache.get("好") == [1, 2]
+    assert "好" in cache
+    assert cache["好"] == [1, 2]
+    assert len(cache) == 1
+    assert cache.stats.hits == 1 and cache.stats.misses == 1
+    assert cache.stats.hit_ratio == 0.5
+
+
+def test_negative_entries():
+    """
+    An empty list is a cached miss, not a missing entry.
+    """
+    cache = LRUCache()
+    cache.put("的", [])
+    assert cache.get("的") == []
+    assert "的" in cache
+    assert cache.stats.hits == 1 and cache.stats.misses == 0
+
+
+def test_lru_eviction():
+    cache = LRUCache(max_size=2)
+    cache.put("不", [1])
+    cache.put("好", [2])
+    # using 不 makes 好 the least recently used entry
+    cache.get("不")
+    cache.put("意", [3])
+    assert "好" not in cache
+    assert "不" in cache and "意" in cache
+    assert len(cache) == 2
+    assert cache.stats.evictions == 1
+    with pytest.raises(KeyError):
+        cache["好"]
+
+
+def test_ttl(clock: FakeClock):
+    cache = LRUCache(ttl=10, clock=clock)
+    cache.put("好", [1])
+    clock.now = 9.9
+    assert cache.get("好") == [1]
+    clock.now = 10
+    assert cache.get("好") is None
+    assert len(cache) == 0
+    assert cache.stats.expirations == 1
+    # putting it again restarts its time to live
+    cache.put("好", [1])
+    clock.now = 15
+    assert "好" in cache
+
+
+def test_clear():
+    cache = LRUCache()
+    for index, key in enumerate("不好意思"):
+        cache.put(key, [index])
+    cache.clear()
+    assert len(cache) == 0
+
+
+@pytest.mark.xfail(raises=ValueError)
+def test_invalid_size():
+    LRUCache(max_size=0)
+
+
+def test_lru_threads():
+    """
+    The counters and the entries stay consistent when several threads use
+    the cache at once.
+    """
+    cache = LRUCache(max_size=50)
+
+    def use_cache(thread: int) -> None:
+        for i in range(2000):
+            key: str = f"{(thread * 7 + i) % 100}"
+            if cache.get(key) is None:
+                cache.put(key, [key])
+
+    sizes: List[int] = []
+
+    def count_entries() -> None:
+        # a put adds an entry before evicting one, which len mustn't see
+        while any(thread.is_alive() for thread in threads):
+            sizes.append(len(cache))
+
+    threads: List[Thread] = [Thread(target=use_cache, args=(thread,)) for thread in range(8)]
+    counter: Thread = Thread(target=count_entries)
+    for thread in threads:
+        thread.start()
+    counter.start()
+    for thread in threads + [counter]:
+        thread.join()
+    assert max(sizes, default=0) <= 50
+    assert cache.stats.lookups == 8 * 2000
+    assert len(cache) == 50
+    assert all(cache[key] == [key] for key in list(cache._entries))
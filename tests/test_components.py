@@ -0,0 +1,41 @@
+from typing import Dict, List
+
+from cnlearn.db.components import component_records, posting_records
+
+
+def test_component_records():
+    """
+    Each character gets the single character words whose pinyin matches
+    its syllable, or all of them if none do.
+    """
+    character_words = [(1, "不", "bù", 10), (2, "好", "hǎo", 11), (3, "好", "hào", 11), (4, "思", "sī", 12)]
+    words = [(5, "不好", "bù hǎo"), (6, "好思", "hao si")]
+    records: List[Dict[str, int]] = list(component_records(words, character_words))
+    assert [(record["word_id"], record["position"], record["char_word_id"]) for record in records] == [
+        (5, 0, 1),
+        (5, 1, 2),
+        (6, 0, 2),
+        (6, 0, 3),
+        (6, 1, 4),
+    ]
+    assert records[0]["character_id"] == 10
+
+
+def test_component_records_skips_non_chinese():
+    character_words = [(1, "卡", "kǎ", 10)]
+    words = [(2, "U盘", "U pán"), (3, "卡拉OK", "kǎ lā ō kēi")]
+    records: List[Dict[str, int]] = list(component_records(words, character_words))
+    # characters and syllables are paired by position, like the search did
+    assert [(record["word_id"], record["position"]) for record in records] == [(3, 0)]
+
+
+def test_posting_records():
+    records: List[Dict[str, int]] = list(posting_records([(1, "越来越", 13386), (2, "3Cc", None)]))
+    assert [(record["character"], record["word_id"]) for record in records] == [
+        ("越", 1),
+        ("来", 1),
+        ("3", 2),
+        ("c", 2),
+    ]
+    assert records[0]["frequency"] == 13386
+    assert records[-1]["frequency"] == 0
@@ -1,14 +1,31 @@
-from typing import List
+import shutil
+from typing import List, Tuple
+from cnlearn.db import settings
 from cnlearn.db.settings import SessionLocal
 from cnlearn.db.crud import (
+    get_fallback_frequency,
     get_simplified_character,
     get_simplified_word_containing_char,
     get_simplified_word,
     get_word_and_character,
+    get_words_and_characters_bulk,
+    get_word_with_components,
+    get_words_by_definition,
+    get_words_by_pinyin,
+    get_words_with_components_bulk,
 )
+from sqlalchemy import create_engine, func, select, text
 from sqlalchemy.orm import Session
-from sqlalchemy.engine import Row
+from sqlalchemy.engine import Engine, Row
+from cnlearn.db.fts import FTS_TABLE, MissingDefinitionsIndex
 from cnlearn.db.models import Word, Character
+from cnlearn.db.selects import (
+    select_simplified_word,
+    select_word_and_character,
+    select_words_and_characters,
+    select_words_with_components,
+)
+from sqlalchemy.sql.selectable import Select
 import pytest
 
 
@@ -88,6 +105,69 @@ def test_get_simplified_character(db: Session):
     assert isinstance(character, Character)
 
 
+def test_get_words_and_characters_bulk(db: Session):
+    results: List[List[Row]] = get_words_and_characters_bulk(
+        db, [("不", "bù"), ("好", "hǎo"), ("意", "yì"), ("思", "si"), ("好", None)]
+    )
+    assert len(results) == 5
+    bu, hao, yi, si, hao_any = results
+    assert [row.Word.pinyin_accent for row in bu] == ["bù"]
+    assert [row.Word.pinyin_accent for row in hao] == ["hǎo"]
+    assert [row.Word.pinyin_accent for row in yi] == ["yì"]
+    # no 思 entry has the neutral tone so all of them are returned
+    assert len(si) >= 1 and all(row.Word.simplified == "思" for row in si)
+    assert len(hao_any) == 2
+    assert all(isinstance(row.Character, Character) for row in hao_any)
+
+
+def test_get_words_and_characters_bulk_matches_single_lookups(db: Session):
+    pairs = [("意", "Yì"), ("大", "dà"), ("利", "lì")]
+    bulk_results: List[List[Row]] = get_words_and_characters_bulk(db, pairs)
+    for (simplified, pinyin_accent), bulk_rows in zip(pairs, bulk_results):
+        single_rows = get_word_and_character(db, simplified, pinyin_accent=pinyin_accent)
+        assert [row.Word.id for row in bulk_rows] == [row.Word.id for row in single_rows]
+
+
+@pytest.mark.parametrize(
+    "word_selection",
+    [
+        select_simplified_word("好"),
+        select_word_and_character("好"),
+        select_words_and_characters(["好"]),
+        select_words_with_components(),
+    ],
+)
+def test_words_of_equal_frequency_ordered_by_id(word_selection: Select):
+    """
+    The single and bulk lookups break frequency ties the same way, so
+    either returns the words in the same order.
+    """
+    order_by: List[str] = [str(clause) for clause in word_selection._order_by_clauses]
+    assert order_by[:2] == ["words.frequency", "words.id"]
+
+
+def test_get_words_and_characters_bulk_empty(db: Session):
+    assert get_words_and_characters_bulk(db, []) == []
+
+
+def test_get_word_with_components(db: Session):
+    rows: List[Row] = get_word_with_components(db, "不好意思")
+    assert {word.simplified for word, _, _ in rows} == {"不好意思"}
+    components = [(component.simplified, character.character) for _, component, character in rows]
+    assert [simplified for simplified, _ in components] == ["不", "好", "意", "思"]
+    assert all(simplified == character for simplified, character in components)
+
+
+def test_get_words_with_components_bulk(db: Session):
+    words: List[str] = ["不好意思", "意大利", "不好意思"]
+    rows: List[Row] = get_words_with_components_bulk(db, words)
+    single_rows: List[Row] = get_word_with_components(db, "不好意思") + get_word_with_components(db, "意大利")
+    assert sorted(tuple(entity.id if entity else None for entity in row) for row in rows) == sorted(
+        tuple(entity.id if entity else None for entity in row) for row in single_rows
+    )
+    assert get_words_with_components_bulk(db, []) == []
+
+
 # parametrising the test below because I will add more cases
 @pytest.mark.parametrize("simplified,n_words", [("是", 140)])
 def test_get_simplified_word_containing_char(
@@ -99,6 +179,44 @@ def test_get_simplified_word_containing_char(
     assert len(word_results) == n_words
 
 
+@pytest.mark.parametrize("simplified", ["是", "不好", "一哄而散", "好不"])
+def test_get_simplified_word_containing_char_matches_scan(db: Session, simplified: str):
+    """
+    The words found through the character postings are the ones a scan of
+    the words table finds.
+    """
+    word_results: List[Row] = get_simplified_word_containing_char(db, simplified=simplified)
+    scan: List[Row] = db.execute(select(Word).where(Word.simplified.contains(simplified))).all()
+    assert sorted(row.Word.id for row in word_results) == sorted(row.Word.id for row in scan)
+    frequencies: List[int] = [row.Word.frequency for row in word_results]
+    assert frequencies == sorted(frequencies)
+
+
+@pytest.mark.parametrize("simplified", ["cedict", "CEDICT", "cC-ceDict", "c"])
+def test_get_simplified_word_containing_char_ascii_case(db: Session, simplified: str):
+    """
+    ASCII letters match whatever their case, as they did with LIKE.
+    """
+    word_results: List[Row] = get_simplified_word_containing_char(db, simplified=simplified)
+    scan: List[Row] = db.execute(select(Word).where(Word.simplified.contains(simplified))).all()
+    assert word_results
+    assert sorted(row.Word.id for row in word_results) == sorted(row.Word.id for row in scan)
+
+
+def test_get_simplified_word_containing_char_pages(db: Session):
+    all_words: List[Row] = get_simplified_word_containing_char(db, simplified="是")
+    pages: List[Row] = []
+    after = None
+    while True:
+        page: List[Row] = get_simplified_word_containing_char(db, simplified="是", limit=2, after=after)
+        if not page:
+            break
+        assert len(page) <= 2
+        pages.extend(page)
+        after = (page[-1].Word.frequency, page[-1].Word.id)
+    assert [row.Word.id for row in pages] == [row.Word.id for row in all_words]
+
+
 @pytest.mark.parametrize(
     "simplified,traditional,pinyin_accent,definitions,classifiers,frequency,n_words",
     [
@@ -223,3 +341,55 @@ def test_simplified_words(
     assert word.definitions == definitions
     assert word.classifiers == classifiers
     assert word.frequency == frequency
+
+
+def test_get_words_by_definition(db: Session):
+    rows: List[Row] = get_words_by_definition(db, '"think"', limit=10)
+    assert "思" in [row.Word.simplified for row in rows]
+    scores: List[float] = [row.score for row in rows]
+    assert scores == sorted(scores)
+
+
+def test_get_fallback_frequency(db: Session):
+    """
+    The words that aren't in the corpus, like 一哄而散, have the fallback
+    frequency of the build, and the others don't.
+    """
+    fallback_frequency: int = get_fallback_frequency(db)
+    assert get_simplified_word(db, "一哄而散")[0].Word.frequency == fallback_frequency
+    assert get_simplified_word(db, "了")[0].Word.frequency < fallback_frequency
+
+
+def test_get_words_by_pinyin_order(db: Session):
+    """
+    The words come most frequent first, except for those that aren't in
+    the corpus, which come last.
+    """
+    pinyin: List[str] = db.execute(select(func.lower(Word.pinyin_clean)).distinct()).scalars().all()
+    fallback_frequency: int = get_fallback_frequency(db)
+    rows: List[Row] = get_words_by_pinyin(db, pinyin, fallback_frequency)
+    assert len(rows) == db.execute(select(func.count(Word.id))).scalar()
+    order: List[Tuple[bool, int, int]] = [
+        (row.Word.frequency >= fallback_frequency, -row.Word.frequency, row.Word.id) for row in rows
+    ]
+    assert order == sorted(order)
+    assert rows[-1].Word.frequency == fallback_frequency > rows[0].Word.frequency
+    assert get_words_by_pinyin(db, pinyin, fallback_frequency, limit=3) == rows[:3]
+    assert get_words_by_pinyin(db, pinyin, fallback_frequency, limit=3, offset=2) == rows[2:5]
+    assert get_words_by_pinyin(db, pinyin, fallback_frequency, offset=2) == rows[2:]
+
+
+def test_get_words_by_definition_without_index(tmp_path):
+    """
+    A database built before the definitions' index was added gets a
+    clear error rather than SQLite's.
+    """
+    database = tmp_path / "dictionary.db"
+    shutil.copyfile(settings.db, database)
+    engine: Engine = create_engine(f"sqlite+pysqlite:///{database}", future=True)
+    with engine.begin() as connection:
+        connection.execute(text(f"DROP TABLE {FTS_TABLE}"))
+    with Session(engine, future=True) as session:
+        with pytest.raises(MissingDefinitionsIndex, match="cnlearn.db.upgrade"):
+            get_words_by_definition(session, '"think"', limit=10)
+    engine.dispose()
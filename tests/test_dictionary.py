@@ -1,5 +1,10 @@
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
 from typing import Dict, List
+import cnlearn.search.dictionary
+from cnlearn.search.cache import LRUCache
 from cnlearn.search.dictionary import Dictionary
+from cnlearn.search.stats import SearchStats
 from cnlearn.schemas.structures import Character, Word
 from cnlearn.db.models import Word as Word_model, Character as Character_model
 import pytest
@@ -368,3 +373,229 @@ def test_multiple_character_word_2(dictionary, yidali_word):
     """
     dictionary.search_chinese("意大利")
     assert yidali_word in dictionary.words_found
+
+
+def test_multiple_character_word_query_count(dictionary, mocker):
+    """
+    The words found for a segment and all their component characters
+    are loaded in one query rather than one query per character.
+    """
+    mocked_get_word_and_character = mocker.patch(
+        "cnlearn.search.dictionary.get_word_and_character",
+    )
+    spied_components = mocker.spy(
+        cnlearn.search.dictionary, "get_word_with_components"
+    )
+    dictionary.search_chinese("不好意思")
+    assert mocked_get_word_and_character.call_count == 0
+    assert spied_components.call_count == 1
+
+
+@pytest.mark.parametrize("jieba_startup,n_calls", [("eager", 1), ("background", 1), ("lazy", 0)])
+def test_jieba_startup(mocker, jieba_startup: str, n_calls: int):
+    """
+    Only eager and background startup load jieba when the Dictionary is
+    created, lazy startup leaves it to the first segmentation. Either way
+    jieba is loaded (and a background load finished) before anything is
+    segmented.
+    """
+    spied_initialize = mocker.spy(cnlearn.search.dictionary, "initialize_tokenizer")
+    dictionary = Dictionary(jieba_startup=jieba_startup)
+    assert spied_initialize.call_count == n_calls
+    dictionary.search_term = "好"
+    dictionary.segment_words()
+    assert dictionary._jieba_thread is None
+    assert dictionary._tokenizer.initialized
+    assert list(dictionary.segmented_words) == ["好"]
+
+
+@pytest.mark.xfail(raises=ValueError)
+def test_jieba_startup_invalid():
+    Dictionary(jieba_startup="sometime")
+
+
+def test_unknown_word_is_cached(mocker):
+    """
+    A segment with no results is cached as well, so it is only looked up
+    in the database once.
+    """
+    dictionary = Dictionary(cache=LRUCache(max_size=1))
+    mocked_get_word_and_character = mocker.patch(
+        "cnlearn.search.dictionary.get_word_and_character", return_value=[]
+    )
+    dictionary.search_chinese("の")
+    dictionary.search_chinese("の")
+    assert dictionary.words_found == []
+    assert mocked_get_word_and_character.call_count == 1
+    assert dictionary.dictionary_cache.stats.hits == 1
+    assert dictionary.dictionary_cache.stats.misses == 1
+
+
+@pytest.mark.parametrize("query", ["embarrassed", "embarrassing", "feel EMBARRASSED"])
+def test_search_english(dictionary: Dictionary, query: str):
+    words: List[Word] = dictionary.search_english(query, limit=5)
+    assert words[0].simplified == "不好意思"
+    assert len(words) <= 5
+
+
+@pytest.mark.parametrize("query", ["", "  ;; ", "?"])
+def test_search_english_no_terms(dictionary: Dictionary, query: str):
+    assert dictionary.search_english(query) == []
+
+
+@pytest.mark.parametrize("query", ["buhaoyisi", "bu hao yi si", "bu4 hao3 yi4 si5", "bù hǎo yì si"])
+def test_search_pinyin(dictionary: Dictionary, query: str):
+    assert [word.simplified for word in dictionary.search_pinyin(query)] == ["不好意思"]
+
+
+def test_search_pinyin_ambiguous(dictionary: Dictionary):
+    assert "西安" in [word.simplified for word in dictionary.search_pinyin("xian")]
+    assert "西安" in [word.simplified for word in dictionary.search_pinyin("xi'an")]
+    assert "先" not in [word.simplified for word in dictionary.search_pinyin("xi'an")]
+
+
+def test_search_pinyin_tones(dictionary: Dictionary):
+    assert [word.pinyin_num for word in dictionary.search_pinyin("hao4")] == ["hao4"]
+    words: List[Word] = dictionary.search_pinyin("hao")
+    assert {word.pinyin_num for word in words} == {"hao3", "hao4"}
+    frequencies: List[int] = [word.frequency for word in words]
+    assert frequencies == sorted(frequencies, reverse=True)
+
+
+@pytest.mark.parametrize("query", ["hao", "hao4", "xian"])
+def test_search_pinyin_limit(dictionary: Dictionary, query: str):
+    """
+    A limited search returns the first of the words, even when the tones
+    rule out the most frequent ones.
+    """
+    words: List[Word] = dictionary.search_pinyin(query)
+    assert dictionary.search_pinyin(query, limit=1) == words[:1]
+
+
+def test_search_chinese_many(dictionary: Dictionary):
+    texts: List[str] = ["不好意思", "意大利", "好", "我们是不满意的人", "不好意思", ""]
+    results = dictionary.search_chinese_many(texts)
+    assert len(results) == len(texts)
+    for text, text_results in zip(texts, results):
+        single_search = Dictionary(cache=LRUCache())
+        single_search.search_chinese(text)
+        assert text_results == single_search.words_found
+
+
+def test_search_chinese_many_queries(dictionary: Dictionary, mocker):
+    """
+    The segments of all the texts are looked up once each, in one query
+    for the single characters and one for the longer words, and the
+    Dictionary's search state is left alone.
+    """
+    spied_characters = mocker.spy(cnlearn.search.dictionary, "get_words_and_characters_bulk")
+    spied_words = mocker.spy(cnlearn.search.dictionary, "get_words_with_components_bulk")
+    spied_put = mocker.spy(dictionary.dictionary_cache, "put")
+    dictionary.search_chinese_many(["不好意思", "好", "不好意思好", "意大利", "好"])
+    assert spied_characters.call_count == 1
+    assert spied_words.call_count == 1
+    assert sorted(call.args[0] for call in spied_put.call_args_list) == ["不好意思", "好", "意大利"]
+    assert dictionary.search_term == ""
+    assert dictionary.words_found == []
+    assert dictionary.search_history == {}
+
+
+def test_thread_safe_search(dictionary: Dictionary):
+    """
+    Many threads searching with one thread-safe Dictionary get the same
+    results as a single thread. The cache is kept small so the threads
+    keep evicting each other's entries and going to the database.
+    """
+    texts: List[str] = ["不好意思", "意大利", "好", "我们是不满意的人", "不好意思好", "人们", "我"]
+    expected: Dict[str, List] = {text: dictionary.search(text) for text in texts}
+    shared = Dictionary(cache=LRUCache(max_size=3), thread_safe=True)
+    n_threads: int = 32
+    searches_per_thread: int = 30
+
+    def search_all(seed: int) -> List[List]:
+        return [shared.search(texts[(seed + i) % len(texts)]) for i in range(searches_per_thread)]
+
+    with ThreadPoolExecutor(max_workers=n_threads) as executor:
+        all_results = list(executor.map(search_all, range(n_threads)))
+    for seed, results in enumerate(all_results):
+        assert results == [expected[texts[(seed + i) % len(texts)]] for i in range(searches_per_thread)]
+    assert 1 < len(shared._sessions) <= n_threads
+    # no search was lost while counting the searches
+    search_counts: Dict[str, int] = defaultdict(int)
+    for seed in range(n_threads):
+        for i in range(searches_per_thread):
+            for word in dictionary.segment(texts[(seed + i) % len(texts)]):
+                if word.strip():
+                    search_counts[word] += 1
+    assert shared.search_history == search_counts
+    assert shared.search_term == ""
+    assert shared.words_found == []
+    shared.close()
+
+
+def test_iter_search_chinese(dictionary: Dictionary, mocker):
+    """
+    Each segment comes with its results as soon as it is looked up, and
+    together they are what search_chinese finds.
+    """
+    spied_lookup = mocker.spy(dictionary, "lookup_segment")
+    results = dictionary.iter_search_chinese("不好意思，我们是意大利人")
+    segment, segment_results = next(results)
+    assert segment == "不好意思"
+    assert spied_lookup.call_count == 1
+    all_results = segment_results + [result for _, rest in results for result in rest]
+    single_search = Dictionary(cache=LRUCache())
+    single_search.search_chinese("不好意思，我们是意大利人")
+    assert all_results == single_search.words_found
+
+
+@pytest.mark.parametrize("max_results", [0, 1, 2])
+def test_iter_search_chinese_max_results(dictionary: Dictionary, max_results: int):
+    for segment, results in dictionary.iter_search_chinese("好不好", max_results=max_results):
+        assert results == dictionary.dictionary_cache[segment][:max_results]
+    # the cached results are all still there
+    assert len(dictionary.dictionary_cache["好"]) == 2
+
+
+@pytest.mark.xfail(raises=ValueError)
+def test_iter_search_chinese_negative_max_results(dictionary: Dictionary):
+    next(dictionary.iter_search_chinese("好", max_results=-1))
+
+
+def test_instrumented_search():
+    """
+    An instrumented search records its stages and counts, and the stats
+    of all the searches add up in search_stats.
+    """
+    dictionary = Dictionary(cache=LRUCache(), instrument=True)
+    text = "不好意思，我们是意大利人"
+    segments = [word for word in dictionary.segment(text) if word.strip()]
+    dictionary.search_chinese(text)
+    first = dictionary.last_search_stats
+    assert first.searches == 1
+    assert first.segments == len(segments)
+    assert first.cache_misses == first.queries == len(set(segments))
+    assert first.cache_hits == len(segments) - len(set(segments))
+    assert first.rows >= len(dictionary.words_found)
+    assert first.segmentation > 0 and first.sql > 0 and first.results > 0
+    dictionary.search_chinese(text)
+    second = dictionary.last_search_stats
+    assert second.cache_hits == len(segments)
+    assert second.queries == second.rows == 0
+    assert dictionary.search_stats.as_dict() == (first + second).as_dict()
+
+
+def test_search_stats_argument(dictionary: Dictionary):
+    """
+    Stats passed to a search get its stats added to them even if the
+    Dictionary doesn't instrument its searches, which it doesn't by default.
+    """
+    dictionary.search_chinese("不好意思")
+    assert dictionary.last_search_stats is None
+    assert dictionary.search_stats.searches == 0
+    stats = SearchStats()
+    dictionary.search("我们是意大利人", stats)
+    list(dictionary.iter_search_chinese("好不好", stats=stats))
+    assert stats.searches == 2
+    assert stats.segments == 7
+    assert dictionary.search_stats.as_dict() == stats.as_dict()
@@ -0,0 +1,44 @@
+import os
+from typing import List
+
+import pytest
+
+from cnlearn.search.frequency import FrequencyTable, load_frequency_table
+
+
+FREQ_FILE = os.path.join(os.path.dirname(__file__), "..", "dict", "files", "internet-zh.num")
+
+
+@pytest.fixture
+def frequency_table() -> FrequencyTable:
+    lines: List[str] = ["1 66293.28 ，", "2 45402.97 的", "3 1657.89 好", "4 12.5 的"]
+    return FrequencyTable.from_lines(lines)
+
+
+def test_rank(frequency_table: FrequencyTable):
+    assert frequency_table.rank("，") == 6629328
+    assert frequency_table.rank("好") == 165789
+    # the last frequency of a repeated word is kept
+    assert frequency_table.rank("的") == 1250
+
+
+def test_fallback_rank(frequency_table: FrequencyTable):
+    assert frequency_table.fallback_rank == 6629328 + 9999
+    assert frequency_table.rank("贼") == frequency_table.fallback_rank
+    assert "贼" not in frequency_table
+    assert len(frequency_table) == 3
+
+
+def test_bulk_rank(frequency_table: FrequencyTable):
+    words: List[str] = ["好", "贼", "，", "好"]
+    assert frequency_table.bulk_rank(words) == [frequency_table.rank(word) for word in words]
+    assert frequency_table.bulk_rank([]) == []
+
+
+def test_load_frequency_table():
+    frequency_table: FrequencyTable = load_frequency_table(FREQ_FILE)
+    assert load_frequency_table(FREQ_FILE) is frequency_table
+    assert len(frequency_table) > 40000
+    assert frequency_table.rank("好") == 165789
+    assert frequency_table.rank("不好意思") == 3667
+    assert frequency_table.fallback_rank == 6639327
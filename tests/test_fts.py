@@ -0,0 +1,37 @@
+import pytest
+from sqlalchemy import create_engine, text
+
+from cnlearn.db.fts import create_definitions_index, fts_query
+
+
+@pytest.mark.parametrize(
+    "query,match_query",
+    [
+        ("embarrassed", '"embarrassed"'),
+        ("to be sorry", '"to" "be" "sorry"'),
+        ('sorry" OR "NEAR(', '"sorry" "OR" "NEAR"'),
+        ("  ", ""),
+    ],
+)
+def test_fts_query(query: str, match_query: str):
+    assert fts_query(query) == match_query
+
+
+@pytest.mark.parametrize("tokenizer,n_matches", [("porter", 1), ("unicode61", 0)])
+def test_create_definitions_index(tokenizer: str, n_matches: int):
+    engine = create_engine("sqlite+pysqlite://", future=True)
+    with engine.begin() as connection:
+        connection.execute(text("CREATE TABLE words (id INTEGER PRIMARY KEY, definitions TEXT)"))
+        connection.execute(text("INSERT INTO words VALUES (1, 'to feel embarrassed')"))
+        create_definitions_index(connection, tokenizer)
+        matches = connection.execute(
+            text("SELECT rowid FROM definitions_fts WHERE definitions_fts MATCH 'embarrassing'")
+        ).all()
+    assert len(matches) == n_matches
+
+
+@pytest.mark.xfail(raises=ValueError)
+def test_create_definitions_index_invalid_tokenizer():
+    engine = create_engine("sqlite+pysqlite://", future=True)
+    with engine.begin() as connection:
+        create_definitions_index(connection, "snowball")
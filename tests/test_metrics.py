@@ -0,0 +1,176 @@
+import asyncio
+import json
+from typing import Dict, List
+from urllib.error import HTTPError
+from urllib.request import urlopen
+
+import pytest
+
+from cnlearn.db import settings
+from cnlearn.db.settings import create_database_engine
+from cnlearn.search.annotate import annotate_document
+from cnlearn.search.async_dictionary import AsyncDictionary
+from cnlearn.search.cache import LRUCache
+from cnlearn.search.dictionary import Dictionary
+from cnlearn.search.metrics import Histogram, MetricsRegistry, serve_metrics
+from cnlearn.search.stats import SearchStats
+
+
+@pytest.fixture
+def registry() -> MetricsRegistry:
+    dictionary = Dictionary(cache=LRUCache())
+    registry = MetricsRegistry(dictionary)
+    dictionary.search_chinese("不好意思，我们是意大利人")
+    dictionary.search_chinese("我们是意大利人")
+    yield registry
+    dictionary.close()
+
+
+def parse_samples(text: str) -> Dict[str, float]:
+    """
+    Returns the value of each sample of a Prometheus text exposition.
+    """
+    samples: Dict[str, float] = {}
+    for line in text.splitlines():
+        if line and not line.startswith("#"):
+            name, value = line.rsplit(" ", 1)
+            samples[name] = float(value)
+    return samples
+
+
+def test_histogram():
+    histogram = Histogram([0.1, 1])
+    for value in [0.05, 0.1, 0.5, 2]:
+        histogram.observe(value)
+    assert histogram.cumulative_counts() == {"0.1": 2, "1": 3, "+Inf": 4}
+    assert histogram.count == 4 and histogram.sum == pytest.approx(2.65)
+
+
+def test_snapshot(registry: MetricsRegistry):
+    snapshot = registry.snapshot()
+    dictionary = registry.dictionary
+    assert snapshot["cnlearn_searches_total"] == 2
+    assert snapshot["cnlearn_search_duration_seconds"]["count"] == 2
+    assert snapshot["cnlearn_search_duration_seconds"]["buckets"]["+Inf"] == 2
+    assert snapshot["cnlearn_search_segments_total"] == dictionary.search_stats.segments
+    assert snapshot["cnlearn_queries_total"] == dictionary.search_stats.queries > 0
+    assert snapshot["cnlearn_cache_size"] == len(dictionary.dictionary_cache)
+    assert snapshot["cnlearn_cache_hits_total"] == dictionary.dictionary_cache.stats.hits > 0
+    assert snapshot["cnlearn_cache_hit_ratio"] == dictionary.dictionary_cache.stats.hit_ratio
+    assert set(snapshot["cnlearn_search_stage_seconds_total"]) == {"segmentation", "cache", "sql", "results"}
+    assert snapshot["cnlearn_segmentation_segments_per_second"] > 0
+
+
+def many_searches(dictionary: Dictionary, texts: List[str]) -> None:
+    dictionary.search_chinese_many(texts)
+
+
+def segment_searches(dictionary: Dictionary, texts: List[str]) -> None:
+    dictionary.resolve_segments([[word for word in dictionary.segment(text) if word.strip()] for text in texts])
+
+
+def async_searches(dictionary: Dictionary, texts: List[str]) -> None:
+    async def search_many():
+        async with AsyncDictionary(dictionary) as async_dictionary:
+            await async_dictionary.search_many(texts)
+
+    asyncio.run(search_many())
+
+
+def annotate_searches(dictionary: Dictionary, texts: List[str]) -> None:
+    for _ in annotate_document(texts, dictionary, workers=1):
+        pass
+
+
+@pytest.mark.parametrize("searches", [many_searches, segment_searches, async_searches, annotate_searches])
+def test_batched_searches(searches):
+    """
+    The searches that look up several texts at once are recorded too, a
+    search per text.
+    """
+    dictionary = Dictionary(cache=LRUCache())
+    registry = MetricsRegistry(dictionary)
+    texts: List[str] = ["不好意思。", "我们是意大利人。", "好不好。"]
+    n_segments: int = sum(1 for text in texts for word in dictionary.segment(text) if word.strip())
+    searches(dictionary, texts)
+    searches(dictionary, texts)
+    snapshot = registry.snapshot()
+    assert snapshot["cnlearn_searches_total"] == 6
+    assert snapshot["cnlearn_search_segments_total"] == 2 * n_segments
+    assert snapshot["cnlearn_search_duration_seconds"]["count"] == 2
+    assert snapshot["cnlearn_queries_total"] > 0
+    assert snapshot["cnlearn_search_stage_seconds_total"]["sql"] > 0
+    # the second time they all come from the cache
+    assert dictionary.search_stats.cache_hits >= dictionary.search_stats.cache_misses > 0
+    dictionary.close()
+
+
+def test_batched_search_stats_argument():
+    dictionary = Dictionary(cache=LRUCache())
+    stats = SearchStats()
+    plain_results = dictionary.search_chinese_many(["不好意思", "好不好"])
+    dictionary.dictionary_cache.clear()
+    assert dictionary.search_chinese_many(["不好意思", "好不好"], stats) == plain_results
+    assert (stats.searches, stats.segments, stats.cache_misses) == (2, 4, 3)
+    assert stats.queries == 2 and stats.segmentation > 0
+    assert dictionary.search_stats.searches == 2
+    dictionary.close()
+
+
+def test_pool_metrics(monkeypatch):
+    """
+    The pool is reported when it keeps connections, like those of the
+    read_only profile, which thread-safe Dictionaries use when it's chosen.
+    """
+    engine = create_database_engine("read_only")
+    monkeypatch.setattr(settings, "read_only_engine", engine)
+    monkeypatch.setattr(settings.ReadOnlySessionLocal, "kw", {**settings.ReadOnlySessionLocal.kw, "bind": engine})
+    dictionary = Dictionary(cache=LRUCache(), thread_safe=True)
+    registry = MetricsRegistry(dictionary)
+    dictionary.search("不好意思")
+    connections = registry.snapshot()["cnlearn_db_pool_connections"]
+    # the thread's session holds its connection until it's closed
+    assert connections["checked_out"] >= 1
+    dictionary.close()
+    engine.dispose()
+
+
+@pytest.mark.skipif(settings.DATABASE_PROFILE != "default", reason="the other profiles keep a pool")
+def test_no_pool_metrics(registry: MetricsRegistry):
+    """
+    The default profile's engine opens a connection per session, so there
+    is no pool to report.
+    """
+    assert "cnlearn_db_pool_connections" not in registry.snapshot()
+
+
+def test_prometheus_text(registry: MetricsRegistry):
+    text = registry.prometheus_text()
+    assert "# TYPE cnlearn_search_duration_seconds histogram" in text
+    assert "# TYPE cnlearn_searches_total counter" in text
+    samples = parse_samples(text)
+    assert samples["cnlearn_searches_total"] == 2
+    assert samples['cnlearn_search_duration_seconds_bucket{le="+Inf"}'] == 2
+    assert samples["cnlearn_search_duration_seconds_count"] == 2
+    assert samples['cnlearn_search_stage_seconds_total{stage="sql"}'] > 0
+
+
+def test_scrape(registry: MetricsRegistry):
+    """
+    The metrics can be scraped over HTTP, like Prometheus would.
+    """
+    server = serve_metrics(registry, port=0)
+    url = f"http://127.0.0.1:{server.server_port}"
+    try:
+        with urlopen(f"{url}/metrics") as response:
+            assert response.headers["Content-Type"].startswith("text/plain; version=0.0.4")
+            samples = parse_samples(response.read().decode("utf-8"))
+        assert samples["cnlearn_searches_total"] == 2
+        registry.dictionary.search_chinese("好")
+        with urlopen(f"{url}/metrics.json") as response:
+            assert json.load(response)["cnlearn_searches_total"] == 3
+        with pytest.raises(HTTPError):
+            urlopen(f"{url}/other")
+    finally:
+        server.shutdown()
+        server.server_close()
@@ -0,0 +1,105 @@
+from typing import List, Union
+
+import pytest
+
+from cnlearn.schemas.structures import Character, Word
+from cnlearn.search import persistent_cache
+from cnlearn.search.cache import LRUCache
+from cnlearn.search.persistent_cache import PersistentCache
+
+
+@pytest.fixture
+def database(tmp_path) -> str:
+    """
+    Returns the path of a stand-in dictionary database.
+    """
+    database_file = tmp_path / "dictionary.db"
+    database_file.write_bytes(b"version 1")
+    return str(database_file)
+
+
+@pytest.fixture
+def buman_results() -> List[Union[Word, Character]]:
+    bu = Character(
+        simplified="不",
+        traditional="不",
+        pinyin_num="bu4",
+        pinyin_accent="bù",
+        pinyin_clean="bu",
+        definitions="(negative prefix); not; no",
+        decomposition="⿱一？",
+        etymology={"type": "ideographic", "hint": "A bird flying toward the sky 一"},
+        radical="一",
+        frequency=459467,
+    )
+    buman = Word(
+        simplified="不满",
+        traditional="不滿",
+        definitions="resentful; discontented; dissatisfied",
+        pinyin_num="bu4 man3",
+        pinyin_accent="bù mǎn",
+        pinyin_clean="bu man",
+        pinyin_no_spaces="buman",
+        components=[bu],
+        frequency=3157,
+    )
+    return [buman, bu]
+
+
+def test_results_survive_a_restart(tmp_path, database: str, buman_results):
+    cache = PersistentCache(str(tmp_path / "results.sqlite"), database=database)
+    cache.put("不满", buman_results)
+    cache.put("の", [])
+    cache.close()
+
+    restarted = PersistentCache(str(tmp_path / "results.sqlite"), database=database)
+    assert len(restarted) == 2
+    assert "不满" in restarted
+    results = restarted.get("不满")
+    assert results == buman_results
+    assert isinstance(results[0], Word) and isinstance(results[1], Character)
+    assert isinstance(results[0].components[0], Character)
+    assert restarted.get("の") == []
+    assert restarted.get("好") is None
+    assert restarted.stats.hits == 2 and restarted.stats.misses == 1
+
+
+def test_changed_database_clears_results(tmp_path, database: str, buman_results):
+    cache = PersistentCache(str(tmp_path / "results.sqlite"), database=database)
+    cache.put("不满", buman_results)
+    version: str = cache.database_version
+    cache.close()
+
+    with open(database, "wb") as database_file:
+        database_file.write(b"version 2")
+    restarted = PersistentCache(str(tmp_path / "results.sqlite"), database=database)
+    assert restarted.database_version != version
+    assert len(restarted) == 0
+    assert restarted.get("不满") is None
+
+
+def test_changed_format_clears_results(tmp_path, database: str, buman_results, monkeypatch):
+    cache = PersistentCache(str(tmp_path / "results.sqlite"), database=database)
+    cache.put("不满", buman_results)
+    cache.close()
+
+    monkeypatch.setattr(persistent_cache, "CACHE_FORMAT_VERSION", "format 2")
+    restarted = PersistentCache(str(tmp_path / "results.sqlite"), database=database)
+    assert len(restarted) == 0
+    assert restarted.get("不满") is None
+
+
+def test_len_counts_the_file(tmp_path, database: str, buman_results):
+    cache = PersistentCache(str(tmp_path / "results.sqlite"), database=database, front=LRUCache(1))
+    cache.put("不满", buman_results)
+    cache.put("の", [])
+    assert len(cache) == 2
+    assert len(cache.front) == 1
+
+
+def test_clear(tmp_path, database: str, buman_results):
+    cache = PersistentCache(str(tmp_path / "results.sqlite"), database=database)
+    cache.put("不满", buman_results)
+    cache.clear()
+    assert "不满" not in cache
+    assert len(cache) == 0
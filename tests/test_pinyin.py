@@ -0,0 +1,78 @@
+from typing import List
+
+import pytest
+
+from cnlearn.search.pinyin import MAX_SPLITS, Split, matches_tones, split_pinyin, split_syllables
+
+
+@pytest.mark.parametrize(
+    "spelling,syllables",
+    [
+        ("buhaoyisi", ("bu", "hao", "yi", "si")),
+        ("xian", ("xian",)),
+        ("lu:e", ("lu:e",)),
+    ],
+)
+def test_split_syllables_fewest_first(spelling: str, syllables):
+    assert split_syllables(spelling)[0] == syllables
+
+
+def test_split_syllables_ambiguous():
+    assert ("xi", "an") in split_syllables("xian")
+
+
+def test_split_syllables_long_spelling():
+    """
+    A spelling much longer than the recursion limit still splits.
+    """
+    splits = split_syllables("xian" * 2000)
+    assert splits[0] == ("xian",) * 2000
+    assert len(splits) == MAX_SPLITS
+    assert split_pinyin("buhaoyisi" * 1000)[0][:4] == [("bu", None), ("hao", None), ("yi", None), ("si", None)]
+
+
+@pytest.mark.parametrize(
+    "query,first_split",
+    [
+        ("buhaoyisi", [("bu", None), ("hao", None), ("yi", None), ("si", None)]),
+        ("bu4 hao3 yi4 si5", [("bu", 4), ("hao", 3), ("yi", 4), ("si", 5)]),
+        ("xi'an", [("xi", None), ("an", None)]),
+        ("Xi1an1", [("xi", 1), ("an", 1)]),
+        ("nǐhǎo", [("ni", 3), ("hao", 3)]),
+        ("lve4", [("lu:e", 4)]),
+        ("nü3", [("nu:", 3)]),
+        ("le0", [("le", 5)]),
+    ],
+)
+def test_split_pinyin(query: str, first_split: Split):
+    assert split_pinyin(query)[0] == first_split
+
+
+def test_split_pinyin_xian():
+    pinyin: List[str] = [" ".join(syllable for syllable, _ in split) for split in split_pinyin("xian")]
+    assert pinyin[0] == "xian"
+    assert "xi an" in pinyin
+    assert "xian" not in [" ".join(syllable for syllable, _ in split) for split in split_pinyin("xi'an")]
+
+
+@pytest.mark.parametrize("query", ["", "hello", "ni hao!", "42"])
+def test_split_pinyin_invalid(query: str):
+    assert split_pinyin(query) == []
+
+
+def test_split_pinyin_max_splits():
+    assert len(split_pinyin("xian" * 20, max_splits=10)) <= 10
+
+
+@pytest.mark.parametrize(
+    "pinyin_num,split,matches",
+    [
+        ("bu4 hao3 yi4 si5", [("bu", None), ("hao", None), ("yi", None), ("si", None)], True),
+        ("bu4 hao3 yi4 si5", [("bu", 4), ("hao", 3), ("yi", None), ("si", 5)], True),
+        ("Xi1 an1", [("xi", 1), ("an", 1)], True),
+        ("hao3", [("hao", 4)], False),
+        ("hao3", [("hao", None), ("hao", None)], False),
+    ],
+)
+def test_matches_tones(pinyin_num: str, split: Split, matches: bool):
+    assert matches_tones(pinyin_num, split) == matches
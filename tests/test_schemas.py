@@ -156,4 +156,29 @@ def test_buman_character_database(db, my_word_1):
     assert bu_man_word_schema.pinyin_num == my_word_1.pinyin_num
     assert bu_man_word_schema.pinyin_accent == my_word_1.pinyin_accent
     assert bu_man_word_schema.pinyin_clean == my_word_1.pinyin_clean
-    assert bu_man_word_schema.definitions == my_word_1.definitions
\ No newline at end of file
+    assert bu_man_word_schema.definitions == my_word_1.definitions
+
+
+def test_from_row_matches_from_orm(db):
+    """
+    Building the structures from the rows without validation gives the
+    same structures as from_orm.
+    """
+    for word_result, character_result in get_word_and_character(db, "好"):
+        character: Character = Character.from_orm(word_result)
+        character.radical = character_result.radical
+        character.decomposition = character_result.decomposition
+        character.etymology = character_result.etymology
+        built: Character = Character.from_row(
+            word_result,
+            radical=character_result.radical,
+            decomposition=character_result.decomposition,
+            etymology=character_result.etymology,
+        )
+        assert built == character
+        assert built.json() == character.json()
+    for row in get_simplified_word(db, "不好意思"):
+        word: Word = Word.from_row(row.Word)
+        assert word == Word.from_orm(row.Word)
+        # each word gets its own list of components
+        assert word.components == [] and word.components is not Word.from_row(row.Word).components
@@ -0,0 +1,51 @@
+import marshal
+
+import jieba
+import pytest
+from jieba import Tokenizer
+
+from cnlearn.search.segmentation import create_tokenizer, initialize_tokenizer, uses_exported_dictionary
+
+
+@pytest.fixture
+def exported_dictionary(tmp_path):
+    """
+    Writes a small exported jieba dictionary and its prefix dict cache,
+    and returns their paths.
+    """
+    dictionary_file = tmp_path / "jieba_dict.txt"
+    dictionary_file.write_text("不 459467\n好 165789\n意 8201\n思 6943\n不好意思 3667\n", encoding="utf-8")
+    cache_file = tmp_path / "jieba.cache"
+    with open(dictionary_file, "rb") as jieba_dictionary:
+        prefix_dictionary, total = Tokenizer.gen_pfdict(jieba_dictionary)
+    with open(cache_file, "wb") as cache:
+        marshal.dump((prefix_dictionary, total), cache)
+    return str(dictionary_file), str(cache_file)
+
+
+def test_default_tokenizer(tmp_path):
+    tokenizer = create_tokenizer(str(tmp_path / "missing.txt"))
+    assert tokenizer is jieba.dt
+    assert not uses_exported_dictionary(tokenizer)
+
+
+def test_exported_tokenizer_loads_cache(exported_dictionary, mocker):
+    dictionary_file, cache_file = exported_dictionary
+    tokenizer: Tokenizer = create_tokenizer(dictionary_file)
+    assert uses_exported_dictionary(tokenizer)
+    spied_initialize = mocker.spy(tokenizer, "initialize")
+    initialize_tokenizer(tokenizer, cache_file)
+    assert tokenizer.initialized
+    assert spied_initialize.call_count == 0
+    assert tokenizer.FREQ["不好意思"] == 3667
+    assert list(tokenizer.cut("不好意思", HMM=False)) == ["不好意思"]
+
+
+def test_exported_tokenizer_without_cache(exported_dictionary, tmp_path, mocker):
+    dictionary_file, _ = exported_dictionary
+    tokenizer: Tokenizer = create_tokenizer(dictionary_file)
+    tokenizer.tmp_dir = str(tmp_path)
+    spied_initialize = mocker.spy(tokenizer, "initialize")
+    initialize_tokenizer(tokenizer, str(tmp_path / "missing.cache"))
+    assert spied_initialize.call_count == 1
+    assert tokenizer.FREQ["不好意思"] == 3667
@@ -0,0 +1,111 @@
+import os
+import shutil
+import sqlite3
+import subprocess
+import sys
+
+import pytest
+from sqlalchemy import text
+from sqlalchemy.exc import OperationalError
+from sqlalchemy.orm import Session
+
+from cnlearn.db import settings
+from cnlearn.db.crud import get_word_and_character
+from cnlearn.db.settings import (
+    DATABASE_PROFILES,
+    READ_ONLY_PRAGMAS,
+    create_database_engine,
+    create_read_only_engine,
+    db,
+)
+
+
+@pytest.mark.parametrize("profile", DATABASE_PROFILES)
+def test_profiles_find_the_same_words(profile: str):
+    default_engine = create_database_engine("default")
+    engine = create_database_engine(profile)
+    with Session(default_engine) as default_session, Session(engine) as session:
+        expected = [(word.id, character.id) for word, character in get_word_and_character(default_session, "好")]
+        found = [(word.id, character.id) for word, character in get_word_and_character(session, "好")]
+    assert found == expected
+    default_engine.dispose()
+    engine.dispose()
+
+
+@pytest.mark.parametrize("profile", ["read_only", "memory"])
+def test_read_only_profiles(profile: str):
+    engine = create_database_engine(profile)
+    with engine.connect() as connection:
+        assert connection.execute(text("PRAGMA query_only")).scalar() == 1
+        assert connection.execute(text("PRAGMA cache_size")).scalar() == READ_ONLY_PRAGMAS["cache_size"]
+        with pytest.raises(OperationalError):
+            connection.execute(text("DELETE FROM words"))
+    engine.dispose()
+
+
+def test_memory_profile_copies_on_first_connection():
+    """
+    The memory profile's engine copies the database when it is first
+    used, not when it is created (e.g. as cnlearn.db.settings is imported).
+    """
+    n_copies: int = len(settings._memory_databases)
+    engine = create_database_engine("memory")
+    assert len(settings._memory_databases) == n_copies
+    with engine.connect() as connection, engine.connect() as other_connection:
+        n_words: int = connection.execute(text("SELECT count(*) FROM words")).scalar()
+        assert other_connection.execute(text("SELECT count(*) FROM words")).scalar() == n_words > 0
+    assert len(settings._memory_databases) == n_copies + 1
+    engine.dispose()
+
+
+@pytest.mark.xfail(raises=ValueError)
+def test_invalid_profile():
+    create_database_engine("fast")
+
+
+def test_read_only_engine_sees_rebuilds(tmp_path):
+    """
+    The read-only engine of the default profile, which thread-safe
+    Dictionaries use, isn't immutable: it sees changes to the database.
+    """
+    database = tmp_path / "dictionary.db"
+    shutil.copyfile(db, database)
+    engine = create_read_only_engine(str(database))
+    with engine.connect() as connection:
+        n_words = connection.execute(text("SELECT count(*) FROM words")).scalar()
+        with pytest.raises(OperationalError):
+            connection.execute(text("DELETE FROM words"))
+    with sqlite3.connect(database) as writer:
+        writer.execute("DELETE FROM words WHERE id = (SELECT min(id) FROM words)")
+    with engine.connect() as connection:
+        assert connection.execute(text("SELECT count(*) FROM words")).scalar() == n_words - 1
+    engine.dispose()
+
+
+def test_read_only_engine_path_with_uri_characters(tmp_path):
+    """
+    The database's path goes into a URI, where "?", "#" and "%" would
+    otherwise end or change it.
+    """
+    database = tmp_path / "cn learn?#%20" / "dictionary.db"
+    database.parent.mkdir()
+    shutil.copyfile(db, database)
+    engine = create_read_only_engine(str(database))
+    with engine.connect() as connection:
+        assert connection.execute(text("SELECT count(*) FROM words")).scalar() > 0
+    engine.dispose()
+
+
+@pytest.mark.parametrize("variable,value", [("CNLEARN_CRUD_STATEMENTS", "prepard"), ("CNLEARN_DB_PROFILE", "fast")])
+def test_invalid_environment(variable: str, value: str):
+    """
+    A mistyped setting stops the import rather than being ignored.
+    """
+    process = subprocess.run(
+        [sys.executable, "-c", "import cnlearn.db.settings"],
+        env={**os.environ, variable: value},
+        capture_output=True,
+        text=True,
+    )
+    assert process.returncode != 0
+    assert "ValueError" in process.stderr
@@ -0,0 +1,139 @@
+from typing import Any, Callable, List, Tuple
+
+import pytest
+from sqlalchemy import Column, ForeignKey, Integer, String, select
+from sqlalchemy.orm import Session, registry
+
+from cnlearn.db import crud, settings, statements
+from cnlearn.db.models import Character, Word
+from cnlearn.db.settings import SessionLocal
+from cnlearn.db.statements import PreparedStatement, padded
+from cnlearn.search.cache import LRUCache
+from cnlearn.search.dictionary import Dictionary
+
+
+@pytest.fixture
+def db() -> Session:
+    return SessionLocal()
+
+
+def values(result: Any) -> Any:
+    """
+    Turns crud results, ORM or prepared, into plain tuples of column values.
+    """
+    if result is None:
+        return None
+    if isinstance(result, list):
+        return [values(item) for item in result]
+    return tuple(
+        None
+        if entity is None
+        # the prepared records are namedtuples of the column values
+        else tuple(entity)
+        if isinstance(entity, tuple)
+        else tuple(getattr(entity, column.key) for column in entity.__mapper__.columns)
+        for entity in result
+    )
+
+
+def crud_calls(db: Session) -> List[Tuple[Callable, tuple]]:
+    """
+    Every crud function that has a prepared version, with every filter
+    combination, for the words in the database.
+    """
+    words = db.execute(select(Word.simplified, Word.pinyin_clean, Word.pinyin_accent)).all()
+    characters: List[str] = list(dict.fromkeys(simplified for simplified, _, _ in words if len(simplified) == 1))
+    longer_words: List[str] = list(dict.fromkeys(simplified for simplified, _, _ in words if len(simplified) > 1))
+    calls: List[Tuple[Callable, tuple]] = []
+    for simplified, pinyin_clean, pinyin_accent in words + [("没有", "mei you", "méi yǒu")]:
+        calls.extend(
+            [
+                (crud.get_simplified_word, (simplified,)),
+                (crud.get_simplified_word, (simplified, pinyin_clean)),
+                (crud.get_simplified_character, (simplified,)),
+                (crud.get_word_and_character, (simplified,)),
+                (crud.get_word_and_character, (simplified, pinyin_clean)),
+                (crud.get_word_and_character, (simplified, None, pinyin_accent)),
+                (crud.get_word_and_character, (simplified, pinyin_clean, pinyin_accent)),
+                (crud.get_word_with_components, (simplified,)),
+            ]
+        )
+    for size in (0, 1, 3, 4, 5, len(words)):
+        pairs: List[Tuple[str, None]] = [(character, None) for character in characters[:size]]
+        calls.append((crud.get_words_and_characters_bulk, (pairs,)))
+        calls.append((crud.get_words_with_components_bulk, (longer_words[:size],)))
+        pinyin: List[str] = [pinyin_clean.lower() for _, pinyin_clean, _ in words[:size]]
+        calls.append((crud.get_words_by_pinyin, (pinyin,)))
+        calls.append((crud.get_words_by_pinyin, (pinyin, crud.get_fallback_frequency(db))))
+        calls.append((crud.get_words_by_pinyin, (pinyin, None, 2, 1)))
+        calls.append((crud.get_words_by_pinyin, (pinyin, None, None, 1)))
+    return calls
+
+
+def test_prepared_statements_match_orm(db: Session):
+    for function, arguments in crud_calls(db):
+        expected = function(db, *arguments)
+        found = getattr(statements, function.__name__)(db, *arguments)
+        if function is crud.get_words_and_characters_bulk:
+            assert [values(rows) for rows in found] == [values(rows) for rows in expected]
+        else:
+            assert values(found) == values(expected), (function.__name__, arguments)
+
+
+def test_prepared_rows(db: Session):
+    """
+    The rows have the attributes of the ORM's rows and models.
+    """
+    word, character = statements.get_word_and_character(db, "好", pinyin_accent="hǎo")[0]
+    assert word.pinyin_accent == "hǎo" and character.character == "好"
+    # JSON columns are parsed like the ORM does
+    assert isinstance(character.etymology, dict)
+    rows = statements.get_word_with_components(db, "不好意思")
+    assert [row.component_word.simplified for row in rows] == ["不", "好", "意", "思"]
+    assert statements.get_simplified_character(db, "好").Character.radical == "女"
+    assert statements.get_simplified_character(db, "🙂") is None
+
+
+def test_prepared_rows_primary_key_not_first():
+    """
+    Whether an outer join found a row is told by its primary key, wherever
+    it is among the model's columns, not by its first column.
+    """
+    notes_registry = registry()
+
+    @notes_registry.mapped
+    class Note:
+        __tablename__ = "notes"
+        text = Column(String, nullable=True)
+        id = Column(Integer, ForeignKey(Word.id), primary_key=True)
+
+    statement = PreparedStatement(select(Word, Note).outerjoin(Note, Note.id == Word.id))
+    word_values: Tuple[Any, ...] = tuple(range(len(Word.__mapper__.columns)))
+    assert statement.make_row(word_values + (None, 0)).Note == (None, 0)
+    assert statement.make_row(word_values + (None, None)).Note is None
+
+
+def test_crud_returns_orm_objects(db: Session, monkeypatch):
+    """
+    The crud functions return ORM objects whatever the Dictionary uses.
+    """
+    monkeypatch.setattr(settings, "CRUD_STATEMENTS", "prepared")
+    word, character = crud.get_word_and_character(db, "好")[0]
+    assert isinstance(word, Word) and isinstance(character, Character)
+    assert word in db
+
+
+def test_prepared_search(monkeypatch):
+    expected: List[List] = Dictionary(cache=LRUCache()).search_chinese_many(["不好意思", "我们是意大利人", "好"])
+    monkeypatch.setattr(settings, "CRUD_STATEMENTS", "prepared")
+    dictionary = Dictionary(cache=LRUCache())
+    assert dictionary.search_chinese_many(["不好意思", "我们是意大利人", "好"]) == expected
+    assert [dictionary.search(text) for text in ["不好意思", "我们是意大利人", "好"]] == expected
+    assert dictionary.search_pinyin("buhaoyisi") == Dictionary(cache=LRUCache()).search_pinyin("buhaoyisi")
+
+
+@pytest.mark.parametrize("size,padded_size", [(1, 1), (2, 2), (3, 4), (5, 8), (500, 512)])
+def test_padded(size: int, padded_size: int):
+    padded_values: List[int] = padded(list(range(size)))
+    assert len(padded_values) == padded_size
+    assert set(padded_values) == set(range(size))
@@ -0,0 +1,146 @@
+from typing import List
+
+import pytest
+from sqlalchemy import Column, MetaData, Table, create_engine, insert, inspect, select, text
+from sqlalchemy.engine import Engine
+from sqlalchemy.orm import Session
+
+from cnlearn.db.fts import FTS_TABLE, definitions_fts
+from cnlearn.db.crud import get_fallback_frequency
+from cnlearn.db.models import BuildInfo, Character, CharacterPosting, Word, WordComponent
+from cnlearn.db.upgrade import upgrade_database
+
+
+@pytest.fixture
+def old_database(tmp_path) -> Engine:
+    """
+    Returns an engine bound to a database with the words and characters
+    tables as they were built before any indexes, character links or
+    word components were added, holding a few words.
+    """
+    engine: Engine = create_engine(f"sqlite+pysqlite:///{tmp_path / 'dictionary.db'}", future=True)
+    old_metadata = MetaData()
+    old_tables: List[Table] = [
+        Table(
+            table.name,
+            old_metadata,
+            *[
+                Column(column.name, column.type, primary_key=column.primary_key)
+                for column in table.columns
+                if column.name != "character_id"
+            ],
+        )
+        for table in (Word.__table__, Character.__table__)
+    ]
+    words, characters = old_tables
+    with engine.begin() as connection:
+        old_metadata.create_all(connection)
+        connection.execute(
+            insert(words),
+            [
+                dict(id=1, simplified="不", pinyin_accent="bù", frequency=1),
+                dict(id=2, simplified="好", pinyin_accent="hǎo", frequency=2),
+                dict(id=3, simplified="好", pinyin_accent="hào", frequency=3),
+                dict(id=4, simplified="不好", pinyin_accent="bù hǎo", frequency=4),
+            ],
+        )
+        connection.execute(insert(characters), [dict(id=1, character="好"), dict(id=2, character="不")])
+    yield engine
+    engine.dispose()
+
+
+def test_upgrade_creates_indexes(old_database: Engine):
+    changes: List[str] = upgrade_database(old_database)
+    assert "ix_words_simplified_frequency" in changes
+    assert "ix_words_pinyin_clean_frequency" in changes
+    assert "ix_words_pinyin_clean_lower_frequency" in changes
+    assert "ix_characters_character" in changes
+    word_indexes = {index["name"] for index in inspect(old_database).get_indexes("words")}
+    assert {"ix_words_simplified_frequency", "ix_words_pinyin_clean_frequency"} <= word_indexes
+
+
+def test_upgrade_is_idempotent(old_database: Engine):
+    upgrade_database(old_database)
+    assert upgrade_database(old_database) == []
+
+
+def test_upgrade_adds_word_components(old_database: Engine):
+    changes: List[str] = upgrade_database(old_database)
+    assert "words.character_id" in changes
+    assert "word_components" in changes
+    with old_database.connect() as connection:
+        character_ids = connection.execute(select(Word.id, Word.character_id).order_by(Word.id)).all()
+        components = connection.execute(
+            select(WordComponent.position, WordComponent.char_word_id, WordComponent.character_id)
+            .where(WordComponent.word_id == 4)
+            .order_by(WordComponent.position)
+        ).all()
+    assert [tuple(row) for row in character_ids] == [(1, 2), (2, 1), (3, 1), (4, None)]
+    assert [tuple(row) for row in components] == [(0, 1, 2), (1, 2, 1)]
+
+
+def test_upgrade_adds_character_postings(old_database: Engine):
+    assert "character postings" in upgrade_database(old_database)
+    with old_database.connect() as connection:
+        word_ids = connection.execute(
+            select(CharacterPosting.word_id)
+            .where(CharacterPosting.character == "好")
+            .order_by(CharacterPosting.frequency, CharacterPosting.word_id)
+        ).scalars().all()
+    assert word_ids == [2, 3, 4]
+
+
+def test_upgrade_folds_character_postings(old_database: Engine):
+    """
+    Postings built when ASCII letters kept their case are rebuilt.
+    """
+    upgrade_database(old_database)
+    with old_database.begin() as connection:
+        connection.execute(insert(Word.__table__), [dict(id=5, simplified="USB", frequency=5)])
+        connection.execute(
+            insert(CharacterPosting.__table__),
+            [dict(character=character, frequency=5, word_id=5) for character in "USB"],
+        )
+    assert "character postings" in upgrade_database(old_database)
+    with old_database.connect() as connection:
+        characters = connection.execute(
+            select(CharacterPosting.character).where(CharacterPosting.word_id == 5)
+        ).scalars().all()
+    assert sorted(characters) == ["b", "s", "u"]
+    assert upgrade_database(old_database) == []
+
+
+def test_upgrade_without_fallback_frequency(old_database: Engine):
+    """
+    A database whose words are all in the corpus has no fallback
+    frequency, even though one of them is the most frequent.
+    """
+    with Session(old_database, future=True) as session:
+        assert get_fallback_frequency(session) is None
+    assert BuildInfo.__tablename__ in upgrade_database(old_database)
+    with Session(old_database, future=True) as session:
+        assert session.execute(select(BuildInfo.value)).all() == []
+        assert get_fallback_frequency(session) is None
+
+
+def test_upgrade_records_fallback_frequency(old_database: Engine):
+    with old_database.begin() as connection:
+        connection.execute(
+            insert(Word.__table__),
+            [dict(id=5, simplified="贼", frequency=20003), dict(id=6, simplified="贼贼", frequency=20003)],
+        )
+    upgrade_database(old_database)
+    with Session(old_database, future=True) as session:
+        assert session.execute(select(BuildInfo.name, BuildInfo.value)).all() == [("fallback_frequency", "20003")]
+        assert get_fallback_frequency(session) == 20003
+
+
+def test_upgrade_adds_definitions_index(old_database: Engine):
+    with old_database.begin() as connection:
+        connection.execute(text("UPDATE words SET definitions = 'to feel embarrassed' WHERE id = 4"))
+    assert FTS_TABLE in upgrade_database(old_database)
+    with old_database.connect() as connection:
+        rowids = connection.execute(
+            select(definitions_fts.c.rowid).where(text(f"{FTS_TABLE} MATCH 'embarrassing'"))
+        ).scalars().all()
+    assert rowids == [4]